@@ -3,8 +3,12 @@ from google.adk.agents import Agent
 # from google.adk.tools import google_search  # Import the search tool
 from .tools import (
     create_event,
+    create_events,
     delete_event,
+    delete_events,
     edit_event,
+    edit_events,
+    find_free_time,
     get_current_time,
     list_events,
 )
@@ -25,6 +29,7 @@ root_agent = Agent(
     - `edit_event`: Edit an existing event (change title or reschedule)
     - `delete_event`: Remove an event from your calendar
     - `find_free_time`: Find available free time slots in your calendar
+    - `create_events`, `edit_events`, `delete_events`: Create, edit or delete several events in one call
     
     ## Be proactive and conversational
     Be proactive when handling calendar requests. Don't ask unnecessary questions when the context or defaults make sense.
@@ -40,8 +45,9 @@ root_agent = Agent(
     - If no date is mentioned, use today's date for start_date, which will default to today
     - If a specific date is mentioned, format it as YYYY-MM-DD
     - Always pass "primary" as the calendar_id
-    - Always pass 100 for max_results (the function internally handles this)
     - For days, use 1 for today only, 7 for a week, 30 for a month, etc.
+    - Use empty string "" for detail; use "full" only when the user asks about descriptions, attendees or links
+    - If the result has more_events, those days have more events than were listed; list a single day to see them
     
     ## Creating events guidelines
     For creating events:
@@ -57,6 +63,21 @@ root_agent = Agent(
     - Use empty string "" for summary, start_time, or end_time to keep those values unchanged
     - If changing the event time, specify both start_time and end_time (or both as empty strings to keep unchanged)
 
+    ## Changing several events guidelines
+    When a request affects more than one event (e.g. "clear my Friday afternoon", "move all standups 30 minutes later"):
+    - Use `create_events`, `edit_events` or `delete_events` once instead of calling the single-event tools repeatedly
+    - Pass one list entry per event; all lists must have the same length
+    - For edit_events, use empty strings in summaries, start_times or end_times for values you don't want to change
+    - Each item in the result has its own status; tell the user which events failed, if any
+
+    ## Finding free time guidelines
+    For finding free time:
+    - Use `find_free_time` instead of listing events when the user asks when they are free or for a time to meet
+    - Use start_date and days like list_events
+    - For duration_minutes, use the length of the meeting (30 if not mentioned)
+    - Use empty strings for work_start and work_end unless the user mentions other hours (HH:MM format)
+    - Use empty string for calendar_ids to check the primary calendar, or comma-separated calendar IDs
+
     Important:
     - Be super concise in your responses and only return the information requested (not extra information).
     - NEVER show the raw response from a tool_outputs. Instead, use the information to answer the question.
@@ -69,5 +90,9 @@ root_agent = Agent(
         create_event,
         edit_event,
         delete_event,
+        find_free_time,
+        create_events,
+        edit_events,
+        delete_events,
     ],
 )
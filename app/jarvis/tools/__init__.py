@@ -4,16 +4,33 @@
 Calendar tools for Google Calendar integration.
 """
 
+from .batch_events import create_events, delete_events, edit_events
 from .calendar_utils import get_current_time
 from .create_event import create_event
 from .delete_event import delete_event
 from .edit_event import edit_event
+from .executor import run_in_executor
+from .find_free_time import find_free_time
 from .list_events import list_events
 
+# Run the blocking Calendar tools on the tool thread pool, off the event loop
+list_events = run_in_executor(list_events, max_concurrency=8, timeout=15)
+create_event = run_in_executor(create_event, max_concurrency=4, timeout=20)
+edit_event = run_in_executor(edit_event, max_concurrency=4, timeout=20)
+delete_event = run_in_executor(delete_event, max_concurrency=4, timeout=20)
+find_free_time = run_in_executor(find_free_time, max_concurrency=4, timeout=15)
+create_events = run_in_executor(create_events, max_concurrency=2, timeout=30)
+edit_events = run_in_executor(edit_events, max_concurrency=2, timeout=30)
+delete_events = run_in_executor(delete_events, max_concurrency=2, timeout=30)
+
 __all__ = [
     "create_event",
+    "create_events",
     "delete_event",
+    "delete_events",
     "edit_event",
+    "edit_events",
+    "find_free_time",
     "list_events",
     "get_current_time",
 ]
@@ -0,0 +1,350 @@
+"""
+Batch calendar tools for Google Calendar integration.
+
+create_events, edit_events and delete_events send their items as multipart
+batch requests (googleapiclient's BatchHttpRequest) of up to BATCH_LIMIT
+calls each, so a bulk change like "clear my Friday afternoon" costs one tool
+call and one HTTP round trip instead of one of each per event. Every item
+gets its own status; one failed item doesn't fail the others.
+"""
+
+import time
+
+from streaming.metrics import CALENDAR_RTT
+
+from .calendar_utils import get_calendar_service, get_calendar_timezone, parse_datetime
+from .edit_event import patch_request, prepare_patch
+from .event_cache import get_event_cache
+
+# Calls per batch request (the Calendar API limit)
+BATCH_LIMIT = 50
+
+# Most items one tool call accepts
+MAX_ITEMS = 200
+
+
+def execute_batch(service, requests):
+    """
+    Execute API requests as batch requests of up to BATCH_LIMIT calls.
+
+    Args:
+        service: A Google Calendar service object
+        requests (list): Prepared API requests
+
+    Returns:
+        list: (response, exception) for each request, in order
+    """
+    results = [None] * len(requests)
+
+    def callback(request_id, response, exception):
+        results[int(request_id)] = (response, exception)
+
+    for offset in range(0, len(requests), BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=callback)
+        for index in range(offset, min(offset + BATCH_LIMIT, len(requests))):
+            batch.add(requests[index], request_id=str(index))
+
+        started = time.perf_counter()
+        try:
+            batch.execute()
+        finally:
+            CALENDAR_RTT.labels("calendar.batch").observe(time.perf_counter() - started)
+    return results
+
+
+def _status_code(exception):
+    resp = getattr(exception, "resp", None)
+    return getattr(resp, "status", None)
+
+
+def _error_message(exception):
+    # HttpError carries the API's reason; anything else is shown as is
+    status = _status_code(exception)
+    if status in (404, 410):
+        return "Event not found."
+    if status == 412:
+        return "The event was changed elsewhere. List events and try again."
+    reason = getattr(exception, "reason", None) or str(exception)
+    return f"{status}: {reason}" if status else reason
+
+
+def _summarize(verb, items):
+    # All items failed: error; otherwise success with the failures listed per item
+    succeeded = sum(1 for item in items if item["status"] == "success")
+    failed = len(items) - succeeded
+    message = f"{verb} {succeeded} of {len(items)} event(s)."
+    if failed:
+        message += f" {failed} failed, see items."
+    return {
+        "status": "success" if succeeded else "error",
+        "message": message,
+        "items": items,
+    }
+
+
+def _check_lengths(*lists):
+    count = len(lists[0])
+    if count == 0:
+        return "No events given."
+    if any(len(values) != count for values in lists):
+        return "All lists must have the same number of entries, one per event."
+    if count > MAX_ITEMS:
+        return f"Too many events: at most {MAX_ITEMS} per call."
+    return None
+
+
+def create_events(
+    summaries: list[str],
+    start_times: list[str],
+    end_times: list[str],
+) -> dict:
+    """
+    Create several events in Google Calendar at once.
+
+    Args:
+        summaries (list[str]): Title of each event
+        start_times (list[str]): Start time of each event (e.g., "2023-12-31 14:00")
+        end_times (list[str]): End time of each event (e.g., "2023-12-31 15:00")
+
+    Returns:
+        dict: Status of each event created or error details
+    """
+    try:
+        error = _check_lengths(summaries, start_times, end_times)
+        if error:
+            return {"status": "error", "message": error, "items": []}
+
+        # Get calendar service
+        service = get_calendar_service()
+        if not service:
+            return {
+                "status": "error",
+                "message": "Failed to authenticate with Google Calendar. Please check credentials.",
+                "items": [],
+            }
+
+        # Always use primary calendar
+        calendar_id = "primary"
+        timezone_id = get_calendar_timezone(service, calendar_id)
+
+        # Invalid items are reported without being sent
+        items, requests, positions = [], [], []
+        for summary, start_time, end_time in zip(summaries, start_times, end_times):
+            item = {"summary": summary}
+            items.append(item)
+            start_dt = parse_datetime(start_time)
+            end_dt = parse_datetime(end_time)
+            if not start_dt or not end_dt:
+                item["status"] = "error"
+                item["message"] = "Invalid date/time format. Use YYYY-MM-DD HH:MM."
+                continue
+
+            body = {
+                "summary": summary,
+                "start": {"dateTime": start_dt.isoformat(), "timeZone": timezone_id},
+                "end": {"dateTime": end_dt.isoformat(), "timeZone": timezone_id},
+            }
+            requests.append(service.events().insert(calendarId=calendar_id, body=body))
+            positions.append(item)
+
+        cache = get_event_cache(calendar_id)
+        results = execute_batch(service, requests) if requests else []
+        for item, (event, exception) in zip(positions, results):
+            if exception is not None:
+                item["status"] = "error"
+                item["message"] = _error_message(exception)
+                continue
+            # Write through to the local event cache
+            cache.upsert(event)
+            item["status"] = "success"
+            item["event_id"] = event["id"]
+
+        return _summarize("Created", items)
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error creating events: {str(e)}",
+            "items": [],
+        }
+
+
+def edit_events(
+    event_ids: list[str],
+    summaries: list[str],
+    start_times: list[str],
+    end_times: list[str],
+) -> dict:
+    """
+    Edit several existing events in Google Calendar at once - change titles and/or reschedule.
+
+    Args:
+        event_ids (list[str]): IDs of the events to edit
+        summaries (list[str]): New title of each event (empty string to keep unchanged)
+        start_times (list[str]): New start time of each event (e.g., "2023-12-31 14:00", empty string to keep unchanged)
+        end_times (list[str]): New end time of each event (e.g., "2023-12-31 15:00", empty string to keep unchanged)
+
+    Returns:
+        dict: Status of each event edited or error details
+    """
+    try:
+        error = _check_lengths(event_ids, summaries, start_times, end_times)
+        if error:
+            return {"status": "error", "message": error, "items": []}
+
+        # Get calendar service
+        service = get_calendar_service()
+        if not service:
+            return {
+                "status": "error",
+                "message": "Failed to authenticate with Google Calendar. Please check credentials.",
+                "items": [],
+            }
+
+        # Always use primary calendar
+        calendar_id = "primary"
+        cache = get_event_cache(calendar_id)
+
+        # Patches carry only the changed fields, guarded by the ETags of the
+        # cached events (events the cache hasn't seen are patched unconditionally)
+        items, pending = [], []
+        for event_id, summary, start_time, end_time in zip(
+            event_ids, summaries, start_times, end_times
+        ):
+            item = {"event_id": event_id}
+            items.append(item)
+            body, etag, error = prepare_patch(
+                service, cache, cache.get(event_id), summary, start_time, end_time
+            )
+            if error:
+                item["status"] = "error"
+                item["message"] = error
+                continue
+            pending.append((item, body, etag))
+
+        # Events changed since they were cached are read again and patched once more
+        for attempt in range(2):
+            results = execute_batch(
+                service,
+                [
+                    patch_request(service, calendar_id, item["event_id"], body, etag)
+                    for item, body, etag in pending
+                ],
+            )
+
+            conflicts = []
+            for (item, body, etag), (event, exception) in zip(pending, results):
+                if exception is None:
+                    cache.upsert(event)
+                    item["status"] = "success"
+                elif _status_code(exception) == 412 and attempt == 0:
+                    conflicts.append((item, body))
+                else:
+                    if _status_code(exception) in (404, 410):
+                        cache.remove(item["event_id"])
+                    item["status"] = "error"
+                    item["message"] = _error_message(exception)
+
+            if not conflicts:
+                break
+
+            latest = execute_batch(
+                service,
+                [
+                    service.events().get(
+                        calendarId=calendar_id, eventId=item["event_id"]
+                    )
+                    for item, body in conflicts
+                ],
+            )
+            pending = []
+            for (item, body), (event, exception) in zip(conflicts, latest):
+                if exception is not None:
+                    item["status"] = "error"
+                    item["message"] = _error_message(exception)
+                    continue
+                cache.upsert(event)
+                pending.append((item, body, event.get("etag")))
+            if not pending:
+                break
+
+        return _summarize("Updated", items)
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error updating events: {str(e)}",
+            "items": [],
+        }
+
+
+def delete_events(
+    event_ids: list[str],
+    confirm: bool,
+) -> dict:
+    """
+    Delete several events from Google Calendar at once.
+
+    Args:
+        event_ids (list[str]): The unique IDs of the events to delete
+        confirm (bool): Confirmation flag (must be set to True to delete)
+
+    Returns:
+        dict: Status of each event deleted or error details
+    """
+    # Safety check - require explicit confirmation
+    if not confirm:
+        return {
+            "status": "error",
+            "message": "Please confirm deletion by setting confirm=True",
+            "items": [],
+        }
+
+    try:
+        error = _check_lengths(event_ids)
+        if error:
+            return {"status": "error", "message": error, "items": []}
+
+        # Get calendar service
+        service = get_calendar_service()
+        if not service:
+            return {
+                "status": "error",
+                "message": "Failed to authenticate with Google Calendar. Please check credentials.",
+                "items": [],
+            }
+
+        # Always use primary calendar
+        calendar_id = "primary"
+        cache = get_event_cache(calendar_id)
+
+        results = execute_batch(
+            service,
+            [
+                service.events().delete(calendarId=calendar_id, eventId=event_id)
+                for event_id in event_ids
+            ],
+        )
+
+        items = []
+        for event_id, (response, exception) in zip(event_ids, results):
+            item = {"event_id": event_id}
+            items.append(item)
+            if exception is not None:
+                if _status_code(exception) in (404, 410):
+                    cache.remove(event_id)
+                item["status"] = "error"
+                item["message"] = _error_message(exception)
+                continue
+            # Write through to the local event cache
+            cache.remove(event_id)
+            item["status"] = "success"
+
+        return _summarize("Deleted", items)
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error deleting events: {str(e)}",
+            "items": [],
+        }
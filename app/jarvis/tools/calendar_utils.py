@@ -1,61 +1,431 @@
 """
 Utility functions for Google Calendar integration.
+
+The Google API client, OAuth and HTTP libraries are imported on first use
+rather than at module import, so the server starts without paying for them
+until the first calendar tool call.
+
+JARVIS_CALENDAR_BACKEND selects where the tools' calendar lives: "google"
+(the default) or a local backend for offline development and benchmarks,
+"memory" or "sqlite:///path/to/calendar.db" (see local_calendar.py).
 """
 
 import json
+import logging
 import os
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from cachetools import LRUCache, TTLCache
+from streaming.metrics import (
+    CALENDAR_RTT,
+    CALENDAR_SERVICE_BUILD,
+    CALENDAR_SERVICE_LOOKUPS,
+)
+
+from .credentials import (
+    CREDENTIALS_CACHE_SIZE,
+    current_user,
+    get_credential_store,
+    get_token_refresher,
+)
+
+logger = logging.getLogger(__name__)
 
 # Define scopes needed for Google Calendar
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
 
-# Path for token storage
+# Path for token storage (single-user mode)
 TOKEN_PATH = Path(os.path.expanduser("~/.credentials/calendar_token.json"))
-CREDENTIALS_PATH = Path("credentials.json")
+
+# Timeout (seconds) for each pooled HTTP connection
+HTTP_TIMEOUT = 30
+
+# Timezone used when the calendar settings can't be read
+DEFAULT_TIMEZONE = "America/New_York"
+
+# Calendar backend: "google", "memory" or "sqlite:///path/to/calendar.db"
+CALENDAR_BACKEND = os.environ.get("JARVIS_CALENDAR_BACKEND", "google")
+
+# How long (seconds) a calendar's timezone stays cached
+SETTINGS_TTL = 3600
+
+# Fetch the next page of a paged list while the current one is processed
+PREFETCH_PAGES = True
+
+# Per-calendar timezone cache (per user and calendar in multi-tenant mode)
+_timezones = TTLCache(maxsize=256, ttl=SETTINGS_TTL)
+_timezones_lock = threading.Lock()
+
+# Process-wide Calendar service state (built once, shared by all tools)
+_service = None
+_service_lock = threading.Lock()
+
+# Multi-tenant mode: one service per user, most recently used kept
+_user_services = LRUCache(maxsize=CREDENTIALS_CACHE_SIZE)
+
+# Parsed discovery document, shared by every service built
+_discovery_doc = None
+
+# Each worker thread keeps its own keep-alive connection, because
+# httplib2.Http objects are not safe to share between threads
+_thread_local = threading.local()
+
+# HttpRequest subclass that times each API call (created on first use)
+_request_class = None
+
+# Service lookups, bound once
+SERVICE_HITS = CALENDAR_SERVICE_LOOKUPS.labels("hit")
+SERVICE_BUILDS = CALENDAR_SERVICE_LOOKUPS.labels("build")
+
+
+def _save_token(creds):
+    TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
+    TOKEN_PATH.write_text(creds.to_json())
+
+
+def _load_credentials():
+    """
+    Load OAuth credentials from the token file, refreshing them if needed.
+
+    The server never runs the interactive OAuth flow; the token is created by
+    setup_calendar_auth.py. Once loaded, the token is refreshed in the
+    background before it expires.
+
+    Returns:
+        Credentials: Valid credentials or None if authentication fails
+    """
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+
+    # Check if token exists
+    if not TOKEN_PATH.exists():
+        logger.error(
+            "%s not found. Run setup_calendar_auth.py to authorize Google Calendar.",
+            TOKEN_PATH,
+        )
+        return None
+
+    creds = Credentials.from_authorized_user_info(
+        json.loads(TOKEN_PATH.read_text()), SCOPES
+    )
+
+    # An expired token is refreshed once here; after that the refresher keeps it fresh
+    if not creds.valid:
+        if not (creds.expired and creds.refresh_token):
+            logger.error("%s is invalid. Run setup_calendar_auth.py again.", TOKEN_PATH)
+            return None
+        creds.refresh(Request())
+        _save_token(creds)
+
+    get_token_refresher().watch(None, creds, _save_token)
+    return creds
+
+
+def _thread_http(credentials):
+    """
+    Get an authorized HTTP object on the current thread's keep-alive connection.
+
+    Args:
+        credentials (Credentials): The credentials to authorize requests with
+
+    Returns:
+        AuthorizedHttp: An authorized HTTP object bound to the current thread
+    """
+    import google_auth_httplib2
+    import httplib2
+
+    connection = getattr(_thread_local, "connection", None)
+    if connection is None:
+        connection = _thread_local.connection = httplib2.Http(timeout=HTTP_TIMEOUT)
+
+    # The wrapper is cheap; the pooled connection underneath is what's reused
+    http = getattr(_thread_local, "http", None)
+    if http is None or http.credentials is not credentials:
+        http = _thread_local.http = google_auth_httplib2.AuthorizedHttp(
+            credentials, http=connection
+        )
+    return http
+
+
+def _build_service(creds):
+    """
+    Build a Calendar service from the bundled discovery document (no network).
+    """
+    global _discovery_doc
+
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.discovery_cache import get_static_doc
+
+    if _discovery_doc is None:
+        _discovery_doc = json.loads(get_static_doc("calendar", "v3"))
+    return build_from_document(
+        _discovery_doc, credentials=creds, requestBuilder=_build_request
+    )
+
+
+def _build_request(http, *args, **kwargs):
+    """
+    Request builder that routes every API request through a per-thread connection.
+    """
+    global _request_class
+
+    if _request_class is None:
+        from googleapiclient.http import HttpRequest
+
+        class TimedHttpRequest(HttpRequest):
+            # Record the round-trip time of every API call, labelled by method
+            def execute(self, *args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return super().execute(*args, **kwargs)
+                finally:
+                    CALENDAR_RTT.labels(self.methodId or "unknown").observe(
+                        time.perf_counter() - started
+                    )
+
+        _request_class = TimedHttpRequest
+
+    return _request_class(_thread_http(http.credentials), *args, **kwargs)
 
 
 def get_calendar_service():
     """
-    Authenticate and create a Google Calendar service object.
+    Get the Google Calendar service object for the current user.
+
+    The service is built once from the static discovery document bundled with
+    googleapiclient, and each thread reuses its own pooled HTTP connection.
+    In multi-tenant mode each user gets their own service, built from their
+    stored credentials. With a local CALENDAR_BACKEND, a LocalCalendarService
+    is returned instead.
 
     Returns:
         A Google Calendar service object or None if authentication fails
     """
-    creds = None
+    global _service
 
-    # Check if token exists and is valid
-    if TOKEN_PATH.exists():
-        creds = Credentials.from_authorized_user_info(
-            json.loads(TOKEN_PATH.read_text()), SCOPES
-        )
+    started = time.perf_counter()
+
+    # Multi-tenant mode: the service of the user this tool call acts for
+    store = get_credential_store()
+    if store is not None and CALENDAR_BACKEND == "google":
+        return _get_user_service(store, current_user.get())
+
+    # Fast path: the service has already been built
+    service = _service
+    if service is not None:
+        SERVICE_HITS.inc()
+        return service
+
+    with _service_lock:
+        # Another thread may have built the service while we waited
+        if _service is not None:
+            SERVICE_HITS.inc()
+            return _service
 
-    # If credentials don't exist or are invalid, refresh or get new ones
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
+        # Local backends need no credentials
+        if CALENDAR_BACKEND != "google":
+            from .local_calendar import open_local_calendar
+
+            _service = open_local_calendar(CALENDAR_BACKEND, DEFAULT_TIMEZONE)
+            SERVICE_BUILDS.inc()
+            CALENDAR_SERVICE_BUILD.observe(time.perf_counter() - started)
+            return _service
+
+        creds = _load_credentials()
+        if not creds:
+            return None
+
+        # Build the service from the bundled discovery document (no network)
+        _service = _build_service(creds)
+
+        SERVICE_BUILDS.inc()
+        CALENDAR_SERVICE_BUILD.observe(time.perf_counter() - started)
+        return _service
+
+
+def _get_user_service(store, user_id):
+    """
+    Get (or build) the Calendar service for one user.
+
+    Args:
+        store (CredentialStore): The per-user credential store
+        user_id (str): The user the tool call acts for
+
+    Returns:
+        A Google Calendar service object or None if the user hasn't authorized
+    """
+    if not user_id:
+        logger.error("No user for this tool call, can't pick credentials")
+        return None
+
+    creds = store.get(user_id)
+    if creds is None:
+        logger.error("No Google Calendar token for user %s", user_id)
+        return None
+
+    with _service_lock:
+        cached = _user_services.get(user_id)
+        # Rebuild if the user's credentials were replaced
+        if cached is not None and cached[0] is creds:
+            SERVICE_HITS.inc()
+            return cached[1]
+
+        started = time.perf_counter()
+        service = _build_service(creds)
+        _user_services[user_id] = (creds, service)
+        SERVICE_BUILDS.inc()
+        CALENDAR_SERVICE_BUILD.observe(time.perf_counter() - started)
+        return service
+
+
+def reset_calendar_service():
+    """
+    Drop the cached services so the next call rebuilds them (e.g. after re-authorizing).
+    """
+    global _service
+
+    with _service_lock:
+        _service = None
+        _user_services.clear()
+
+
+def _timezone_key(calendar_id):
+    # "primary" is a different calendar for each user of a multi-tenant server
+    if get_credential_store() is not None:
+        return (current_user.get(), calendar_id)
+    return calendar_id
+
+
+def get_calendar_timezone(service, calendar_id="primary"):
+    """
+    Get a calendar's timezone, using the settings cache when possible.
+
+    Args:
+        service: A Google Calendar service object
+        calendar_id (str): The calendar ID (e.g. "primary")
+
+    Returns:
+        str: An IANA timezone name (DEFAULT_TIMEZONE if it can't be determined)
+    """
+    key = _timezone_key(calendar_id)
+    with _timezones_lock:
+        timezone_id = _timezones.get(key)
+    if timezone_id:
+        return timezone_id
+
+    try:
+        if calendar_id == "primary":
+            # The primary calendar follows the user's timezone setting
+            setting = service.settings().get(setting="timezone").execute()
+            timezone_id = setting.get("value")
         else:
-            # If credentials.json doesn't exist, we can't proceed with OAuth flow
-            if not CREDENTIALS_PATH.exists():
-                print(
-                    f"Error: {CREDENTIALS_PATH} not found. Please follow setup instructions."
-                )
-                return None
-
-            flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
-            creds = flow.run_local_server(port=0)
-
-        # Save the credentials for the next run
-        TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
-        TOKEN_PATH.write_text(creds.to_json())
-
-    # Create and return the Calendar service
-    return build("calendar", "v3", credentials=creds)
+            calendar = service.calendars().get(calendarId=calendar_id).execute()
+            timezone_id = calendar.get("timeZone")
+    except Exception:
+        # If we can't get it from settings, we'll use the default (not cached)
+        return DEFAULT_TIMEZONE
+
+    if not timezone_id:
+        return DEFAULT_TIMEZONE
+
+    with _timezones_lock:
+        _timezones[key] = timezone_id
+    return timezone_id
+
+
+def invalidate_calendar_settings(calendar_id=None):
+    """
+    Drop cached calendar settings so they are re-read on next use.
+
+    Args:
+        calendar_id (str): The current user's calendar to invalidate, or None for
+            all calendars of all users
+    """
+    with _timezones_lock:
+        if calendar_id is None:
+            _timezones.clear()
+        else:
+            _timezones.pop(_timezone_key(calendar_id), None)
+
+
+def iter_event_pages(service, prefetch=None, **params):
+    """
+    Fetch pages of events().list lazily, following nextPageToken.
+
+    While the caller works through one page, the next one is fetched on the
+    prefetch pool, so at most two pages are held at a time. Closing the
+    generator (or breaking out of the loop) stops fetching.
+
+    Args:
+        service: A Google Calendar service object
+        prefetch (bool): Fetch the next page while the current one is consumed
+            (PREFETCH_PAGES if None)
+        **params: Parameters of events().list (calendarId, timeMin, syncToken, ...)
+
+    Yields:
+        dict: One events().list response per page
+    """
+    from .executor import submit_prefetch
+
+    if prefetch is None:
+        prefetch = PREFETCH_PAGES
+
+    def fetch(page_token):
+        # The request is built on the thread that executes it, so it uses
+        # that thread's connection
+        return service.events().list(pageToken=page_token, **params).execute()
+
+    page = fetch(None)
+    pending = None
+    try:
+        while True:
+            page_token = page.get("nextPageToken")
+            if page_token and prefetch:
+                pending = submit_prefetch(fetch, page_token)
+
+            yield page
+
+            if not page_token:
+                return
+            if pending is not None:
+                page, pending = pending.result(), None
+            else:
+                page = fetch(page_token)
+    finally:
+        # A prefetched page nobody will read is dropped
+        if pending is not None:
+            pending.cancel()
+
+
+def iter_events(service, limit=None, prefetch=None, **params):
+    """
+    Iterate over the events of events().list across pages, fetching them lazily.
+
+    Args:
+        service: A Google Calendar service object
+        limit (int): Stop after this many events (None for all of them)
+        prefetch (bool): Fetch the next page while the current one is consumed
+            (PREFETCH_PAGES if None)
+        **params: Parameters of events().list (calendarId, timeMin, timeMax, ...)
+
+    Yields:
+        dict: Event resources from the Calendar API
+    """
+    count = 0
+    pages = iter_event_pages(service, prefetch=prefetch, **params)
+    try:
+        for page in pages:
+            for event in page.get("items", []):
+                yield event
+                count += 1
+                # Stop before another page is requested
+                if limit is not None and count >= limit:
+                    return
+    finally:
+        pages.close()
 
 
 def format_event_time(event_time):
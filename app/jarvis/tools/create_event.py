@@ -2,9 +2,12 @@
 Create event tool for Google Calendar integration.
 """
 
-import datetime
-
-from .calendar_utils import get_calendar_service, parse_datetime
+from .calendar_utils import (
+    get_calendar_service,
+    get_calendar_timezone,
+    parse_datetime,
+)
+from .event_cache import get_event_cache
 
 
 def create_event(
@@ -45,19 +48,8 @@ def create_event(
                 "message": "Invalid date/time format. Please use YYYY-MM-DD HH:MM format.",
             }
 
-        # Dynamically determine timezone
-        timezone_id = "America/New_York"  # Default to Eastern Time
-
-        try:
-            # Try to get the timezone from the calendar settings
-            settings = service.settings().list().execute()
-            for setting in settings.get("items", []):
-                if setting.get("id") == "timezone":
-                    timezone_id = setting.get("value")
-                    break
-        except Exception:
-            # If we can't get it from settings, we'll use the default
-            pass
+        # Timezone comes from the cached calendar settings
+        timezone_id = get_calendar_timezone(service, calendar_id)
 
         # Create event body without type annotations
         event_body = {}
@@ -77,6 +69,9 @@ def create_event(
             service.events().insert(calendarId=calendar_id, body=event_body).execute()
         )
 
+        # Write through to the local event cache
+        get_event_cache(calendar_id).upsert(event)
+
         return {
             "status": "success",
             "message": "Event created successfully",
@@ -0,0 +1,405 @@
+"""
+Google credentials for the calendar tools.
+
+By default the server acts for one Google account, whose token is read from
+TOKEN_PATH (written by setup_calendar_auth.py). Setting JARVIS_CREDENTIALS_DIR
+switches to multi-tenant mode: each signed-in user gets their own token,
+stored encrypted (Fernet) in that directory, with the most recently used
+credentials kept in an in-memory LRU. The key is never kept in that
+directory, so the token files alone can't be decrypted.
+
+Either way, tokens are refreshed by a background TokenRefresher thread
+REFRESH_MARGIN seconds before they expire, so tool calls never wait on an
+OAuth round trip. The server never runs an interactive OAuth flow: tokens are
+added with setup_calendar_auth.py (--user for multi-tenant mode).
+
+The user a tool call acts for is taken from the current_user context
+variable, which the live stream sets for its session; the tool executor
+carries it into the worker thread.
+"""
+
+import contextvars
+import datetime
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+
+from cachetools import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Directory of per-user encrypted tokens (empty: single-user mode)
+CREDENTIALS_DIR = os.environ.get("JARVIS_CREDENTIALS_DIR", "")
+
+# Fernet key for the token files
+CREDENTIALS_KEY = os.environ.get("JARVIS_CREDENTIALS_KEY", "")
+
+# Where the key is generated (and read) when JARVIS_CREDENTIALS_KEY isn't set;
+# must be outside CREDENTIALS_DIR
+CREDENTIALS_KEY_FILE = os.environ.get(
+    "JARVIS_CREDENTIALS_KEY_FILE", "~/.config/jarvis/credentials.key"
+)
+
+# Credentials kept in memory
+CREDENTIALS_CACHE_SIZE = int(os.environ.get("JARVIS_CREDENTIALS_CACHE", "256"))
+
+# Refresh tokens this many seconds before they expire
+REFRESH_MARGIN = float(os.environ.get("JARVIS_TOKEN_REFRESH_MARGIN", "300"))
+
+# Seconds between checks for tokens that are due
+REFRESH_INTERVAL = 30.0
+
+# The user the current tool call acts for
+current_user = contextvars.ContextVar("jarvis_current_user", default=None)
+
+
+def set_current_user(user_id):
+    """
+    Make the calendar tools act for this user in the current context.
+
+    Args:
+        user_id (str): The signed-in user's ID
+    """
+    current_user.set(user_id)
+
+
+def _refresh_due(creds, margin):
+    if not creds.refresh_token:
+        return False
+    if creds.expiry is None:
+        return not creds.valid
+    # google-auth keeps expiry as a naive UTC datetime
+    remaining = creds.expiry - datetime.datetime.utcnow()
+    return remaining.total_seconds() < margin
+
+
+class TokenRefresher:
+    """
+    Background thread that refreshes watched credentials before they expire.
+
+    Each watched entry has a save callback, called after every successful
+    refresh so the new token is persisted. Other work for the thread (e.g.
+    loading a user's credentials ahead of their first tool call) can be
+    queued with submit().
+    """
+
+    def __init__(self, margin=REFRESH_MARGIN, interval=REFRESH_INTERVAL):
+        """
+        Args:
+            margin (float): Refresh tokens expiring within this many seconds
+            interval (float): Seconds between checks
+        """
+        self.margin = margin
+        self.interval = interval
+        self._watched = {}
+        self._tasks = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+
+        self.refreshes = 0
+        self.failures = 0
+
+    def watch(self, key, creds, save):
+        """
+        Keep a set of credentials fresh.
+
+        Args:
+            key: Identifies the entry (e.g. the user ID)
+            creds (Credentials): The credentials to refresh in place
+            save (callable): Called with the credentials after each refresh
+        """
+        with self._lock:
+            self._watched[key] = (creds, save)
+            self._start()
+        if _refresh_due(creds, self.margin):
+            self._wake.set()
+
+    def unwatch(self, key):
+        with self._lock:
+            self._watched.pop(key, None)
+
+    def submit(self, task):
+        """
+        Run a callable on the refresher thread.
+        """
+        with self._lock:
+            self._tasks.append(task)
+            self._start()
+        self._wake.set()
+
+    def _start(self):
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(
+                target=self._run, name="jarvis-token-refresher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+            with self._lock:
+                tasks, self._tasks = self._tasks, []
+            for task in tasks:
+                try:
+                    task()
+                except Exception:
+                    logger.exception("credential task failed")
+
+            self.refresh_due()
+
+    def refresh_due(self):
+        """
+        Refresh every watched token that expires within the margin.
+        """
+        from google.auth.exceptions import RefreshError
+        from google.auth.transport.requests import Request
+
+        with self._lock:
+            due = [
+                (key, creds, save)
+                for key, (creds, save) in self._watched.items()
+                if _refresh_due(creds, self.margin)
+            ]
+
+        for key, creds, save in due:
+            try:
+                creds.refresh(Request())
+                save(creds)
+                self.refreshes += 1
+            except RefreshError as e:
+                # Revoked or expired refresh token: the user must authorize again
+                self.failures += 1
+                self.unwatch(key)
+                logger.warning("token refresh rejected for %s: %s", key, e)
+            except Exception as e:
+                # Network trouble: try again at the next check
+                self.failures += 1
+                logger.warning("token refresh failed for %s: %s", key, e)
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+class CredentialStore:
+    """
+    Per-user OAuth credentials: an in-memory LRU over encrypted token files.
+
+    Token files are named after a hash of the user ID and written atomically
+    with owner-only permissions. Cached credentials are watched by the token
+    refresher, so they are already fresh when a tool call needs them.
+    """
+
+    def __init__(
+        self,
+        directory,
+        key=CREDENTIALS_KEY,
+        key_file=CREDENTIALS_KEY_FILE,
+        max_cached=CREDENTIALS_CACHE_SIZE,
+        refresher=None,
+    ):
+        """
+        Args:
+            directory (str): Where the encrypted token files live
+            key (str): Fernet key (read from or generated into key_file if empty)
+            key_file (str): Key file used when no key is given (outside the directory)
+            max_cached (int): Credentials kept in memory
+            refresher (TokenRefresher): Refreshes cached tokens in the background
+        """
+        self.directory = Path(directory)
+        self.refresher = refresher
+        self._key = key
+        self._key_file = Path(os.path.expanduser(key_file))
+        self._fernet = None
+        self._cache = LRUCache(maxsize=max_cached)
+        self._lock = threading.RLock()
+
+        self.loads = 0
+        self.hits = 0
+
+    def _cipher(self):
+        if self._fernet is None:
+            from cryptography.fernet import Fernet
+
+            key = self._key
+            if not key:
+                key = self._load_or_create_key()
+            self._fernet = Fernet(key)
+        return self._fernet
+
+    def _load_or_create_key(self):
+        key_path = self._key_file
+        if self.directory.resolve() in key_path.resolve().parents:
+            raise RuntimeError(
+                "JARVIS_CREDENTIALS_KEY_FILE must be outside JARVIS_CREDENTIALS_DIR"
+            )
+        if key_path.exists():
+            return key_path.read_bytes()
+
+        from cryptography.fernet import Fernet
+
+        logger.warning(
+            "JARVIS_CREDENTIALS_KEY is not set, generated a key in %s", key_path
+        )
+        key = Fernet.generate_key()
+        self._write_private(key_path, key)
+        return key
+
+    def _write_private(self, path, data):
+        # Owner-only file, replaced atomically
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+
+    def _path(self, user_id):
+        digest = hashlib.sha256(user_id.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.token"
+
+    def get(self, user_id):
+        """
+        Get a user's credentials.
+
+        Args:
+            user_id (str): The signed-in user's ID
+
+        Returns:
+            Credentials: The user's credentials, or None if they never authorized
+        """
+        with self._lock:
+            creds = self._cache.get(user_id)
+            if creds is not None:
+                self.hits += 1
+                return creds
+
+            creds = self._load(user_id)
+            if creds is not None:
+                self._remember(user_id, creds)
+            return creds
+
+    def _load(self, user_id):
+        import json
+
+        from google.oauth2.credentials import Credentials
+
+        path = self._path(user_id)
+        if not path.exists():
+            return None
+
+        self.loads += 1
+        info = json.loads(self._cipher().decrypt(path.read_bytes()))
+        return Credentials.from_authorized_user_info(info)
+
+    def _remember(self, user_id, creds):
+        # Keep the refresher's watch list in step with the LRU
+        if len(self._cache) >= self._cache.maxsize and user_id not in self._cache:
+            evicted, _ = self._cache.popitem()
+            if self.refresher:
+                self.refresher.unwatch(evicted)
+        self._cache[user_id] = creds
+        if self.refresher:
+            self.refresher.watch(user_id, creds, lambda c: self.save(user_id, c))
+
+    def save(self, user_id, creds):
+        """
+        Write a user's credentials to disk (encrypted).
+        """
+        self._write_private(
+            self._path(user_id), self._cipher().encrypt(creds.to_json().encode())
+        )
+
+    def put(self, user_id, creds):
+        """
+        Store newly authorized credentials for a user.
+
+        Args:
+            user_id (str): The signed-in user's ID
+            creds (Credentials): The user's OAuth credentials
+        """
+        with self._lock:
+            self.save(user_id, creds)
+            self._remember(user_id, creds)
+
+    def delete(self, user_id):
+        """
+        Forget a user's credentials (e.g. when they disconnect their account).
+        """
+        with self._lock:
+            self._cache.pop(user_id, None)
+            if self.refresher:
+                self.refresher.unwatch(user_id)
+            self._path(user_id).unlink(missing_ok=True)
+
+    def stats(self):
+        return {"cached": len(self._cache), "loads": self.loads, "hits": self.hits}
+
+
+# Process-wide refresher and store, created on first use
+_refresher = None
+_store = None
+_singletons_lock = threading.Lock()
+
+
+def get_token_refresher():
+    """
+    Get the process-wide token refresher.
+
+    Returns:
+        TokenRefresher: The refresher (its thread starts with the first watch)
+    """
+    global _refresher
+
+    with _singletons_lock:
+        if _refresher is None:
+            _refresher = TokenRefresher()
+        return _refresher
+
+
+def get_credential_store():
+    """
+    Get the process-wide per-user credential store.
+
+    Returns:
+        CredentialStore: The store, or None in single-user mode
+    """
+    global _store
+
+    if not CREDENTIALS_DIR:
+        return None
+    refresher = get_token_refresher()
+    with _singletons_lock:
+        if _store is None:
+            _store = CredentialStore(CREDENTIALS_DIR, refresher=refresher)
+        return _store
+
+
+def prefetch_credentials(user_id):
+    """
+    Load (and if needed refresh) a user's credentials in the background.
+
+    Called when a session connects, so its first tool call finds them ready.
+
+    Args:
+        user_id (str): The signed-in user's ID
+    """
+    store = get_credential_store()
+    if store is not None:
+        store.refresher.submit(lambda: store.get(user_id))
+
+
+def shutdown_token_refresher():
+    """
+    Stop the background refresher thread (on server shutdown).
+    """
+    if _refresher is not None:
+        _refresher.close()
@@ -3,6 +3,7 @@ Delete event tool for Google Calendar integration.
 """
 
 from .calendar_utils import get_calendar_service
+from .event_cache import get_event_cache
 
 
 def delete_event(
@@ -41,6 +42,9 @@ def delete_event(
         # Call the Calendar API to delete the event
         service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
 
+        # Write through to the local event cache
+        get_event_cache(calendar_id).remove(event_id)
+
         return {
             "status": "success",
             "message": f"Event {event_id} has been deleted successfully",
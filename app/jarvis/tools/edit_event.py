@@ -1,8 +1,100 @@
 """
 Edit event tool for Google Calendar integration.
+
+Edits are sent as a single events().patch carrying only the changed fields.
+When the event is in the local event cache, the cached copy's ETag goes along
+as If-Match: a change made elsewhere since that copy was read is detected
+(HTTP 412) instead of silently overwritten, and the event is then read again
+and the patch retried once. An event the cache hasn't seen is patched without
+If-Match rather than read first, so every edit costs one round trip; the
+patched resource that comes back is cached.
 """
 
-from .calendar_utils import get_calendar_service, parse_datetime
+from .calendar_utils import (
+    get_calendar_service,
+    get_calendar_timezone,
+    parse_datetime,
+)
+from .event_cache import get_event_cache
+
+
+def prepare_patch(service, cache, event, summary, start_time, end_time):
+    """
+    Build the patch body for an edit from the changed fields.
+
+    Args:
+        service: A Google Calendar service object
+        cache (EventCache): The calendar's event cache
+        event (dict): The event's cached copy, or None if it isn't cached
+        summary (str): New title, or empty string to keep it
+        start_time (str): New start time, or empty string to keep it
+        end_time (str): New end time, or empty string to keep it
+
+    Returns:
+        tuple: (body, etag to send as If-Match or None, error message or None)
+    """
+    # Get timezone from the cached event, falling back to the calendar's
+    if event and "timeZone" in event.get("start", {}):
+        timezone_id = event["start"]["timeZone"]
+    else:
+        timezone_id = get_calendar_timezone(service, cache.calendar_id)
+
+    # Only the changed fields are sent
+    body = {}
+    if summary:
+        body["summary"] = summary
+
+    # Update start time if provided
+    if start_time:
+        start_dt = parse_datetime(start_time)
+        if not start_dt:
+            return (
+                None,
+                None,
+                "Invalid start time format. Please use YYYY-MM-DD HH:MM format.",
+            )
+        # An all-day event's date is cleared when it gets a time
+        body["start"] = {
+            "dateTime": start_dt.isoformat(),
+            "timeZone": timezone_id,
+            "date": None,
+        }
+
+    # Update end time if provided
+    if end_time:
+        end_dt = parse_datetime(end_time)
+        if not end_dt:
+            return (
+                None,
+                None,
+                "Invalid end time format. Please use YYYY-MM-DD HH:MM format.",
+            )
+        body["end"] = {
+            "dateTime": end_dt.isoformat(),
+            "timeZone": timezone_id,
+            "date": None,
+        }
+
+    if not body:
+        return (
+            None,
+            None,
+            "Nothing to change. Pass a new summary, start_time or end_time.",
+        )
+
+    return body, event.get("etag") if event else None, None
+
+
+def patch_request(service, calendar_id, event_id, body, etag):
+    """
+    Build an events().patch request, conditional on the ETag if one is given.
+    """
+    request = service.events().patch(
+        calendarId=calendar_id, eventId=event_id, body=body
+    )
+    if etag:
+        request.headers["If-Match"] = etag
+    return request
 
 
 def edit_event(
@@ -23,6 +115,8 @@ def edit_event(
     Returns:
         dict: Information about the edited event or error details
     """
+    from googleapiclient.errors import HttpError
+
     try:
         # Get calendar service
         service = get_calendar_service()
@@ -35,52 +129,38 @@ def edit_event(
         # Always use primary calendar
         calendar_id = "primary"
 
-        # First get the existing event
-        try:
-            event = (
-                service.events().get(calendarId=calendar_id, eventId=event_id).execute()
-            )
-        except Exception:
-            return {
-                "status": "error",
-                "message": f"Event with ID {event_id} not found in primary calendar.",
-            }
-
-        # Update the event with new values
-        if summary:
-            event["summary"] = summary
-
-        # Get timezone from the original event
-        timezone_id = "America/New_York"  # Default
-        if "start" in event and "timeZone" in event["start"]:
-            timezone_id = event["start"]["timeZone"]
-
-        # Update start time if provided
-        if start_time:
-            start_dt = parse_datetime(start_time)
-            if not start_dt:
-                return {
-                    "status": "error",
-                    "message": "Invalid start time format. Please use YYYY-MM-DD HH:MM format.",
-                }
-            event["start"] = {"dateTime": start_dt.isoformat(), "timeZone": timezone_id}
+        # The cached copy supplies the ETag and timezone without a round trip
+        cache = get_event_cache(calendar_id)
+        body, etag, error = prepare_patch(
+            service, cache, cache.get(event_id), summary, start_time, end_time
+        )
+        if error:
+            return {"status": "error", "message": error}
 
-        # Update end time if provided
-        if end_time:
-            end_dt = parse_datetime(end_time)
-            if not end_dt:
+        # Patch the event, retrying once if it changed since it was cached
+        try:
+            updated_event = patch_request(
+                service, calendar_id, event_id, body, etag
+            ).execute()
+        except HttpError as e:
+            if e.resp.status in (404, 410):
+                cache.remove(event_id)
                 return {
                     "status": "error",
-                    "message": "Invalid end time format. Please use YYYY-MM-DD HH:MM format.",
+                    "message": f"Event with ID {event_id} not found in primary calendar.",
                 }
-            event["end"] = {"dateTime": end_dt.isoformat(), "timeZone": timezone_id}
+            if e.resp.status != 412:
+                raise
+            latest = (
+                service.events().get(calendarId=calendar_id, eventId=event_id).execute()
+            )
+            cache.upsert(latest)
+            updated_event = patch_request(
+                service, calendar_id, event_id, body, latest.get("etag")
+            ).execute()
 
-        # Update the event
-        updated_event = (
-            service.events()
-            .update(calendarId=calendar_id, eventId=event_id, body=event)
-            .execute()
-        )
+        # Write through to the local event cache
+        cache.upsert(updated_event)
 
         return {
             "status": "success",
@@ -0,0 +1,428 @@
+"""
+Local event cache for Google Calendar integration.
+
+Each calendar gets an in-memory event store that is kept current with the
+Calendar API's incremental sync tokens and answers time-range queries from a
+sorted start-time index.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from cachetools import LRUCache
+
+from .calendar_utils import iter_event_pages
+from .credentials import CREDENTIALS_CACHE_SIZE, current_user, get_credential_store
+
+logger = logging.getLogger(__name__)
+
+# How far back the cached window reaches when doing a full sync
+SYNC_WINDOW_DAYS_BACK = 30
+
+# How far ahead it reaches (recurring events without an end are expanded up to here)
+SYNC_WINDOW_DAYS_AHEAD = 365
+
+# Minimum seconds between two incremental syncs of the same calendar
+SYNC_INTERVAL = 10.0
+
+# Page size for sync requests (the API maximum)
+SYNC_PAGE_SIZE = 2500
+
+
+def event_timestamp(event_time):
+    """
+    Convert an event start/end dictionary into a UTC epoch timestamp.
+
+    Args:
+        event_time (dict): The event time dictionary from Google Calendar API
+
+    Returns:
+        float: Seconds since the epoch, or None if the time can't be parsed
+    """
+    if "dateTime" in event_time:
+        dt = datetime.fromisoformat(event_time["dateTime"].replace("Z", "+00:00"))
+    elif "date" in event_time:
+        # All-day events are anchored at midnight UTC
+        dt = datetime.fromisoformat(event_time["date"])
+    else:
+        return None
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def to_timestamp(dt):
+    """
+    Convert a datetime into a UTC epoch timestamp (naive datetimes are treated as UTC).
+
+    Args:
+        dt (datetime): The datetime to convert
+
+    Returns:
+        float: Seconds since the epoch
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class EventCache:
+    """
+    Per-calendar event store with incremental sync and an interval index.
+
+    Events are indexed by start time in two parallel sorted lists. An event
+    overlaps [time_min, time_max) when it starts before time_max and ends after
+    time_min, so a query only has to scan starts within the longest event
+    duration before time_min.
+    """
+
+    def __init__(self, calendar_id):
+        self.calendar_id = calendar_id
+        self.sync_token = None
+        self.window_start = None
+        self.window_end = None
+        self.last_sync = 0.0
+
+        # time.monotonic() of the last change to the cached events
+        self.changed_at = 0.0
+
+        # Held for a whole sync, network requests included; _lock only guards the index
+        self._sync_lock = threading.Lock()
+
+        # Write-throughs made while a full sync is fetching, replayed on its result
+        self._writes = None
+
+        self._lock = threading.RLock()
+        self._events = {}
+        self._spans = {}
+        self._starts = []
+        self._ids = []
+        self._max_duration = 0.0
+
+    def covers(self, time_min, time_max):
+        """
+        Check whether a query for [time_min, time_max) can be answered from the cache.
+        """
+        with self._lock:
+            return (
+                self.sync_token is not None
+                and to_timestamp(time_min) >= self.window_start
+                and to_timestamp(time_max) <= self.window_end
+            )
+
+    def get(self, event_id):
+        """
+        Return the cached copy of an event, or None if it isn't cached.
+        """
+        with self._lock:
+            return self._events.get(event_id)
+
+    def query(self, time_min, time_max):
+        """
+        Return the cached events overlapping [time_min, time_max), ordered by start time.
+
+        Args:
+            time_min (datetime): Start of the range
+            time_max (datetime): End of the range
+
+        Returns:
+            list: Event resources from the Calendar API
+        """
+        lo_ts = to_timestamp(time_min)
+        hi_ts = to_timestamp(time_max)
+
+        with self._lock:
+            lo = bisect.bisect_left(self._starts, lo_ts - self._max_duration)
+            hi = bisect.bisect_left(self._starts, hi_ts)
+            return [
+                self._events[event_id]
+                for event_id in self._ids[lo:hi]
+                if self._spans[event_id][1] > lo_ts
+            ]
+
+    def upsert(self, event):
+        """
+        Insert or replace an event (write-through from create/edit tools and sync deltas).
+        """
+        if event.get("status") == "cancelled":
+            self.remove(event.get("id"))
+            return
+
+        start = event_timestamp(event.get("start", {}))
+        end = event_timestamp(event.get("end", {}))
+        if start is None or end is None:
+            return
+
+        with self._lock:
+            if self._writes is not None:
+                self._writes.append((event["id"], event))
+            self.changed_at = time.monotonic()
+            self._unindex(event["id"])
+            self._index(event, start, end)
+
+    def seed(self, events, fetched_at):
+        """
+        Add events read by another request (e.g. the connect-time prefetch), so
+        edits find their ETags without a read.
+
+        Only events that aren't cached are added, and nothing is added if the
+        cache changed after fetched_at (the copies may be older). Unlike upsert
+        this isn't a write: changed_at is left alone.
+
+        Args:
+            events (list): Event resources, including their etag
+            fetched_at (float): time.monotonic() when the request was sent
+        """
+        with self._lock:
+            if self.changed_at > fetched_at:
+                return
+            for event in events:
+                start = event_timestamp(event.get("start", {}))
+                end = event_timestamp(event.get("end", {}))
+                if event["id"] in self._events or start is None or end is None:
+                    continue
+                self._index(event, start, end)
+
+    def _index(self, event, start, end):
+        index = bisect.bisect_right(self._starts, start)
+        self._starts.insert(index, start)
+        self._ids.insert(index, event["id"])
+        self._events[event["id"]] = event
+        self._spans[event["id"]] = (start, end)
+        self._max_duration = max(self._max_duration, end - start)
+
+    def remove(self, event_id):
+        """
+        Remove an event from the cache (write-through from the delete tool and sync deltas).
+        """
+        with self._lock:
+            if self._writes is not None:
+                self._writes.append((event_id, None))
+            self.changed_at = time.monotonic()
+            self._unindex(event_id)
+
+    def _unindex(self, event_id):
+        span = self._spans.pop(event_id, None)
+        if span is None:
+            return
+        del self._events[event_id]
+
+        # Find the event among the entries that share its start time
+        lo = bisect.bisect_left(self._starts, span[0])
+        hi = bisect.bisect_right(self._starts, span[0])
+        index = self._ids.index(event_id, lo, hi)
+        del self._starts[index]
+        del self._ids[index]
+
+    def sync(self, service, force=False, wait=True):
+        """
+        Bring the cache up to date with the calendar.
+
+        The first call does a full sync of the cached window; later calls only
+        fetch the events that changed since the previous sync token. Calls made
+        within SYNC_INTERVAL of the last sync return without a network request.
+        Requests are made without holding the index lock, so reads and
+        write-throughs carry on while a sync is fetching.
+
+        With wait=False a full sync (the first one, or after the sync token
+        expired) runs on the prefetch pool instead, and a sync already running
+        isn't waited for. covers() stays False until the full sync is done, so
+        the caller asks the API meanwhile.
+
+        Args:
+            service: A Google Calendar service object
+            force (bool): Sync even if the last sync was within SYNC_INTERVAL
+            wait (bool): Wait for a full sync and for a sync already running
+        """
+        if not force and time.monotonic() - self.last_sync < SYNC_INTERVAL:
+            return
+        if not self._sync_lock.acquire(blocking=wait):
+            return
+
+        handed_over = False
+        try:
+            # Another thread may have synced while this one waited
+            if not force and time.monotonic() - self.last_sync < SYNC_INTERVAL:
+                return
+
+            if self.sync_token is not None:
+                self._incremental_sync(service)
+            if self.sync_token is None:
+                if wait:
+                    self._full_sync(service)
+                else:
+                    handed_over = self._start_full_sync(service)
+        finally:
+            if not handed_over:
+                self._sync_lock.release()
+
+    def _start_full_sync(self, service):
+        from .executor import submit_prefetch
+
+        def run():
+            try:
+                # Pages aren't prefetched on the pool this runs on
+                self._full_sync(service, prefetch=False)
+            except Exception as e:
+                # The next sync() tries again; until then callers ask the API
+                logger.warning(
+                    "event cache sync failed for %s: %s", self.calendar_id, e
+                )
+            finally:
+                self._sync_lock.release()
+
+        try:
+            # The sync lock is released by the background sync when it is done
+            submit_prefetch(run)
+        except RuntimeError:
+            # The pool is shutting down
+            return False
+        return True
+
+    def _incremental_sync(self, service):
+        from googleapiclient.errors import HttpError
+
+        try:
+            pages = list(self._fetch(service, syncToken=self.sync_token))
+        except HttpError as e:
+            # The sync token expired, so start over with a full sync
+            if e.resp.status != 410:
+                raise
+            with self._lock:
+                self.sync_token = None
+                self.last_sync = 0.0
+            return
+
+        with self._lock:
+            for page in pages:
+                for event in page.get("items", []):
+                    start = event_timestamp(event.get("start", {}))
+                    if start is not None and start >= self.window_end:
+                        # Moved (or expanded) beyond the cached window
+                        self.remove(event.get("id"))
+                    else:
+                        self.upsert(event)
+            self.sync_token = pages[-1].get("nextSyncToken")
+            self.last_sync = time.monotonic()
+
+    def _full_sync(self, service, prefetch=None):
+        now = datetime.now(timezone.utc)
+        window_start = now - timedelta(days=SYNC_WINDOW_DAYS_BACK)
+        window_end = now + timedelta(days=SYNC_WINDOW_DAYS_AHEAD)
+
+        with self._lock:
+            self._writes = []
+        try:
+            events, sync_token = [], None
+            for page in self._fetch(
+                service,
+                prefetch=prefetch,
+                timeMin=window_start.isoformat(),
+                timeMax=window_end.isoformat(),
+            ):
+                events.extend(page.get("items", []))
+                sync_token = page.get("nextSyncToken")
+            index = self._build_index(events)
+        except Exception:
+            with self._lock:
+                self._writes = None
+            raise
+
+        # Swap in the new index, then replay what the tools wrote meanwhile
+        with self._lock:
+            writes, self._writes = self._writes, None
+            self.changed_at = time.monotonic()
+            (
+                self._events,
+                self._spans,
+                self._starts,
+                self._ids,
+                self._max_duration,
+            ) = index
+            for event_id, event in writes:
+                if event is None:
+                    self.remove(event_id)
+                else:
+                    self.upsert(event)
+            self.window_start = window_start.timestamp()
+            self.window_end = window_end.timestamp()
+            self.sync_token = sync_token
+            self.last_sync = time.monotonic()
+
+    @staticmethod
+    def _build_index(events):
+        # Sorting once is much cheaper than inserting every event of a full sync
+        latest = {event["id"]: event for event in events}
+        entries = []
+        for event in latest.values():
+            if event.get("status") == "cancelled":
+                continue
+            start = event_timestamp(event.get("start", {}))
+            end = event_timestamp(event.get("end", {}))
+            if start is None or end is None:
+                continue
+            entries.append((start, end, event))
+        entries.sort(key=lambda entry: entry[0])
+
+        spans = {entry[2]["id"]: (entry[0], entry[1]) for entry in entries}
+        max_duration = max((end - start for start, end, _ in entries), default=0.0)
+        return (
+            {event["id"]: event for _, _, event in entries},
+            spans,
+            [start for start, _, _ in entries],
+            [event["id"] for _, _, event in entries],
+            max_duration,
+        )
+
+    def _fetch(self, service, prefetch=None, **params):
+        # Pages are prefetched while the previous one is read
+        return iter_event_pages(
+            service,
+            prefetch=prefetch,
+            calendarId=self.calendar_id,
+            singleEvents=True,
+            maxResults=SYNC_PAGE_SIZE,
+            **params,
+        )
+
+
+# One cache per calendar, shared by all tools (per user in multi-tenant mode,
+# most recently used kept)
+_caches = LRUCache(maxsize=CREDENTIALS_CACHE_SIZE)
+_caches_lock = threading.Lock()
+
+
+def get_event_cache(calendar_id):
+    """
+    Get the shared event cache for a calendar.
+
+    In multi-tenant mode every user has their own caches ("primary" is a
+    different calendar for each of them).
+
+    Args:
+        calendar_id (str): The calendar ID (e.g. "primary")
+
+    Returns:
+        EventCache: The cache for that calendar
+    """
+    key = calendar_id
+    if get_credential_store() is not None:
+        key = (current_user.get(), calendar_id)
+
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = EventCache(calendar_id)
+        return cache
+
+
+def clear_event_caches():
+    """
+    Drop every calendar's cache (e.g. after switching accounts or backends).
+    """
+    with _caches_lock:
+        _caches.clear()
@@ -0,0 +1,134 @@
+"""
+Tool executor for Google Calendar integration.
+
+The calendar tools make blocking googleapiclient HTTP calls. Running them
+directly inside the ADK runner would stall the asyncio event loop that also
+serves every WebSocket, so they are dispatched to a bounded thread pool with
+per-tool concurrency limits and timeouts.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from streaming.metrics import TOOL_DURATION
+
+# Total number of worker threads shared by all tools
+TOOL_THREADS = int(os.environ.get("JARVIS_TOOL_THREADS", "8"))
+
+# Default seconds a tool call may take (including waiting for a free slot)
+DEFAULT_TIMEOUT = 20.0
+
+_executor = ThreadPoolExecutor(
+    max_workers=TOOL_THREADS, thread_name_prefix="jarvis-tool"
+)
+
+# Separate pool for work the tools start in the background (e.g. fetching the
+# next page of results), so a tool never waits on a slot held by another tool
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=TOOL_THREADS, thread_name_prefix="jarvis-prefetch"
+)
+
+# One semaphore per tool, created lazily inside the running event loop
+_semaphores = {}
+
+
+def _get_semaphore(name, max_concurrency):
+    semaphore = _semaphores.get(name)
+    if semaphore is None:
+        semaphore = _semaphores[name] = asyncio.Semaphore(max_concurrency)
+    return semaphore
+
+
+def run_in_executor(func, max_concurrency=4, timeout=DEFAULT_TIMEOUT):
+    """
+    Wrap a blocking tool function in an async function that runs it on the tool pool.
+
+    The wrapper keeps the original name, signature and docstring so ADK builds
+    the same function declaration for the model.
+
+    Args:
+        func (callable): The synchronous tool function
+        max_concurrency (int): Maximum calls of this tool running at once
+        timeout (float): Seconds before the call is abandoned with an error
+
+    Returns:
+        callable: An async version of the tool
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        status = "exception"
+        try:
+            status, result = await call(*args, **kwargs)
+            if status == "ok" and isinstance(result, dict):
+                status = "error" if result.get("status") == "error" else "ok"
+            return result
+        finally:
+            TOOL_DURATION.labels(name, status).observe(time.perf_counter() - started)
+
+    async def call(*args, **kwargs):
+        """
+        Run the tool on the pool.
+
+        Returns:
+            tuple: (status, result) where status is "ok", "busy" or "timeout"
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        semaphore = _get_semaphore(name, max_concurrency)
+
+        # Wait for a free slot for this tool
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            return "busy", {
+                "status": "error",
+                "message": f"{name} is busy, please try again in a moment.",
+            }
+
+        # Run in a copy of the caller's context, so the tool sees its session's user
+        context = contextvars.copy_context()
+        future = _executor.submit(context.run, functools.partial(func, *args, **kwargs))
+
+        # The slot is released when the thread finishes, even if we stop waiting,
+        # so a timed-out call still counts against the concurrency limit
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(semaphore.release))
+
+        try:
+            return "ok", await asyncio.wait_for(
+                asyncio.wrap_future(future), max(deadline - loop.time(), 0)
+            )
+        except asyncio.TimeoutError:
+            return "timeout", {
+                "status": "error",
+                "message": f"{name} timed out after {timeout:g} seconds.",
+            }
+
+    return wrapper
+
+
+def submit_prefetch(func, *args, **kwargs):
+    """
+    Run a blocking call in the background, e.g. to fetch data before it's needed.
+
+    Args:
+        func (callable): The function to call
+
+    Returns:
+        Future: The call's future
+    """
+    return _prefetch_executor.submit(func, *args, **kwargs)
+
+
+def shutdown_executor(wait=True):
+    """
+    Stop the tool thread pools (e.g. on application shutdown).
+    """
+    _executor.shutdown(wait=wait)
+    _prefetch_executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,299 @@
+"""
+Find free time tool for Google Calendar integration.
+
+Busy periods come from the Calendar freebusy endpoint (one request covers up
+to FREEBUSY_MAX_CALENDARS calendars), so no event bodies are transferred.
+Time outside working hours is added as busy as well, the intervals are merged
+with a sort-and-sweep pass, and the gaps long enough for the requested
+duration are the candidate slots. Large interval sets are merged vectorized
+over NumPy datetime64 arrays.
+"""
+
+import datetime
+from zoneinfo import ZoneInfo
+
+from .calendar_utils import get_calendar_service, get_calendar_timezone
+
+# Calendars per freebusy request (the API limit)
+FREEBUSY_MAX_CALENDARS = 50
+
+# Longest range searched in one call (days)
+MAX_DAYS = 62
+
+# Working hours used when none are given
+DEFAULT_WORK_START = "09:00"
+DEFAULT_WORK_END = "17:00"
+
+# Slot length used when none is given (minutes)
+DEFAULT_DURATION = 30
+
+# Most slots returned to the model
+MAX_SLOTS = 20
+
+# Interval count from which the merge runs on NumPy arrays
+NUMPY_MIN_INTERVALS = 512
+
+
+def merge_intervals(starts, ends):
+    """
+    Merge overlapping intervals with a sort-and-sweep pass.
+
+    Args:
+        starts (list): Interval starts (epoch seconds)
+        ends (list): Interval ends (epoch seconds)
+
+    Returns:
+        tuple: (starts, ends) of the merged, sorted, non-overlapping intervals
+    """
+    if len(starts) >= NUMPY_MIN_INTERVALS:
+        return _merge_intervals_numpy(starts, ends)
+
+    merged_starts, merged_ends = [], []
+    for start, end in sorted(zip(starts, ends)):
+        if merged_ends and start <= merged_ends[-1]:
+            # Overlaps or touches the current interval: extend it
+            if end > merged_ends[-1]:
+                merged_ends[-1] = end
+        else:
+            merged_starts.append(start)
+            merged_ends.append(end)
+    return merged_starts, merged_ends
+
+
+def _merge_intervals_numpy(starts, ends):
+    import numpy as np
+
+    starts = np.asarray(starts, dtype="datetime64[s]")
+    ends = np.asarray(ends, dtype="datetime64[s]")
+
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+
+    # An interval starts a new group when it begins after every earlier end
+    reach = np.maximum.accumulate(ends)
+    new_group = np.empty(len(starts), dtype=bool)
+    new_group[:1] = True
+    new_group[1:] = starts[1:] > reach[:-1]
+
+    first = np.flatnonzero(new_group)
+    last = np.append(first[1:] - 1, len(starts) - 1)
+    return (
+        starts[first].astype("int64").tolist(),
+        reach[last].astype("int64").tolist(),
+    )
+
+
+def _parse_time(value):
+    # Working hours as "HH:MM" or "HH:MM AM/PM"; "24:00" is the end of the day
+    if value.strip() == "24:00":
+        return datetime.timedelta(days=1)
+    for fmt in ("%H:%M", "%I:%M %p", "%I %p"):
+        try:
+            parsed = datetime.datetime.strptime(value.strip().upper(), fmt)
+            return datetime.timedelta(hours=parsed.hour, minutes=parsed.minute)
+        except ValueError:
+            continue
+    return None
+
+
+def _timestamp(value):
+    return int(
+        datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    )
+
+
+def _format_rfc3339(timestamp):
+    return (
+        datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+        .isoformat()
+        .replace("+00:00", "Z")
+    )
+
+
+def _query_busy(service, calendar_ids, time_min, time_max, timezone_id):
+    """
+    Collect busy periods from the freebusy endpoint.
+
+    Returns:
+        tuple: (starts, ends, failed) with epoch seconds and the calendars that failed
+    """
+    starts, ends, failed = [], [], []
+    for offset in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS):
+        chunk = calendar_ids[offset : offset + FREEBUSY_MAX_CALENDARS]
+        result = (
+            service.freebusy()
+            .query(
+                body={
+                    "timeMin": _format_rfc3339(time_min),
+                    "timeMax": _format_rfc3339(time_max),
+                    "timeZone": timezone_id,
+                    "items": [{"id": calendar_id} for calendar_id in chunk],
+                }
+            )
+            .execute()
+        )
+
+        for calendar_id, calendar in result.get("calendars", {}).items():
+            if calendar.get("errors"):
+                failed.append(calendar_id)
+                continue
+            for period in calendar.get("busy", []):
+                starts.append(_timestamp(period["start"]))
+                ends.append(_timestamp(period["end"]))
+    return starts, ends, failed
+
+
+def find_free_time(
+    start_date: str,
+    days: int,
+    duration_minutes: int,
+    work_start: str,
+    work_end: str,
+    calendar_ids: str,
+) -> dict:
+    """
+    Find free time slots across one or more calendars within working hours.
+
+    Args:
+        start_date (str): Start date in YYYY-MM-DD format. If empty string, defaults to today.
+        days (int): Number of days to search. Use 1 for today only, 7 for a week, etc.
+        duration_minutes (int): Minimum length of a free slot in minutes (e.g. 30)
+        work_start (str): Start of the working day (e.g. "09:00"), empty string for 09:00
+        work_end (str): End of the working day (e.g. "17:00"), empty string for 17:00
+        calendar_ids (str): Comma-separated calendar IDs to check, empty string for "primary"
+
+    Returns:
+        dict: The free slots found or error details
+    """
+    try:
+        # Get calendar service
+        service = get_calendar_service()
+        if not service:
+            return {
+                "status": "error",
+                "message": "Failed to authenticate with Google Calendar. Please check credentials.",
+                "slots": [],
+            }
+
+        calendars = [c.strip() for c in (calendar_ids or "").split(",") if c.strip()]
+        calendars = calendars or ["primary"]
+
+        # Working hours and slot length
+        day_start = _parse_time(work_start or DEFAULT_WORK_START)
+        day_end = _parse_time(work_end or DEFAULT_WORK_END)
+        if day_start is None or day_end is None or day_end <= day_start:
+            return {
+                "status": "error",
+                "message": "Invalid working hours. Use HH:MM format, e.g. 09:00 and 17:00.",
+                "slots": [],
+            }
+        if duration_minutes is not None and duration_minutes <= 0:
+            return {
+                "status": "error",
+                "message": "duration_minutes must be a positive number of minutes, e.g. 30.",
+                "slots": [],
+            }
+        min_seconds = (duration_minutes or DEFAULT_DURATION) * 60
+        days = min(max(days or 1, 1), MAX_DAYS)
+
+        # Search range in the calendar's timezone, starting no earlier than now
+        timezone_id = get_calendar_timezone(service, "primary")
+        zone = ZoneInfo(timezone_id)
+        now = datetime.datetime.now(zone)
+        if not start_date or start_date.strip() == "":
+            first_day = now.date()
+        else:
+            try:
+                first_day = datetime.datetime.strptime(start_date, "%Y-%m-%d").date()
+            except ValueError:
+                return {
+                    "status": "error",
+                    "message": f"Invalid date format: {start_date}. Use YYYY-MM-DD format.",
+                    "slots": [],
+                }
+
+        def local_timestamp(day, offset):
+            midnight = datetime.datetime.combine(day, datetime.time(), zone)
+            return int((midnight + offset).timestamp())
+
+        last_day = first_day + datetime.timedelta(days=days)
+        range_start = max(
+            local_timestamp(first_day, datetime.timedelta()), int(now.timestamp())
+        )
+        range_end = local_timestamp(last_day, datetime.timedelta())
+        if range_end <= range_start:
+            return {
+                "status": "success",
+                "message": "The requested range is already over.",
+                "slots": [],
+            }
+
+        starts, ends, failed = _query_busy(
+            service, calendars, range_start, range_end, timezone_id
+        )
+
+        # Time outside working hours counts as busy
+        for index in range(days):
+            day = first_day + datetime.timedelta(days=index)
+            starts += [
+                local_timestamp(day, datetime.timedelta()),
+                local_timestamp(day, day_end),
+            ]
+            ends += [
+                local_timestamp(day, day_start),
+                local_timestamp(day, datetime.timedelta(days=1)),
+            ]
+
+        busy_starts, busy_ends = merge_intervals(starts, ends)
+
+        # Free slots are the gaps between busy intervals inside the range
+        slots = []
+        cursor = range_start
+        for busy_start, busy_end in zip(
+            busy_starts + [range_end], busy_ends + [range_end]
+        ):
+            gap_end = min(busy_start, range_end)
+            if gap_end - cursor >= min_seconds:
+                slots.append((cursor, gap_end))
+            cursor = max(cursor, busy_end)
+            if cursor >= range_end:
+                break
+
+        if not slots:
+            return {
+                "status": "success",
+                "message": "No free slots found.",
+                "slots": [],
+            }
+
+        def local(timestamp):
+            return datetime.datetime.fromtimestamp(timestamp, zone).strftime(
+                "%Y-%m-%d %I:%M %p"
+            )
+
+        result = {
+            "status": "success",
+            "message": f"Found {len(slots)} free slot(s) of at least "
+            f"{min_seconds // 60} minutes.",
+            "timezone": timezone_id,
+            "slots": [
+                {
+                    "start": local(start),
+                    "end": local(end),
+                    "minutes": (end - start) // 60,
+                }
+                for start, end in slots[:MAX_SLOTS]
+            ],
+        }
+        if len(slots) > MAX_SLOTS:
+            result["message"] += f" Showing the first {MAX_SLOTS}."
+        if failed:
+            result["unavailable_calendars"] = failed
+        return result
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error finding free time: {str(e)}",
+            "slots": [],
+        }
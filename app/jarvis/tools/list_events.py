@@ -1,15 +1,156 @@
 """
 List events tool for Google Calendar integration.
+
+Results are projected to what the model needs before they are returned:
+the compact detail level keeps the time, title and location of each event,
+and "full" adds shortened descriptions, attendees and links. The API is
+asked for the same fields only (a partial response). When the formatted
+events would exceed TOKEN_BUDGET, full events are made compact first, and
+events that still don't fit are summarized as counts per day.
+
+Ranges the event cache doesn't cover are read page by page as a stream,
+up to MAX_EVENTS, so long or busy ranges are no longer cut off at one page
+and memory stays bounded by the budget rather than by the range.
 """
 
 import datetime
+import json
+import logging
+import os
+
+from .calendar_utils import format_event_time, get_calendar_service, iter_events
+from .credentials import current_user
+from .event_cache import get_event_cache
+from .session_events import lookup_session_events
+
+logger = logging.getLogger(__name__)
+
+# Approximate tokens a list_events result may use (0 for no limit)
+TOKEN_BUDGET = int(os.environ.get("JARVIS_LIST_EVENTS_BUDGET", "2000"))
+
+# Most events read for one call (the rest of the range is not fetched)
+MAX_EVENTS = 2500
+
+# Events per API page; later pages are fetched while earlier ones are formatted
+PAGE_SIZE = 250
+
+# Longest description returned at the full detail level (characters)
+DESCRIPTION_MAX_CHARS = 200
+
+# Most attendees listed per event at the full detail level
+MAX_ATTENDEES = 10
+
+# Event fields requested from the API for each detail level
+COMPACT_FIELDS = "id,summary,start,end,location"
+FULL_FIELDS = COMPACT_FIELDS + ",description,attendees(email),htmlLink"
+
+
+def estimate_tokens(value):
+    """
+    Estimate the tokens a tool result costs the model (about 4 bytes per token of JSON).
+
+    Args:
+        value: A JSON-serializable tool result or part of one
+
+    Returns:
+        int: Approximate token count
+    """
+    return len(json.dumps(value, separators=(",", ":"))) // 4 + 1
+
+
+def _shorten(text, limit):
+    # Collapse whitespace and cut at a word boundary
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "..."
+
+
+def _format_event(event, detail):
+    formatted_event = {
+        "id": event.get("id"),
+        "summary": event.get("summary", "Untitled Event"),
+        "start": format_event_time(event.get("start", {})),
+        "end": format_event_time(event.get("end", {})),
+    }
+    if event.get("location"):
+        formatted_event["location"] = event["location"]
+    if detail != "full":
+        return formatted_event
+
+    if event.get("description"):
+        formatted_event["description"] = _shorten(
+            event["description"], DESCRIPTION_MAX_CHARS
+        )
+    attendees = [
+        attendee.get("email")
+        for attendee in event.get("attendees", [])
+        if "email" in attendee
+    ]
+    if attendees:
+        formatted_event["attendees"] = attendees[:MAX_ATTENDEES]
+        if len(attendees) > MAX_ATTENDEES:
+            formatted_event["more_attendees"] = len(attendees) - MAX_ATTENDEES
+    if event.get("htmlLink"):
+        formatted_event["link"] = event["htmlLink"]
+    return formatted_event
 
-from .calendar_utils import format_event_time, get_calendar_service
+
+def _count_day(counts, day):
+    counts[day] = counts.get(day, 0) + 1
+
+
+def _fit_budget(events, detail, budget):
+    """
+    Format a stream of events within a token budget.
+
+    Events are consumed one at a time and only the ones that fit are kept,
+    so memory stays bounded however many events the range holds.
+
+    Returns:
+        tuple: (formatted events, per-day counts of the events left out, events seen)
+    """
+    kept, formatted_events, left_out = [], [], {}
+    used = 0
+    seen = 0
+    for event in events:
+        seen += 1
+        if left_out:
+            # The budget is spent: only count the rest
+            _count_day(left_out, format_event_time(event.get("start", {}))[:10])
+            continue
+
+        formatted_event = _format_event(event, detail)
+        size = estimate_tokens(formatted_event)
+        if budget and used + size > budget and detail == "full":
+            # Drop descriptions and attendees before dropping events
+            detail = "compact"
+            formatted_events = [_format_event(e, detail) for e in kept]
+            used = sum(estimate_tokens(e) for e in formatted_events)
+            formatted_event = _format_event(event, detail)
+            size = estimate_tokens(formatted_event)
+
+        if budget and used + size > budget:
+            # Keep the earliest events that fit, leaving room for the per-day counts
+            _count_day(left_out, formatted_event["start"][:10])
+            while formatted_events and used + estimate_tokens(left_out) > budget:
+                dropped = formatted_events.pop()
+                kept.pop()
+                used -= estimate_tokens(dropped)
+                _count_day(left_out, dropped["start"][:10])
+            continue
+
+        kept.append(event)
+        formatted_events.append(formatted_event)
+        used += size
+
+    return formatted_events, dict(sorted(left_out.items())), seen
 
 
 def list_events(
     start_date: str,
     days: int,
+    detail: str,
 ) -> dict:
     """
     List upcoming calendar events within a specified date range.
@@ -17,14 +158,16 @@ def list_events(
     Args:
         start_date (str): Start date in YYYY-MM-DD format. If empty string, defaults to today.
         days (int): Number of days to look ahead. Use 1 for today only, 7 for a week, 30 for a month, etc.
+        detail (str): "full" to include descriptions, attendees and links; empty string for times, titles and locations only
 
     Returns:
         dict: Information about upcoming events or error details
     """
     try:
-        print("Listing events")
-        print("Start date: ", start_date)
-        print("Days: ", days)
+        logger.debug(
+            "listing events",
+            extra={"start_date": start_date, "days": days, "detail": detail},
+        )
         # Get calendar service
         service = get_calendar_service()
         if not service:
@@ -34,12 +177,12 @@ def list_events(
                 "events": [],
             }
 
-        # Always use a large max_results value to return all events
-        max_results = 100
-
         # Always use primary calendar
         calendar_id = "primary"
 
+        # Anything but "full" gets the compact projection
+        detail = "full" if (detail or "").strip().lower() == "full" else "compact"
+
         # Set time range
         if not start_date or start_date.strip() == "":
             start_time = datetime.datetime.utcnow()
@@ -59,57 +202,66 @@ def list_events(
 
         end_time = start_time + datetime.timedelta(days=days)
 
-        # Format times for API call
-        time_min = start_time.isoformat() + "Z"
-        time_max = end_time.isoformat() + "Z"
-
-        # Call the Calendar API
-        events_result = (
-            service.events()
-            .list(
-                calendarId=calendar_id,
-                timeMin=time_min,
-                timeMax=time_max,
-                maxResults=max_results,
-                singleEvents=True,
-                orderBy="startTime",
-            )
-            .execute()
+        # Events prefetched when the session connected answer without a request
+        events = lookup_session_events(
+            current_user.get(), start_time, end_time, calendar_id
         )
 
-        events = events_result.get("items", [])
+        if events is None:
+            # Answer from the local event cache when it covers the requested range
+            cache = get_event_cache(calendar_id)
+            # The first sync runs in the background; the API answers until it is done
+            cache.sync(service, wait=False)
+
+            if cache.covers(start_time, end_time):
+                events = cache.query(start_time, end_time)[:MAX_EVENTS]
+            else:
+                # Format times for API call
+                time_min = start_time.isoformat() + "Z"
+                time_max = end_time.isoformat() + "Z"
+
+                # Stream the Calendar API's pages, fetching each one only when needed
+                events = iter_events(
+                    service,
+                    limit=MAX_EVENTS,
+                    calendarId=calendar_id,
+                    timeMin=time_min,
+                    timeMax=time_max,
+                    maxResults=PAGE_SIZE,
+                    singleEvents=True,
+                    orderBy="startTime",
+                    fields="nextPageToken,items({})".format(
+                        FULL_FIELDS if detail == "full" else COMPACT_FIELDS
+                    ),
+                )
 
-        if not events:
+        # Format events for display, within the token budget
+        formatted_events, left_out, found = _fit_budget(events, detail, TOKEN_BUDGET)
+
+        if not found:
             return {
                 "status": "success",
                 "message": "No upcoming events found.",
                 "events": [],
             }
 
-        # Format events for display
-        formatted_events = []
-        for event in events:
-            formatted_event = {
-                "id": event.get("id"),
-                "summary": event.get("summary", "Untitled Event"),
-                "start": format_event_time(event.get("start", {})),
-                "end": format_event_time(event.get("end", {})),
-                "location": event.get("location", ""),
-                "description": event.get("description", ""),
-                "attendees": [
-                    attendee.get("email")
-                    for attendee in event.get("attendees", [])
-                    if "email" in attendee
-                ],
-                "link": event.get("htmlLink", ""),
-            }
-            formatted_events.append(formatted_event)
-
-        return {
+        result = {
             "status": "success",
-            "message": f"Found {len(formatted_events)} event(s).",
+            "message": f"Found {found} event(s).",
             "events": formatted_events,
         }
+        if found >= MAX_EVENTS:
+            result["message"] = (
+                f"Found at least {MAX_EVENTS} events; only the first"
+                f" {MAX_EVENTS} were read."
+            )
+        if left_out:
+            result["message"] += (
+                f" Showing the first {len(formatted_events)}; the rest are"
+                " counted per day in more_events."
+            )
+            result["more_events"] = left_out
+        return result
 
     except Exception as e:
         return {
@@ -0,0 +1,561 @@
+"""
+Local calendar backend for offline development and benchmarking.
+
+LocalCalendarService mimics the parts of the googleapiclient Calendar v3
+service the tools use (events list/get/insert/update/patch/delete, settings,
+calendars, freebusy and batch requests), so get_calendar_service() can return
+it in place of the Google service without the tools noticing. Events live in
+SQLite, either in memory or in a file.
+
+Like the real API it returns events with normalized RFC 3339 times, ETags and
+sync tokens, keeps deleted events as "cancelled" tombstones for incremental
+sync, honours If-Match headers and fields selectors (partial responses), and
+raises googleapiclient HttpError for 404, 410 and 412 responses.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from .event_cache import event_timestamp, to_timestamp
+
+# Default and maximum page size of events().list, as in the Calendar API
+DEFAULT_PAGE_SIZE = 250
+MAX_PAGE_SIZE = 2500
+
+# Maximum requests in one batch (the googleapiclient limit)
+MAX_BATCH_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, id)
+);
+CREATE INDEX IF NOT EXISTS events_by_start ON events (calendar_id, start_ts);
+CREATE INDEX IF NOT EXISTS events_by_seq ON events (calendar_id, seq);
+"""
+
+
+def http_error(status, message):
+    """
+    Build the HttpError the Google client raises for an error response.
+
+    Args:
+        status (int): HTTP status code
+        message (str): Error message
+
+    Returns:
+        HttpError: The exception to raise
+    """
+    import httplib2
+    from googleapiclient.errors import HttpError
+
+    response = httplib2.Response({"status": status})
+    response.reason = message
+    content = json.dumps({"error": {"code": status, "message": message}})
+    return HttpError(response, content.encode("utf-8"))
+
+
+def parse_rfc3339(value):
+    """
+    Parse an RFC 3339 timestamp into a UTC epoch timestamp (naive times are UTC).
+    """
+    try:
+        return to_timestamp(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    except (AttributeError, ValueError):
+        raise http_error(400, f"Invalid time value: {value}")
+
+
+def format_rfc3339(timestamp):
+    """
+    Format a UTC epoch timestamp as RFC 3339.
+    """
+    return (
+        datetime.fromtimestamp(timestamp, timezone.utc)
+        .isoformat()
+        .replace("+00:00", "Z")
+    )
+
+
+def parse_fields(spec):
+    """
+    Parse a partial-response fields selector such as "nextPageToken,items(id,start)".
+
+    Args:
+        spec (str): The fields parameter of an API call
+
+    Returns:
+        dict: Selected field names, each mapped to its sub-selection ({} for all of it)
+    """
+    tree = {}
+    stack = [tree]
+    name = ""
+    for char in spec + ",":
+        if char == "(":
+            stack.append(stack[-1].setdefault(name.strip(), {}))
+            name = ""
+        elif char in ",)":
+            if name.strip():
+                stack[-1].setdefault(name.strip(), {})
+            if char == ")":
+                stack.pop()
+            name = ""
+        else:
+            name += char
+    return tree
+
+
+def select_fields(value, tree):
+    """
+    Keep only the selected fields of an API response.
+
+    Args:
+        value: The response (or part of it)
+        tree (dict): Selection from parse_fields()
+
+    Returns:
+        The response with only the selected fields
+    """
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [select_fields(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: select_fields(value[key], sub_tree)
+            for key, sub_tree in tree.items()
+            if key in value
+        }
+    return value
+
+
+def merge_patch(resource, patch):
+    """
+    Apply patch semantics: nested objects are merged and null fields are removed.
+
+    Args:
+        resource (dict): The stored resource
+        patch (dict): The patch body
+
+    Returns:
+        dict: The patched resource
+    """
+    merged = dict(resource)
+    for key, value in patch.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_patch(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class LocalRequest:
+    """
+    A prepared API call, executed with execute() like a googleapiclient HttpRequest.
+    """
+
+    def __init__(self, handler, method_id, **params):
+        self._handler = handler
+        self._params = params
+        self.methodId = method_id
+        self.headers = {}
+
+    def execute(self, http=None, num_retries=0):
+        params = dict(self._params)
+        fields = params.pop("fields", None)
+        result = self._handler(self.headers, **params)
+        if fields and result is not None:
+            # Partial response, as requested with the fields parameter
+            result = select_fields(result, parse_fields(fields))
+        return result
+
+
+class LocalBatchRequest:
+    """
+    Batch of requests executed in order, like googleapiclient's BatchHttpRequest.
+    """
+
+    def __init__(self, callback=None):
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        if len(self._requests) >= MAX_BATCH_SIZE:
+            from googleapiclient.errors import BatchError
+
+            raise BatchError(
+                f"Exceeded the maximum calls({MAX_BATCH_SIZE}) in a single batch request."
+            )
+        if request_id is None:
+            request_id = str(len(self._requests) + 1)
+        self._requests.append((request_id, request, callback))
+
+    def execute(self, http=None):
+        from googleapiclient.errors import HttpError
+
+        for request_id, request, callback in self._requests:
+            response, exception = None, None
+            try:
+                response = request.execute()
+            except HttpError as e:
+                exception = e
+
+            for handler in (callback, self._callback):
+                if handler is not None:
+                    handler(request_id, response, exception)
+
+
+class _Resource:
+    """
+    A collection (events, settings, ...) whose methods build LocalRequests.
+    """
+
+    def __init__(self, kind, **methods):
+        self._kind = kind
+        self._methods = methods
+
+    def __getattr__(self, name):
+        handler = self._methods.get(name)
+        if handler is None:
+            raise AttributeError(name)
+
+        def build(**params):
+            return LocalRequest(handler, f"calendar.{self._kind}.{name}", **params)
+
+        return build
+
+
+class LocalCalendarService:
+    """
+    SQLite-backed stand-in for the Google Calendar v3 service.
+    """
+
+    def __init__(self, path=":memory:", timezone_id="America/New_York"):
+        """
+        Args:
+            path (str): SQLite database file, or ":memory:"
+            timezone_id (str): Timezone reported by the calendar settings
+        """
+        self.timezone_id = timezone_id
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+        row = self._db.execute(
+            "SELECT MAX(seq), MAX(end_ts - start_ts) FROM events"
+        ).fetchone()
+        self._seq = row[0] or 0
+        self._max_duration = row[1] or 0.0
+
+    #
+    # Resources
+    #
+
+    def events(self):
+        return _Resource(
+            "events",
+            list=self._list_events,
+            get=self._get_event,
+            insert=self._insert_event,
+            update=self._update_event,
+            patch=self._patch_event,
+            delete=self._delete_event,
+        )
+
+    def settings(self):
+        return _Resource("settings", get=self._get_setting)
+
+    def calendars(self):
+        return _Resource("calendars", get=self._get_calendar)
+
+    def freebusy(self):
+        return _Resource("freebusy", query=self._query_freebusy)
+
+    def new_batch_http_request(self, callback=None):
+        return LocalBatchRequest(callback)
+
+    #
+    # Bulk loading (benchmarks and fixtures)
+    #
+
+    def load_events(self, events, calendar_id="primary"):
+        """
+        Add many events at once, without going through events().insert().
+
+        Args:
+            events (iterable): Event bodies (without IDs)
+            calendar_id (str): The calendar to add them to
+
+        Returns:
+            list: The IDs of the added events
+        """
+        with self._lock:
+            rows = [
+                self._row(calendar_id, *self._prepare(body, uuid.uuid4().hex))
+                for body in events
+            ]
+            self._db.executemany(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+        return [row[1] for row in rows]
+
+    #
+    # Helpers
+    #
+
+    def _prepare(self, body, event_id, created=None):
+        """
+        Normalize an event body and stamp it with a new sequence number.
+
+        Returns:
+            tuple: (event, start_ts, end_ts)
+        """
+        self._seq += 1
+        now = format_rfc3339(time.time())
+        event = {
+            **body,
+            "kind": "calendar#event",
+            "id": event_id,
+            "status": body.get("status", "confirmed"),
+            "etag": f'"{self._seq}"',
+            "htmlLink": f"https://calendar.local/event?eid={event_id}",
+            "iCalUID": f"{event_id}@calendar.local",
+            "created": created or now,
+            "updated": now,
+        }
+
+        for key in ("start", "end"):
+            if key not in event:
+                raise http_error(400, f"Missing {key} time.")
+            event[key] = self._normalize_time(event[key])
+
+        start = event_timestamp(event["start"])
+        end = event_timestamp(event["end"])
+        if start is None or end is None:
+            raise http_error(400, "Invalid start or end time.")
+        if end < start:
+            raise http_error(400, "The specified time range is empty.")
+
+        self._max_duration = max(self._max_duration, end - start)
+        return event, start, end
+
+    def _normalize_time(self, event_time):
+        # Naive local times are interpreted in the event's (or calendar's) timezone
+        if "dateTime" not in event_time:
+            return dict(event_time)
+        try:
+            dt = datetime.fromisoformat(event_time["dateTime"].replace("Z", "+00:00"))
+            if dt.tzinfo is None:
+                zone = ZoneInfo(event_time.get("timeZone") or self.timezone_id)
+                dt = dt.replace(tzinfo=zone)
+        except (ValueError, ZoneInfoNotFoundError) as e:
+            raise http_error(400, f"Invalid time: {e}")
+        return {**event_time, "dateTime": dt.isoformat()}
+
+    def _row(self, calendar_id, event, start, end):
+        return (
+            calendar_id,
+            event["id"],
+            self._seq,
+            event["status"],
+            start,
+            end,
+            json.dumps(event),
+        )
+
+    def _load(self, calendar_id, event_id):
+        row = self._db.execute(
+            "SELECT body FROM events WHERE calendar_id = ? AND id = ?",
+            (calendar_id, event_id),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _load_live(self, headers, calendar_id, event_id):
+        event = self._load(calendar_id, event_id)
+        if event is None:
+            raise http_error(404, "Not Found")
+        if event["status"] == "cancelled":
+            raise http_error(410, "Resource has been deleted")
+
+        expected = headers.get("If-Match")
+        if expected and expected != "*" and expected != event["etag"]:
+            raise http_error(412, "Precondition Failed")
+        return event
+
+    def _store(self, calendar_id, body, event_id, created=None):
+        event, start, end = self._prepare(body, event_id, created)
+        self._db.execute(
+            "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self._row(calendar_id, event, start, end),
+        )
+        self._db.commit()
+        return event
+
+    #
+    # events()
+    #
+
+    def _list_events(
+        self,
+        headers,
+        calendarId,
+        timeMin=None,
+        timeMax=None,
+        maxResults=None,
+        pageToken=None,
+        syncToken=None,
+        showDeleted=False,
+        **ignored,
+    ):
+        limit = min(maxResults or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        offset = int(pageToken or 0)
+
+        with self._lock:
+            if syncToken is not None:
+                # Incremental sync: everything changed since the token, deletions included
+                if not syncToken.isdigit() or int(syncToken) > self._seq:
+                    raise http_error(410, "Sync token is no longer valid.")
+                query = "SELECT body FROM events WHERE calendar_id = ? AND seq > ?"
+                args = [calendarId, int(syncToken)]
+                order = "seq"
+            else:
+                query = "SELECT body FROM events WHERE calendar_id = ?"
+                args = [calendarId]
+                order = "start_ts, id"
+                if not showDeleted:
+                    query += " AND status != 'cancelled'"
+                if timeMax is not None:
+                    query += " AND start_ts < ?"
+                    args.append(parse_rfc3339(timeMax))
+                if timeMin is not None:
+                    # Only events starting within the longest duration can overlap
+                    time_min = parse_rfc3339(timeMin)
+                    query += " AND start_ts >= ? AND end_ts > ?"
+                    args += [time_min - self._max_duration, time_min]
+
+            rows = self._db.execute(
+                f"{query} ORDER BY {order} LIMIT ? OFFSET ?",
+                args + [limit + 1, offset],
+            ).fetchall()
+            seq = self._seq
+
+        result = {
+            "kind": "calendar#events",
+            "timeZone": self.timezone_id,
+            "items": [json.loads(row[0]) for row in rows[:limit]],
+        }
+        if len(rows) > limit:
+            result["nextPageToken"] = str(offset + limit)
+        else:
+            result["nextSyncToken"] = str(seq)
+        return result
+
+    def _get_event(self, headers, calendarId, eventId, **ignored):
+        with self._lock:
+            event = self._load(calendarId, eventId)
+        if event is None or event["status"] == "cancelled":
+            raise http_error(404, "Not Found")
+        return event
+
+    def _insert_event(self, headers, calendarId, body, **ignored):
+        with self._lock:
+            return self._store(calendarId, body, uuid.uuid4().hex)
+
+    def _update_event(self, headers, calendarId, eventId, body, **ignored):
+        with self._lock:
+            event = self._load_live(headers, calendarId, eventId)
+            return self._store(calendarId, body, eventId, event["created"])
+
+    def _patch_event(self, headers, calendarId, eventId, body, **ignored):
+        with self._lock:
+            event = self._load_live(headers, calendarId, eventId)
+            return self._store(
+                calendarId, merge_patch(event, body), eventId, event["created"]
+            )
+
+    def _delete_event(self, headers, calendarId, eventId, **ignored):
+        with self._lock:
+            event = self._load_live(headers, calendarId, eventId)
+            event["status"] = "cancelled"
+            self._store(calendarId, event, eventId, event["created"])
+        return ""
+
+    #
+    # settings(), calendars() and freebusy()
+    #
+
+    def _get_setting(self, headers, setting, **ignored):
+        if setting != "timezone":
+            raise http_error(404, "Not Found")
+        return {"kind": "calendar#setting", "id": "timezone", "value": self.timezone_id}
+
+    def _get_calendar(self, headers, calendarId, **ignored):
+        return {
+            "kind": "calendar#calendar",
+            "id": calendarId,
+            "timeZone": self.timezone_id,
+        }
+
+    def _query_freebusy(self, headers, body, **ignored):
+        time_min = parse_rfc3339(body["timeMin"])
+        time_max = parse_rfc3339(body["timeMax"])
+
+        calendars = {}
+        with self._lock:
+            for item in body.get("items", []):
+                # Transparent ("show me as available") events don't block time
+                rows = self._db.execute(
+                    "SELECT start_ts, end_ts FROM events WHERE calendar_id = ? "
+                    "AND status != 'cancelled' AND start_ts < ? AND start_ts >= ? "
+                    "AND end_ts > ? AND IFNULL(json_extract(body, '$.transparency'), "
+                    "'opaque') != 'transparent' ORDER BY start_ts",
+                    (item["id"], time_max, time_min - self._max_duration, time_min),
+                ).fetchall()
+
+                calendars[item["id"]] = {
+                    "busy": [
+                        {
+                            "start": format_rfc3339(max(start, time_min)),
+                            "end": format_rfc3339(min(end, time_max)),
+                        }
+                        for start, end in rows
+                    ]
+                }
+
+        return {
+            "kind": "calendar#freeBusy",
+            "timeMin": body["timeMin"],
+            "timeMax": body["timeMax"],
+            "calendars": calendars,
+        }
+
+
+def open_local_calendar(url, timezone_id="America/New_York"):
+    """
+    Open a local calendar backend from its URL.
+
+    Args:
+        url (str): "memory" or "sqlite:///path/to/calendar.db"
+        timezone_id (str): Timezone reported by the calendar settings
+
+    Returns:
+        LocalCalendarService: The backend
+    """
+    if url == "memory":
+        return LocalCalendarService(":memory:", timezone_id)
+    if url.startswith("sqlite:///"):
+        return LocalCalendarService(url[len("sqlite:///") :], timezone_id)
+    raise ValueError(f"Unsupported calendar backend: {url}")
@@ -0,0 +1,258 @@
+"""
+Upcoming events prefetched when a voice session connects.
+
+prefetch_session_events() is called as soon as the WebSocket is accepted. It
+fetches this week's events, then the calendar timezone, on the prefetch pool
+while the user is still speaking, so the first "what do I have today?" is
+answered without waiting on the Calendar API. The result is kept per user
+and list_events reads it first, as long as it is fresher than PREFETCH_TTL,
+covers the requested range and nothing was written to the calendar from this
+process since it was fetched. Changes made elsewhere (another device, the
+Calendar web UI) are not detected: they show up once PREFETCH_TTL expires,
+which is why it is kept short.
+
+The prefetched events (with their ETags) also seed the calendar's event
+cache, so an edit right after "what do I have today?" needs no extra read.
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from cachetools import TTLCache
+from streaming.metrics import PREFETCH_LOOKUPS
+
+from .calendar_utils import get_calendar_service, get_calendar_timezone, iter_events
+from .credentials import set_current_user
+from .event_cache import event_timestamp, get_event_cache, to_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Set to "0" to disable the prefetch on connect
+PREFETCH_ENABLED = os.environ.get("JARVIS_PREFETCH", "1") == "1"
+
+# Seconds prefetched events are used before list_events asks the calendar again
+PREFETCH_TTL = float(os.environ.get("JARVIS_PREFETCH_TTL", "60"))
+
+# Days prefetched, starting today
+PREFETCH_DAYS = 7
+
+# Most events prefetched per session (one page)
+PREFETCH_MAX_EVENTS = 500
+
+# Seconds list_events waits for a prefetch that is still running
+PREFETCH_WAIT = 5.0
+
+# Sessions whose events are kept
+MAX_SESSIONS = 1024
+
+
+class SessionEvents:
+    """
+    The events of one calendar over a time window, as fetched for one session.
+    """
+
+    def __init__(self, calendar_id, window_start, window_end, events, fetched_at):
+        """
+        Args:
+            calendar_id (str): The calendar the events belong to
+            window_start (float): Start of the fetched window (epoch seconds)
+            window_end (float): End of the fetched window (epoch seconds)
+            events (list): Event resources ordered by start time
+            fetched_at (float): time.monotonic() when the fetch started
+        """
+        self.calendar_id = calendar_id
+        self.window_start = window_start
+        self.window_end = window_end
+        self.events = events
+        self.fetched_at = fetched_at
+
+    def covers(self, time_min, time_max):
+        """
+        Check whether [time_min, time_max) lies inside the fetched window.
+        """
+        return (
+            to_timestamp(time_min) >= self.window_start
+            and to_timestamp(time_max) <= self.window_end
+        )
+
+    def query(self, time_min, time_max):
+        """
+        Return the events overlapping [time_min, time_max), ordered by start time.
+        """
+        lo_ts = to_timestamp(time_min)
+        hi_ts = to_timestamp(time_max)
+        return [
+            event
+            for event in self.events
+            if event_timestamp(event.get("start", {})) < hi_ts
+            and event_timestamp(event.get("end", {})) > lo_ts
+        ]
+
+
+# Prefetched events per user, dropped after PREFETCH_TTL
+_sessions = TTLCache(maxsize=MAX_SESSIONS, ttl=PREFETCH_TTL)
+
+# Set when a running prefetch has stored (or given up on) its events, per user
+_pending = {}
+_lock = threading.Lock()
+
+
+def _prefetch(user_id, calendar_id, ready):
+    try:
+        _fetch_session_events(user_id, calendar_id, ready)
+    except Exception as e:
+        # The first list_events call simply asks the calendar itself
+        logger.warning("event prefetch failed for %s: %s", user_id, e)
+    finally:
+        ready.set()
+        with _lock:
+            if _pending.get(user_id) is ready:
+                del _pending[user_id]
+
+
+def _fetch_session_events(user_id, calendar_id, ready):
+    from .list_events import FULL_FIELDS
+
+    set_current_user(user_id)
+    service = get_calendar_service()
+    if not service:
+        return
+
+    # list_events takes dates as UTC midnights; starting a day before UTC today
+    # covers "today" in every timezone without waiting for the calendar's
+    now = datetime.now(timezone.utc)
+    window_start = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(
+        days=1
+    )
+    window_end = window_start + timedelta(days=PREFETCH_DAYS + 2)
+
+    # Anything written after this moment invalidates the result
+    fetched_at = time.monotonic()
+    events = list(
+        iter_events(
+            service,
+            limit=PREFETCH_MAX_EVENTS,
+            calendarId=calendar_id,
+            timeMin=window_start.isoformat(),
+            timeMax=window_end.isoformat(),
+            maxResults=PREFETCH_MAX_EVENTS,
+            singleEvents=True,
+            orderBy="startTime",
+            fields=f"nextPageToken,items({FULL_FIELDS},etag)",
+        )
+    )
+    if len(events) >= PREFETCH_MAX_EVENTS:
+        # A partial window can't answer range queries
+        return
+
+    entry = SessionEvents(
+        calendar_id,
+        window_start.timestamp(),
+        window_end.timestamp(),
+        events,
+        fetched_at,
+    )
+    with _lock:
+        _sessions[user_id] = entry
+    ready.set()
+
+    # Edits of these events then have their ETags without reading them first
+    get_event_cache(calendar_id).seed(events, fetched_at)
+
+    # Every tool that writes needs the timezone, so warm it once the events are in
+    get_calendar_timezone(service, calendar_id)
+
+
+def prefetch_session_events(user_id, calendar_id="primary"):
+    """
+    Start fetching a session's upcoming events and calendar timezone in the background.
+
+    Args:
+        user_id (str): The signed-in user whose session just connected
+        calendar_id (str): The calendar to prefetch
+    """
+    from .executor import submit_prefetch
+
+    if not PREFETCH_ENABLED:
+        return
+
+    with _lock:
+        # Already fetched (e.g. a reconnect) or being fetched
+        if user_id in _sessions or user_id in _pending:
+            return
+        ready = threading.Event()
+        _pending[user_id] = ready
+
+    try:
+        # A fresh context, so the worker thread's user isn't changed for other work
+        submit_prefetch(
+            contextvars.Context().run, _prefetch, user_id, calendar_id, ready
+        )
+    except RuntimeError:
+        # The pool is shutting down
+        with _lock:
+            _pending.pop(user_id, None)
+        ready.set()
+
+
+def lookup_session_events(
+    user_id, time_min, time_max, calendar_id="primary", wait=PREFETCH_WAIT
+):
+    """
+    Answer a range query from a session's prefetched events, if they are still valid.
+
+    A prefetch that is still running is waited for (up to `wait` seconds),
+    since it is already one round trip ahead of a new request.
+
+    Args:
+        user_id (str): The user the tool call acts for
+        time_min (datetime): Start of the range
+        time_max (datetime): End of the range
+        calendar_id (str): The calendar being read
+        wait (float): Seconds to wait for a running prefetch
+
+    Returns:
+        list: Event resources ordered by start time, or None if the prefetched
+        events can't answer the query
+    """
+    if not user_id:
+        return None
+
+    with _lock:
+        ready = _pending.get(user_id)
+    if ready is not None:
+        # Still running after the wait: the caller asks the calendar itself
+        ready.wait(wait)
+
+    with _lock:
+        entry = _sessions.get(user_id)
+    if (
+        entry is None
+        or entry.calendar_id != calendar_id
+        or not entry.covers(time_min, time_max)
+    ):
+        PREFETCH_LOOKUPS.labels("miss").inc()
+        return None
+
+    # Events written from this process since the fetch make the prefetched copy
+    # stale (writes made elsewhere are only caught by PREFETCH_TTL)
+    if get_event_cache(calendar_id).changed_at > entry.fetched_at:
+        with _lock:
+            _sessions.pop(user_id, None)
+        PREFETCH_LOOKUPS.labels("stale").inc()
+        return None
+
+    PREFETCH_LOOKUPS.labels("hit").inc()
+    return entry.query(time_min, time_max)
+
+
+def clear_session_events():
+    """
+    Drop every session's prefetched events.
+    """
+    with _lock:
+        _sessions.clear()
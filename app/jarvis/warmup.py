@@ -0,0 +1,65 @@
+"""
+Agent warm-up.
+
+ADK resolves the agent's model name and wraps its tool functions on every
+live connection: each one creates a new Gemini client (tens to hundreds of
+milliseconds) and rebuilds the tool declarations from the function
+signatures. warm_up_agent() does this once at server startup and pins the
+results on the agent, so connections reuse them.
+"""
+
+import time
+from typing import Optional
+
+from google.adk.models import Gemini
+from google.adk.tools import BaseTool, FunctionTool
+from google.genai import types
+
+
+class CachedFunctionTool(FunctionTool):
+    """
+    FunctionTool that builds its declaration once instead of on every request.
+    """
+
+    def __init__(self, func):
+        super().__init__(func)
+        self._declaration = None
+
+    def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
+        if self._declaration is None:
+            self._declaration = super()._get_declaration()
+        return self._declaration
+
+
+def warm_up_agent(agent):
+    """
+    Pay the agent's one-time setup costs before the first user connects.
+
+    Args:
+        agent (LlmAgent): The root agent
+
+    Returns:
+        dict: Milliseconds spent on each warm-up step
+    """
+    timings = {}
+
+    # Wrap the tools once and build their declarations up front
+    start = time.perf_counter()
+    agent.tools = [
+        tool if isinstance(tool, BaseTool) else CachedFunctionTool(tool)
+        for tool in agent.tools
+    ]
+    for tool in agent.tools:
+        tool._get_declaration()
+    timings["tools_ms"] = (time.perf_counter() - start) * 1000
+
+    # Resolve the model once, so every connection shares one client
+    start = time.perf_counter()
+    model = agent.canonical_model
+    if isinstance(model, Gemini):
+        # The live client is created lazily on the first connection otherwise
+        model._live_api_client
+    agent.model = model
+    timings["model_ms"] = (time.perf_counter() - start) * 1000
+
+    return timings
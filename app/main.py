@@ -1,21 +1,53 @@
 import asyncio
-import base64
-import json
+import logging
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import AsyncIterable
+from typing import AsyncIterable, Callable
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, Query, WebSocket
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, PlainTextResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from google.adk.agents import LiveRequestQueue
 from google.adk.agents.run_config import RunConfig
 from google.adk.events.event import Event
 from google.adk.runners import Runner
-from google.adk.sessions.in_memory_session_service import InMemorySessionService
 from google.genai import types
 from jarvis.agent import root_agent
+from jarvis.tools.credentials import (
+    get_credential_store,
+    prefetch_credentials,
+    set_current_user,
+    shutdown_token_refresher,
+)
+from jarvis.tools.executor import shutdown_executor
+from jarvis.tools.session_events import prefetch_session_events
+from jarvis.warmup import warm_up_agent
+from streaming.audio import (
+    CHUNK_MS,
+    VAD_ENABLED,
+    AudioCoalescer,
+    VoiceActivityDetector,
+)
+from streaming.auth import AUTH_COOKIE, authenticate, verify_token
+from streaming.lifecycle import (
+    CLOSE_ERROR,
+    CLOSE_POLICY_VIOLATION,
+    CLOSE_SERVER_BUSY,
+    AdmissionController,
+    ConnectionLifecycle,
+)
+from streaming.log import audio_log, setup_logging, stream_log
+from streaming.metrics import BYTES, FRAMES, Gauge, render
+from streaming.outbound import OutboundQueue
+from streaming.protocol import (
+    BINARY_SUBPROTOCOL,
+    decode_message,
+    negotiate_subprotocol,
+)
+from streaming.resumption import LiveSessionRegistry
+from streaming.sessions import BoundedSessionService
 
 #
 # ADK Streaming
@@ -25,25 +57,15 @@ from jarvis.agent import root_agent
 load_dotenv()
 
 APP_NAME = "ADK Streaming example"
-session_service = InMemorySessionService()
 
+# Warm the agent up at startup (JARVIS_WARMUP=0 leaves it to the first connection)
+WARMUP_ENABLED = os.environ.get("JARVIS_WARMUP", "1") == "1"
+session_service = BoundedSessionService()
+admission = AdmissionController()
 
-def start_agent_session(session_id, is_audio=False):
-    """Starts an agent session"""
 
-    # Create a Session
-    session = session_service.create_session(
-        app_name=APP_NAME,
-        user_id=session_id,
-        session_id=session_id,
-    )
-
-    # Create a Runner
-    runner = Runner(
-        app_name=APP_NAME,
-        agent=root_agent,
-        session_service=session_service,
-    )
+def make_run_config(is_audio):
+    """Builds the run config for a response modality"""
 
     # Set response modality
     modality = "AUDIO" if is_audio else "TEXT"
@@ -63,7 +85,36 @@ def start_agent_session(session_id, is_audio=False):
     if is_audio:
         config["output_audio_transcription"] = {}
 
-    run_config = RunConfig(**config)
+    return RunConfig(**config)
+
+
+# One Runner and one run config per modality, shared by all connections
+runner = Runner(
+    app_name=APP_NAME,
+    agent=root_agent,
+    session_service=session_service,
+)
+RUN_CONFIGS = {False: make_run_config(False), True: make_run_config(True)}
+
+
+def start_agent_session(user_id, session_id, is_audio=False):
+    """Starts an agent session"""
+
+    # Reuse the existing Session (and its history) on reconnect, or create one
+    # (the connection already refreshed it from the session store)
+    session = session_service.get_session(
+        app_name=APP_NAME,
+        user_id=user_id,
+        session_id=session_id,
+        from_store=False,
+    ) or session_service.create_session(
+        app_name=APP_NAME,
+        user_id=user_id,
+        session_id=session_id,
+    )
+
+    # Keep the session in memory while the live stream appends to it
+    session_service.pin(app_name=APP_NAME, user_id=user_id, session_id=session_id)
 
     # Create a LiveRequestQueue for this session
     live_request_queue = LiveRequestQueue()
@@ -72,107 +123,232 @@ def start_agent_session(session_id, is_audio=False):
     live_events = runner.run_live(
         session=session,
         live_request_queue=live_request_queue,
-        run_config=run_config,
+        run_config=RUN_CONFIGS[is_audio],
     )
     return live_events, live_request_queue
 
 
 async def agent_to_client_messaging(
-    websocket: WebSocket, live_events: AsyncIterable[Event | None]
+    outbound: OutboundQueue,
+    live_events: AsyncIterable[Event | None],
+    on_activity: Callable[[], None],
+    user_id: str,
+    session_id: str,
 ):
     """Agent to client communication"""
-    while True:
-        async for event in live_events:
-            if event is None:
-                continue
-
-            # If the turn complete or interrupted, send it
-            if event.turn_complete or event.interrupted:
-                message = {
-                    "turn_complete": event.turn_complete,
-                    "interrupted": event.interrupted,
-                }
-                await websocket.send_text(json.dumps(message))
-                print(f"[AGENT TO CLIENT]: {message}")
-                continue
-
-            # Read the Content and its first Part
-            part = event.content and event.content.parts and event.content.parts[0]
-            if not part:
-                continue
-
-            # Make sure we have a valid Part
-            if not isinstance(part, types.Part):
-                continue
-
-            # Only send text if it's a partial response (streaming)
-            # Skip the final complete message to avoid duplication
-            if part.text and event.partial:
-                message = {
-                    "mime_type": "text/plain",
-                    "data": part.text,
-                    "role": "model",
-                }
-                await websocket.send_text(json.dumps(message))
-                print(f"[AGENT TO CLIENT]: text/plain: {part.text}")
-
-            # If it's audio, send Base64 encoded audio data
-            is_audio = (
-                part.inline_data
-                and part.inline_data.mime_type
-                and part.inline_data.mime_type.startswith("audio/pcm")
+    # Returns when the live stream ends, which tears the connection down.
+    # This outlives the connection so a reconnecting client can resume.
+
+    # Tool calls made by this live stream act for the session's user
+    set_current_user(user_id)
+
+    async for event in live_events:
+        if event is None:
+            continue
+        on_activity()
+
+        # If interrupted, purge queued audio and tell the client to stop playback
+        if event.interrupted:
+            purged = outbound.interrupt()
+            stream_log.info(
+                "interrupted",
+                extra={"session": session_id, "direction": "out", "purged": purged},
+            )
+            continue
+
+        # If the turn complete, send it
+        if event.turn_complete:
+            outbound.put_control(event.turn_complete, event.interrupted)
+            stream_log.debug(
+                "turn complete", extra={"session": session_id, "direction": "out"}
             )
-            if is_audio:
-                audio_data = part.inline_data and part.inline_data.data
-                if audio_data:
-                    message = {
-                        "mime_type": "audio/pcm",
-                        "data": base64.b64encode(audio_data).decode("ascii"),
-                        "role": "model",
-                    }
-                    await websocket.send_text(json.dumps(message))
-                    print(f"[AGENT TO CLIENT]: audio/pcm: {len(audio_data)} bytes.")
+            continue
+
+        # Read the Content and its first Part
+        part = event.content and event.content.parts and event.content.parts[0]
+        if not part:
+            continue
+
+        # Make sure we have a valid Part
+        if not isinstance(part, types.Part):
+            continue
+
+        # Only send text if it's a partial response (streaming)
+        # Skip the final complete message to avoid duplication
+        if part.text and event.partial:
+            outbound.put_text(part.text)
+            if audio_log.isEnabledFor(logging.DEBUG):
+                audio_log.debug(
+                    "text/plain",
+                    extra={
+                        "session": session_id,
+                        "direction": "out",
+                        "chars": len(part.text),
+                    },
+                )
+
+        # If it's audio, send raw PCM (binary) or Base64 encoded audio (JSON)
+        is_audio = (
+            part.inline_data
+            and part.inline_data.mime_type
+            and part.inline_data.mime_type.startswith("audio/pcm")
+        )
+        if is_audio:
+            audio_data = part.inline_data and part.inline_data.data
+            if audio_data:
+                outbound.put_audio(audio_data)
+                if audio_log.isEnabledFor(logging.DEBUG):
+                    audio_log.debug(
+                        "audio/pcm",
+                        extra={
+                            "session": session_id,
+                            "direction": "out",
+                            "bytes": len(audio_data),
+                        },
+                    )
+
+
+def end_agent_session(user_id, session_id):
+    """Lets a session be evicted again once its live stream has closed"""
+    session_service.unpin(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+
+
+live_sessions = LiveSessionRegistry(
+    start_agent_session,
+    agent_to_client_messaging,
+    end_agent_session,
+)
+
+# Session gauges, read when /metrics is scraped
+Gauge(
+    "jarvis_active_connections",
+    "Connected WebSocket clients",
+    callback=lambda: admission.active,
+)
+Gauge(
+    "jarvis_live_streams",
+    "Live model streams, including ones parked for a reconnect",
+    callback=lambda: len(live_sessions),
+)
+Gauge(
+    "jarvis_sessions_in_memory",
+    "Conversation sessions held in memory",
+    callback=lambda: len(session_service),
+)
+
+# Inbound frame and byte counters, bound once per kind
+FRAMES_IN_AUDIO = FRAMES.labels("in", "audio")
+FRAMES_IN_TEXT = FRAMES.labels("in", "text")
+BYTES_IN_AUDIO = BYTES.labels("in", "audio")
+BYTES_IN_TEXT = BYTES.labels("in", "text")
 
 
 async def client_to_agent_messaging(
-    websocket: WebSocket, live_request_queue: LiveRequestQueue
+    websocket: WebSocket,
+    live_request_queue: LiveRequestQueue,
+    on_activity: Callable[[], None],
+    on_turn_end: Callable[..., None],
+    on_speech: Callable[[float], None],
+    session_id: str,
 ):
     """Client to agent communication"""
-    while True:
-        # Decode JSON message
-        message_json = await websocket.receive_text()
-        message = json.loads(message_json)
-        mime_type = message["mime_type"]
-        data = message["data"]
-        role = message.get("role", "user")  # Default to 'user' if role is not provided
-
-        # Send the message to the agent
-        if mime_type == "text/plain":
-            # Send a text message
-            content = types.Content(role=role, parts=[types.Part.from_text(text=data)])
-            live_request_queue.send_content(content=content)
-            print(f"[CLIENT TO AGENT PRINT]: {data}")
-        elif mime_type == "audio/pcm":
-            # Send audio data
-            decoded_data = base64.b64decode(data)
-
-            # Send the audio data - note that ActivityStart/End and transcription
-            # handling is done automatically by the ADK when input_audio_transcription
-            # is enabled in the config
-            live_request_queue.send_realtime(
-                types.Blob(data=decoded_data, mime_type=mime_type)
+
+    def send_audio(chunk):
+        # Send the audio data - note that ActivityStart/End and transcription
+        # handling is done automatically by the ADK when input_audio_transcription
+        # is enabled in the config
+        live_request_queue.send_realtime(types.Blob(data=chunk, mime_type="audio/pcm"))
+        if audio_log.isEnabledFor(logging.DEBUG):
+            audio_log.debug(
+                "audio/pcm",
+                extra={"session": session_id, "direction": "in", "bytes": len(chunk)},
             )
-            print(f"[CLIENT TO AGENT]: audio/pcm: {len(decoded_data)} bytes")
 
-        else:
-            raise ValueError(f"Mime type not supported: {mime_type}")
+    # Coalesce microphone frames into larger chunks before they reach the model
+    coalescer = AudioCoalescer(send_audio)
+
+    # Speech detection times voice turns; with JARVIS_VAD it also drops silence
+    # before it is buffered (end of speech flushes the chunk). Created on the
+    # first audio frame, so text-only sessions don't load NumPy.
+    vad = None
+
+    try:
+        while True:
+            # Decode the binary frame or JSON message
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            mime_type, data, role = decode_message(message)
+            on_activity()
+
+            # Send the message to the agent
+            if mime_type == "text/plain":
+                FRAMES_IN_TEXT.inc()
+                BYTES_IN_TEXT.inc(len(data))
+
+                # Text starts a new activity, so send any pending audio first
+                coalescer.flush()
+
+                # Send a text message
+                content = types.Content(
+                    role=role, parts=[types.Part.from_text(text=data)]
+                )
+                live_request_queue.send_content(content=content)
+                on_turn_end("text")
+                stream_log.info(
+                    "text/plain",
+                    extra={
+                        "session": session_id,
+                        "direction": "in",
+                        "chars": len(data),
+                    },
+                )
+            elif mime_type == "audio/pcm":
+                FRAMES_IN_AUDIO.inc()
+                BYTES_IN_AUDIO.inc(len(data))
+
+                if vad is None:
+                    vad = VoiceActivityDetector(
+                        coalescer.push,
+                        end_of_speech=coalescer.flush,
+                        on_speech=on_speech,
+                        gate=VAD_ENABLED,
+                    )
+
+                # Buffer audio data
+                vad.push(data)
+            else:
+                raise ValueError(f"Mime type not supported: {mime_type}")
+    finally:
+        coalescer.close()
+        if vad and VAD_ENABLED:
+            stream_log.info("vad", extra={"session": session_id, **vad.stats()})
 
 
 #
 # FastAPI web app
 #
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Starts logging and warms up the agent; cleans up on shutdown"""
+    log_listener = setup_logging()
+    if WARMUP_ENABLED:
+        try:
+            timings = warm_up_agent(root_agent)
+            stream_log.info("agent warmed up", extra=timings)
+        except Exception as e:
+            # Connections still work, they just pay the setup cost themselves
+            stream_log.warning("agent warm-up failed: %s", e)
+    yield
+    shutdown_executor(wait=False)
+    shutdown_token_refresher()
+    session_service.close()
+    log_listener.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 STATIC_DIR = Path("static")
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
@@ -184,6 +360,56 @@ async def root():
     return FileResponse(os.path.join(STATIC_DIR, "index.html"))
 
 
+@app.get("/config")
+async def client_config():
+    """Serves the settings the browser client must share with the server"""
+    # The recorder sends chunks of the size the server coalesces to
+    return {"audio_chunk_ms": CHUNK_MS}
+
+
+@app.get("/login")
+async def login(token: str = Query(...)):
+    """Signs a user in with the link from setup_calendar_auth.py --user"""
+    verified = verify_token(token)
+    if verified is None:
+        return PlainTextResponse("Invalid or expired sign-in link", status_code=401)
+
+    # The browser sends the cookie with the WebSocket handshake
+    response = RedirectResponse("/", status_code=303)
+    response.set_cookie(
+        AUTH_COOKIE,
+        token,
+        expires=verified[1],
+        httponly=True,
+        samesite="strict",
+    )
+    return response
+
+
+def connection_user(websocket, session_id):
+    """Returns the user a connection acts for, or None if it isn't signed in"""
+    # Single-user mode: every session acts for the one authorized account
+    if get_credential_store() is None:
+        return session_id
+    return authenticate(websocket)
+
+
+@app.get("/stats/sessions")
+async def session_stats():
+    """Reports the live session count and approximate bytes held"""
+    return {
+        **session_service.stats(),
+        "live_streams": len(live_sessions),
+        "connections": admission.stats(),
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Serves latency and throughput metrics in the Prometheus text format"""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(
     websocket: WebSocket,
@@ -192,23 +418,104 @@ async def websocket_endpoint(
 ):
     """Client websocket endpoint"""
 
-    # Wait for client connection
-    await websocket.accept()
-    print(f"Client #{session_id} connected, audio mode: {is_audio}")
-
-    # Start agent session
-    live_events, live_request_queue = start_agent_session(
-        session_id, is_audio == "true"
+    # The session ID only names the conversation; the user comes from the sign-in
+    user_id = connection_user(websocket, session_id)
+    if user_id is None:
+        stream_log.warning("rejected, not signed in", extra={"session": session_id})
+        await websocket.close(code=CLOSE_POLICY_VIOLATION)
+        return
+
+    # Wait for client connection, negotiating binary frames when offered
+    subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols", []))
+    binary = subprotocol == BINARY_SUBPROTOCOL
+    await websocket.accept(subprotocol=subprotocol)
+
+    # Reject (or queue) the connection when the server is at capacity
+    if not await admission.acquire():
+        stream_log.warning("rejected, server busy", extra={"session": session_id})
+        await websocket.close(code=CLOSE_SERVER_BUSY, reason="Server busy")
+        return
+
+    stream_log.info(
+        "connected",
+        extra={
+            "session": session_id,
+            "audio": is_audio,
+            "protocol": subprotocol or "json",
+        },
     )
 
-    # Start tasks
-    agent_to_client_task = asyncio.create_task(
-        agent_to_client_messaging(websocket, live_events)
-    )
-    client_to_agent_task = asyncio.create_task(
-        client_to_agent_messaging(websocket, live_request_queue)
-    )
-    await asyncio.gather(agent_to_client_task, client_to_agent_task)
+    # Have the user's calendar credentials loaded and fresh before the first tool call
+    prefetch_credentials(user_id)
+
+    # Fetch this week's events while the user is still speaking
+    prefetch_session_events(user_id)
+
+    live = None
+    lifecycle = ConnectionLifecycle(session_id)
+    try:
+        # Load the conversation from the session store without blocking the loop;
+        # a parked stream is stale if another worker continued it since
+        stale = await session_service.refresh(
+            app_name=APP_NAME, user_id=user_id, session_id=session_id
+        )
+
+        # Resume the parked live stream, or start agent session
+        live, resumed = live_sessions.attach(
+            user_id, session_id, is_audio == "true", lifecycle, stale
+        )
+        live.outbound.attach(websocket, binary)
+        stream_log.info(
+            "live stream resumed" if resumed else "live stream started",
+            extra={"session": session_id},
+        )
 
-    # Disconnected
-    print(f"Client #{session_id} disconnected")
+        def on_client_activity():
+            lifecycle.touch()
+            live.outbound.mark_input()
+
+        def on_turn_end(input_kind, ended_at=None):
+            live.outbound.mark_turn_end(input_kind, is_audio == "true", ended_at)
+
+        def on_speech(at):
+            live.outbound.mark_speech(is_audio == "true", at)
+
+        # Run the tasks until one ends; the survivors are cancelled, except the
+        # live stream pump, which stays parked for a reconnect
+        await lifecycle.run(
+            live.outbound.run(),
+            asyncio.shield(live.pump_task),
+            client_to_agent_messaging(
+                websocket,
+                live.live_request_queue,
+                on_client_activity,
+                on_turn_end,
+                on_speech,
+                session_id,
+            ),
+        )
+    except Exception as e:
+        # Failed before or outside the connection's tasks (e.g. starting the stream)
+        lifecycle.end(f"error: {e!r}", CLOSE_ERROR)
+        raise
+    finally:
+        # Park the live model stream (closed after the grace period) and free the slot
+        if live:
+            live_sessions.detach(live, lifecycle)
+        admission.release()
+
+        # Persist the conversation now, so a reconnect to another worker has it
+        session_service.flush()
+
+        # Tell the client why: idle, error, overload, superseded or stream ended
+        await lifecycle.close_socket(websocket)
+
+        # Disconnected
+        stream_log.info(
+            "disconnected",
+            extra={
+                "session": session_id,
+                "reason": lifecycle.close_reason,
+                **(live.outbound.stats() if live else {}),
+            },
+        )
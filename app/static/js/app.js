@@ -11,8 +11,27 @@ const sessionId = Math.random().toString().substring(10);
 const ws_url = "ws://" + window.location.host + "/ws/" + sessionId;
 let websocket = null;
 let is_audio = false;
+let useBinaryFrames = false; // Negotiated with the server on connect
 let currentMessageId = null; // Track the current message ID during a conversation turn
 
+// Frame protocol constants (see app/streaming/protocol.py)
+const BINARY_SUBPROTOCOL = "adk.binary.v1";
+const JSON_SUBPROTOCOL = "adk.json.v1";
+const KIND_AUDIO = 0x01;
+const KIND_TEXT = 0x02;
+const KIND_CONTROL = 0x03;
+const ROLE_MODEL = 0x00;
+const ROLE_USER = 0x01;
+const FLAG_TURN_COMPLETE = 0x01;
+const FLAG_INTERRUPTED = 0x02;
+
+// Close codes sent by the server (see app/streaming/lifecycle.py)
+const CLOSE_SERVER_BUSY = 1013;
+const CLOSE_SUPERSEDED = 4000;
+const CLOSE_IDLE = 4002;
+const textEncoder = new TextEncoder();
+const textDecoder = new TextDecoder();
+
 // Get DOM elements
 const messageForm = document.getElementById("messageForm");
 const messageInput = document.getElementById("message");
@@ -28,12 +47,16 @@ const recordingContainer = document.getElementById("recording-container");
 function connectWebsocket() {
   // Connect websocket
   const wsUrl = ws_url + "?is_audio=" + is_audio;
-  websocket = new WebSocket(wsUrl);
+  websocket = new WebSocket(wsUrl, [BINARY_SUBPROTOCOL, JSON_SUBPROTOCOL]);
+  websocket.binaryType = "arraybuffer";
 
   // Handle connection open
   websocket.onopen = function () {
     // Connection opened messages
-    console.log("WebSocket connection opened.");
+    useBinaryFrames = websocket.protocol === BINARY_SUBPROTOCOL;
+    console.log(
+      "WebSocket connection opened, protocol: " + (websocket.protocol || "json")
+    );
     connectionStatus.textContent = "Connected";
     statusDot.classList.add("connected");
 
@@ -44,9 +67,19 @@ function connectWebsocket() {
 
   // Handle incoming messages
   websocket.onmessage = function (event) {
-    // Parse the incoming message
-    const message_from_server = JSON.parse(event.data);
-    console.log("[AGENT TO CLIENT] ", message_from_server);
+    // Parse the incoming binary frame or JSON message
+    const message_from_server = decodeServerMessage(event.data);
+    if (message_from_server.mime_type !== "audio/pcm") {
+      console.log("[AGENT TO CLIENT] ", message_from_server);
+    }
+
+    // On barge-in, drop the model audio still buffered in the player
+    if (message_from_server.interrupted) {
+      clearPlayback();
+      currentMessageId = null;
+      typingIndicator.classList.remove("visible");
+      return;
+    }
 
     // Show typing indicator for first message in a response sequence,
     // but not for turn_complete messages
@@ -71,7 +104,9 @@ function connectWebsocket() {
 
     // If it's audio, play it
     if (message_from_server.mime_type === "audio/pcm" && audioPlayerNode) {
-      audioPlayerNode.port.postMessage(base64ToArray(message_from_server.data));
+      audioPlayerNode.port.postMessage(message_from_server.data, [
+        message_from_server.data,
+      ]);
 
       // If we have an existing message element for this turn, add audio icon if needed
       if (currentMessageId) {
@@ -145,16 +180,34 @@ function connectWebsocket() {
   };
 
   // Handle connection close
-  websocket.onclose = function () {
-    console.log("WebSocket connection closed.");
+  websocket.onclose = function (event) {
+    console.log(
+      "WebSocket connection closed: " + event.code + " " + (event.reason || "")
+    );
     document.getElementById("sendButton").disabled = true;
-    connectionStatus.textContent = "Disconnected. Reconnecting...";
     statusDot.classList.remove("connected");
     typingIndicator.classList.remove("visible");
+
+    // Another tab or window took the session over; don't take it back
+    if (event.code === CLOSE_SUPERSEDED) {
+      connectionStatus.textContent = "Session opened in another window.";
+      return;
+    }
+
+    // Closed for inactivity: free the slot until the user comes back
+    if (event.code === CLOSE_IDLE) {
+      connectionStatus.textContent = "Disconnected while idle.";
+      reconnectOnActivity();
+      return;
+    }
+
+    // Back off longer while the server is busy or the client was too slow
+    const delay = event.code === CLOSE_SERVER_BUSY ? 15000 : 5000;
+    connectionStatus.textContent = "Disconnected. Reconnecting...";
     setTimeout(function () {
       console.log("Reconnecting...");
       connectWebsocket();
-    }, 5000);
+    }, delay);
   };
 
   websocket.onerror = function (e) {
@@ -166,6 +219,28 @@ function connectWebsocket() {
 }
 connectWebsocket();
 
+// Reconnect on the user's next click or key press
+function reconnectOnActivity() {
+  const resume = function () {
+    document.removeEventListener("pointerdown", resume);
+    document.removeEventListener("keydown", resume);
+    console.log("Reconnecting after idle...");
+    connectWebsocket();
+  };
+  document.addEventListener("pointerdown", resume);
+  document.addEventListener("keydown", resume);
+}
+
+// Reconnect right away (e.g. to switch modality). The server resumes the
+// session, so the conversation continues on the new connection.
+function reconnectWebsocket() {
+  if (websocket) {
+    websocket.onclose = null;
+    websocket.close();
+  }
+  connectWebsocket();
+}
+
 // Add submit handler to the form
 function addSubmitHandler() {
   messageForm.onsubmit = function (e) {
@@ -181,11 +256,7 @@ function addSubmitHandler() {
       // Show typing indicator after sending message
       typingIndicator.classList.add("visible");
 
-      sendMessage({
-        mime_type: "text/plain",
-        data: message,
-        role: "user",
-      });
+      sendText(message);
       console.log("[CLIENT TO AGENT] " + message);
       // Scroll down to the bottom of the messagesDiv
       messagesDiv.scrollTop = messagesDiv.scrollHeight;
@@ -194,15 +265,85 @@ function addSubmitHandler() {
   };
 }
 
-// Send a message to the server as a JSON string
-function sendMessage(message) {
+/**
+ * Frame protocol (see app/streaming/protocol.py)
+ *
+ * Binary frames are a 2-byte header (kind, flags) followed by the payload.
+ * JSON messages with Base64 audio are used when the server doesn't accept
+ * the binary subprotocol.
+ */
+
+// Decode a server message into {mime_type, data, role} or {turn_complete, interrupted}
+function decodeServerMessage(data) {
+  if (!(data instanceof ArrayBuffer)) {
+    const message = JSON.parse(data);
+    if (message.mime_type === "audio/pcm") {
+      message.data = base64ToArray(message.data);
+    }
+    return message;
+  }
+
+  const header = new Uint8Array(data, 0, 2);
+  const kind = header[0];
+  const flags = header[1];
+  if (kind === KIND_AUDIO) {
+    return { mime_type: "audio/pcm", data: data.slice(2), role: "model" };
+  }
+  if (kind === KIND_TEXT) {
+    return {
+      mime_type: "text/plain",
+      data: textDecoder.decode(new Uint8Array(data, 2)),
+      role: flags === ROLE_USER ? "user" : "model",
+    };
+  }
+  return {
+    turn_complete: (flags & FLAG_TURN_COMPLETE) !== 0,
+    interrupted: (flags & FLAG_INTERRUPTED) !== 0,
+  };
+}
+
+// Build a binary frame from a header and a payload
+function encodeFrame(kind, flags, payload) {
+  const frame = new Uint8Array(2 + payload.byteLength);
+  frame[0] = kind;
+  frame[1] = flags;
+  frame.set(payload, 2);
+  return frame.buffer;
+}
+
+// Send a user text message to the server
+function sendText(text) {
+  if (useBinaryFrames) {
+    sendFrame(encodeFrame(KIND_TEXT, ROLE_USER, textEncoder.encode(text)));
+  } else {
+    sendFrame(
+      JSON.stringify({ mime_type: "text/plain", data: text, role: "user" })
+    );
+  }
+}
+
+// Send a PCM audio chunk to the server
+function sendAudio(pcmData) {
+  if (useBinaryFrames) {
+    sendFrame(encodeFrame(KIND_AUDIO, 0, new Uint8Array(pcmData)));
+  } else {
+    sendFrame(
+      JSON.stringify({
+        mime_type: "audio/pcm",
+        data: arrayBufferToBase64(pcmData),
+      })
+    );
+  }
+}
+
+// Send an encoded frame (ArrayBuffer or JSON string) to the server
+function sendFrame(frame) {
   if (websocket && websocket.readyState == WebSocket.OPEN) {
-    const messageJson = JSON.stringify(message);
-    websocket.send(messageJson);
+    websocket.send(frame);
   }
 }
 
-// Decode Base64 data to Array
+// Decode Base64 data to Array (JSON fallback only)
 function base64ToArray(base64) {
   const binaryString = window.atob(base64);
   const len = binaryString.length;
@@ -223,6 +364,7 @@ let audioRecorderNode;
 let audioRecorderContext;
 let micStream;
 let isRecording = false;
+let interruptReceivedAt = null; // For the interrupt-to-silence measurement
 
 // Import the audio worklets
 import { startAudioPlayerWorklet } from "./audio-player.js";
@@ -234,6 +376,7 @@ function startAudio() {
   startAudioPlayerWorklet().then(([node, ctx]) => {
     audioPlayerNode = node;
     audioPlayerContext = ctx;
+    audioPlayerNode.port.onmessage = handlePlayerMessage;
   });
   // Start audio input
   startAudioRecorderWorklet(audioRecorderHandler).then(
@@ -246,6 +389,27 @@ function startAudio() {
   );
 }
 
+// Clear the player's ring buffer so playback stops at once
+function clearPlayback() {
+  if (audioPlayerNode) {
+    interruptReceivedAt = performance.now();
+    audioPlayerNode.port.postMessage({ command: "endOfAudio" });
+  }
+}
+
+// Handle acknowledgements from the player worklet
+function handlePlayerMessage(event) {
+  if (event.data.event === "cleared" && interruptReceivedAt !== null) {
+    const latency = performance.now() - interruptReceivedAt;
+    const discardedMs = (event.data.discardedSamples / 24000) * 1000;
+    console.log(
+      `Interrupt-to-silence: ${latency.toFixed(1)} ms ` +
+        `(discarded ${discardedMs.toFixed(0)} ms of audio)`
+    );
+    interruptReceivedAt = null;
+  }
+}
+
 // Stop audio recording
 function stopAudio() {
   if (audioRecorderNode) {
@@ -282,7 +446,7 @@ startAudioButton.addEventListener("click", () => {
   // Add class to messages container to enable audio styling
   messagesDiv.classList.add("audio-enabled");
 
-  connectWebsocket(); // reconnect with the audio mode
+  reconnectWebsocket(); // reconnect with the audio mode
 });
 
 // Stop audio recording when stop button is clicked
@@ -302,8 +466,7 @@ stopAudioButton.addEventListener("click", () => {
 
   // Only reconnect if the connection is still open
   if (websocket && websocket.readyState === WebSocket.OPEN) {
-    websocket.close();
-    // The onclose handler will trigger reconnection
+    reconnectWebsocket();
   }
 });
 
@@ -312,11 +475,8 @@ function audioRecorderHandler(pcmData) {
   // Only send data if we're still recording
   if (!isRecording) return;
 
-  // Send the pcm data as base64
-  sendMessage({
-    mime_type: "audio/pcm",
-    data: arrayBufferToBase64(pcmData),
-  });
+  // Send the pcm data
+  sendAudio(pcmData);
 
   // Log every few samples to avoid flooding the console
   if (Math.random() < 0.01) {
@@ -325,7 +485,7 @@ function audioRecorderHandler(pcmData) {
   }
 }
 
-// Encode an array buffer with Base64
+// Encode an array buffer with Base64 (JSON fallback only)
 function arrayBufferToBase64(buffer) {
   let binary = "";
   const bytes = new Uint8Array(buffer);
@@ -4,7 +4,24 @@
 
 let micStream;
 
+// Chunk duration used if the server's setting can't be read
+const DEFAULT_CHUNK_MS = 50;
+
+// Duration of each audio chunk sent to the server (JARVIS_AUDIO_CHUNK_MS)
+async function fetchChunkMs() {
+  try {
+    const response = await fetch("/config");
+    const config = await response.json();
+    return config.audio_chunk_ms || DEFAULT_CHUNK_MS;
+  } catch (e) {
+    console.log("Could not read /config, using default chunk size:", e);
+    return DEFAULT_CHUNK_MS;
+  }
+}
+
 export async function startAudioRecorderWorklet(audioRecorderHandler) {
+  const chunkMs = await fetchChunkMs();
+
   // Create an AudioContext
   const audioRecorderContext = new AudioContext({ sampleRate: 16000 });
   console.log("AudioContext sample rate:", audioRecorderContext.sampleRate);
@@ -22,7 +39,12 @@ export async function startAudioRecorderWorklet(audioRecorderHandler) {
   // Create an AudioWorkletNode that uses the PCMProcessor
   const audioRecorderNode = new AudioWorkletNode(
     audioRecorderContext,
-    "pcm-recorder-processor"
+    "pcm-recorder-processor",
+    {
+      processorOptions: {
+        chunkSamples: (audioRecorderContext.sampleRate * chunkMs) / 1000,
+      },
+    }
   );
 
   // Connect the microphone source to the worklet.
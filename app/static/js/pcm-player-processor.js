@@ -16,8 +16,10 @@ class PCMPlayerProcessor extends AudioWorkletProcessor {
     this.port.onmessage = (event) => {
       // Reset the buffer when 'endOfAudio' message received
       if (event.data.command === "endOfAudio") {
+        const discardedSamples =
+          (this.writeIndex - this.readIndex + this.bufferSize) % this.bufferSize;
         this.readIndex = this.writeIndex; // Clear the buffer
-        console.log("endOfAudio received, clearing the buffer.");
+        this.port.postMessage({ event: "cleared", discardedSamples });
         return;
       }
 
@@ -1,15 +1,39 @@
 class PCMProcessor extends AudioWorkletProcessor {
-  constructor() {
+  constructor(options) {
     super();
+
+    // Batch render quanta into chunks before posting them to the main thread
+    // (matches the server's inbound chunk size, see app/streaming/audio.py)
+    const chunkSamples =
+      (options.processorOptions && options.processorOptions.chunkSamples) ||
+      800; // 50 ms at 16kHz
+    this.buffer = new Float32Array(chunkSamples);
+    this.fill = 0;
   }
 
   process(inputs, outputs, parameters) {
     if (inputs.length > 0 && inputs[0].length > 0) {
       // Use the first channel
       const inputChannel = inputs[0][0];
-      // Copy the buffer to avoid issues with recycled memory
-      const inputCopy = new Float32Array(inputChannel);
-      this.port.postMessage(inputCopy);
+      let offset = 0;
+      while (offset < inputChannel.length) {
+        const count = Math.min(
+          this.buffer.length - this.fill,
+          inputChannel.length - offset
+        );
+        this.buffer.set(
+          inputChannel.subarray(offset, offset + count),
+          this.fill
+        );
+        this.fill += count;
+        offset += count;
+
+        // Post a full chunk (a copy, since the buffer is reused)
+        if (this.fill === this.buffer.length) {
+          this.port.postMessage(this.buffer.slice());
+          this.fill = 0;
+        }
+      }
     }
     return true;
   }
@@ -0,0 +1,5 @@
+# Streaming Package
+
+"""
+WebSocket streaming support for the voice assistant server.
+"""
@@ -0,0 +1,269 @@
+"""
+Inbound audio processing for microphone streams.
+
+The browser sends small PCM frames many times per second. AudioCoalescer packs
+them into fixed-duration chunks in a preallocated buffer before they are
+forwarded to the live model, so the model queue sees a few messages per second
+instead of one per render quantum. VoiceActivityDetector optionally sits in
+front of it and stops silence from being forwarded at all (NumPy is only
+imported when it is enabled).
+"""
+
+import asyncio
+import collections
+import os
+import time
+
+# Microphone audio format sent by the client (16 kHz, 16-bit mono PCM)
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+
+# Duration of each forwarded chunk, clamped to 20-100 ms
+CHUNK_MS = min(max(int(os.environ.get("JARVIS_AUDIO_CHUNK_MS", "50")), 20), 100)
+
+# A partially filled chunk is flushed after this many milliseconds
+FLUSH_TIMEOUT_MS = int(os.environ.get("JARVIS_AUDIO_FLUSH_MS", str(CHUNK_MS * 2)))
+
+# Voice activity detection (off unless JARVIS_VAD=1)
+VAD_ENABLED = os.environ.get("JARVIS_VAD", "0") == "1"
+
+# RMS level (int16 scale) above which a window counts as speech
+VAD_ENERGY_THRESHOLD = float(os.environ.get("JARVIS_VAD_THRESHOLD", "500"))
+
+# Zero crossings per sample above which a quiet window is treated as noise
+VAD_MAX_ZCR = 0.25
+
+# Analysis window, audio kept after speech ends and audio kept before it starts
+VAD_WINDOW_MS = 10
+VAD_HANGOVER_MS = 1000
+VAD_PREROLL_MS = 300
+
+
+def chunk_bytes(chunk_ms):
+    """
+    Number of PCM bytes in a chunk of the given duration.
+    """
+    return SAMPLE_RATE * BYTES_PER_SAMPLE * chunk_ms // 1000
+
+
+class AudioCoalescer:
+    """
+    Coalesces inbound PCM frames into fixed-size chunks.
+
+    Frames are copied straight into a preallocated buffer; the only allocation
+    is the bytes object handed to the sink when a chunk is flushed. A chunk is
+    flushed when it is full, when FLUSH_TIMEOUT_MS passes without it filling
+    up, or explicitly at activity boundaries (text input, end of speech,
+    disconnect).
+    """
+
+    def __init__(self, sink, chunk_ms=CHUNK_MS, flush_timeout_ms=FLUSH_TIMEOUT_MS):
+        """
+        Args:
+            sink (callable): Called with each chunk as bytes
+            chunk_ms (int): Duration of a full chunk in milliseconds
+            flush_timeout_ms (int): Maximum age of a partial chunk in milliseconds
+        """
+        self._sink = sink
+        self._buffer = bytearray(chunk_bytes(chunk_ms))
+        self._view = memoryview(self._buffer)
+        self._fill = 0
+        self._flush_timeout = flush_timeout_ms / 1000
+        self._timer = None
+
+        self.frames_in = 0
+        self.chunks_out = 0
+
+    def push(self, data):
+        """
+        Add a PCM frame (any bytes-like object) to the current chunk.
+        """
+        self.frames_in += 1
+        data = memoryview(data).cast("B")
+        size = len(self._buffer)
+        offset = 0
+
+        while offset < len(data):
+            count = min(size - self._fill, len(data) - offset)
+            self._view[self._fill : self._fill + count] = data[offset : offset + count]
+            self._fill += count
+            offset += count
+
+            if self._fill == size:
+                self.flush()
+
+        # Make sure a partial chunk doesn't wait forever
+        if self._fill and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self._flush_timeout, self.flush
+            )
+
+    def flush(self):
+        """
+        Forward the buffered audio now, even if the chunk isn't full.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._fill:
+            return
+
+        chunk = bytes(self._view[: self._fill])
+        self._fill = 0
+        self.chunks_out += 1
+        self._sink(chunk)
+
+    def close(self):
+        """
+        Flush any remaining audio and stop the flush timer.
+        """
+        self.flush()
+
+
+class VoiceActivityDetector:
+    """
+    Energy and zero-crossing voice activity detector for inbound PCM frames.
+
+    Each frame is split into VAD_WINDOW_MS windows and scored in one vectorized
+    pass. Frames are forwarded while speech is active and for a hangover period
+    after it ends. While silent, the most recent VAD_PREROLL_MS of audio is kept
+    and forwarded when speech starts, so onsets are not clipped. Everything else
+    is dropped.
+
+    With gate=False every frame is forwarded and the detector only reports
+    speech (on_speech), which is what times voice turns when JARVIS_VAD is off.
+    """
+
+    def __init__(
+        self,
+        sink,
+        end_of_speech=None,
+        on_speech=None,
+        gate=True,
+        energy_threshold=VAD_ENERGY_THRESHOLD,
+        max_zcr=VAD_MAX_ZCR,
+        hangover_ms=VAD_HANGOVER_MS,
+        preroll_ms=VAD_PREROLL_MS,
+    ):
+        """
+        Args:
+            sink (callable): Called with each forwarded frame (bytes-like)
+            end_of_speech (callable): Called when the hangover after speech runs out
+            on_speech (callable): Called with the time (perf_counter) of each speech frame
+            gate (bool): Drop silence; if False every frame is forwarded
+            energy_threshold (float): RMS level that counts as speech
+            max_zcr (float): Zero-crossing rate above which quiet windows are noise
+            hangover_ms (int): Audio forwarded after the last speech window
+            preroll_ms (int): Audio kept from before speech starts
+        """
+        import numpy
+
+        self._np = numpy
+        self._sink = sink
+        self._end_of_speech = end_of_speech
+        self._on_speech = on_speech
+        self._gate = gate
+        self._energy_threshold = energy_threshold
+        self._max_zcr = max_zcr
+        self._window = SAMPLE_RATE * VAD_WINDOW_MS // 1000
+        self._hangover_bytes = chunk_bytes(hangover_ms)
+        self._preroll_bytes = chunk_bytes(preroll_ms)
+
+        self._active = False
+        self._hangover_left = 0
+        self._preroll = collections.deque()
+        self._preroll_size = 0
+
+        self.bytes_forwarded = 0
+        self.bytes_dropped = 0
+
+        # When the last speech frame arrived (perf_counter), for turn latency
+        self.last_speech_at = None
+
+    def is_speech(self, data):
+        """
+        Score a PCM frame.
+
+        Returns:
+            bool: True if any window in the frame looks like speech
+        """
+        np = self._np
+        samples = np.frombuffer(data, dtype=np.int16, count=len(data) // 2)
+        if not len(samples):
+            return False
+
+        # Split into analysis windows (a short frame is a single window)
+        window = min(self._window, len(samples))
+        usable = len(samples) // window * window
+        windows = samples[:usable].reshape(-1, window).astype(np.float32)
+
+        rms = np.sqrt(np.mean(windows * windows, axis=1))
+        signs = np.signbit(windows)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / window
+
+        # Loud windows are speech; moderately loud ones only if not noise-like
+        speech = (rms >= 2 * self._energy_threshold) | (
+            (rms >= self._energy_threshold) & (zcr <= self._max_zcr)
+        )
+        return bool(speech.any())
+
+    def push(self, data):
+        """
+        Process an inbound PCM frame (any bytes-like object).
+        """
+        size = len(data)
+        speech = self.is_speech(data)
+        if speech:
+            self.last_speech_at = time.perf_counter()
+            if self._on_speech:
+                self._on_speech(self.last_speech_at)
+
+        if not self._gate:
+            self._forward(data)
+            return
+
+        if speech:
+            if not self._active:
+                # Speech onset: send the pre-roll first
+                self._active = True
+                while self._preroll:
+                    self._forward(self._preroll.popleft())
+                self._preroll_size = 0
+            self._hangover_left = self._hangover_bytes
+            self._forward(data)
+            return
+
+        if self._active:
+            # Keep forwarding through short pauses
+            self._forward(data)
+            self._hangover_left -= size
+            if self._hangover_left <= 0:
+                self._active = False
+                if self._end_of_speech:
+                    self._end_of_speech()
+            return
+
+        # Silence: keep the most recent audio as pre-roll
+        self._preroll.append(data)
+        self._preroll_size += size
+        while self._preroll_size - len(self._preroll[0]) >= self._preroll_bytes:
+            dropped = self._preroll.popleft()
+            self._preroll_size -= len(dropped)
+            self.bytes_dropped += len(dropped)
+
+    def _forward(self, data):
+        self.bytes_forwarded += len(data)
+        self._sink(data)
+
+    def stats(self):
+        """
+        Report how much audio was forwarded vs. dropped.
+
+        Returns:
+            dict: Byte counts (pre-roll not yet sent counts as neither)
+        """
+        return {
+            "bytes_forwarded": self.bytes_forwarded,
+            "bytes_dropped": self.bytes_dropped,
+        }
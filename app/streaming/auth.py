@@ -0,0 +1,114 @@
+"""
+Sign-in for multi-tenant servers.
+
+In multi-tenant mode (JARVIS_CREDENTIALS_DIR set) a connection acts for the
+Google account of the user who signed in, never for whatever session ID the
+client put in the URL. setup_calendar_auth.py --user prints a sign-in link
+with a token signed with JARVIS_AUTH_SECRET (HMAC-SHA256); /login checks it
+and stores it in an HttpOnly cookie, which the browser sends with the
+WebSocket handshake. The token is checked again before every connection is
+accepted, together with the Origin header, so another site can't open a
+connection with the user's cookie.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import time
+from urllib.parse import urlsplit
+
+# Secret the sign-in tokens are signed with (shared by all workers)
+AUTH_SECRET = os.environ.get("JARVIS_AUTH_SECRET", "")
+
+# Days a sign-in token is valid
+AUTH_TOKEN_DAYS = float(os.environ.get("JARVIS_AUTH_TOKEN_DAYS", "30"))
+
+# Cookie holding the sign-in token
+AUTH_COOKIE = "jarvis_auth"
+
+
+def _signature(payload, secret):
+    return hmac.new(secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+def issue_token(user_id, days=AUTH_TOKEN_DAYS, secret=None):
+    """
+    Create a signed sign-in token for a user.
+
+    Args:
+        user_id (str): The user ID the token's holder acts for
+        days (float): Days until the token expires
+        secret (str): Signing secret (AUTH_SECRET if None)
+
+    Returns:
+        str: The token
+    """
+    secret = AUTH_SECRET if secret is None else secret
+    if not secret:
+        raise RuntimeError("Set JARVIS_AUTH_SECRET to issue sign-in tokens")
+
+    encoded_user = base64.urlsafe_b64encode(user_id.encode()).decode().rstrip("=")
+    payload = f"{encoded_user}.{int(time.time() + days * 86400)}"
+    return f"{payload}.{_signature(payload, secret)}"
+
+
+def verify_token(token, secret=None):
+    """
+    Check a sign-in token.
+
+    Args:
+        token (str): The token from the cookie or sign-in link
+        secret (str): Signing secret (AUTH_SECRET if None)
+
+    Returns:
+        tuple: (user_id, expiry as epoch seconds), or None if the token is
+        missing, forged or expired
+    """
+    secret = AUTH_SECRET if secret is None else secret
+    if not secret or not token:
+        return None
+
+    try:
+        encoded_user, expiry, signature = token.split(".")
+        payload = f"{encoded_user}.{expiry}"
+        if not hmac.compare_digest(signature, _signature(payload, secret)):
+            return None
+        if int(expiry) < time.time():
+            return None
+        padding = "=" * (-len(encoded_user) % 4)
+        return base64.urlsafe_b64decode(encoded_user + padding).decode(), int(expiry)
+    except ValueError:
+        return None
+
+
+def same_origin(headers):
+    """
+    Check that a WebSocket handshake comes from a page served by this server.
+
+    Args:
+        headers: The handshake's request headers
+
+    Returns:
+        bool: True if there is no Origin header (not a browser) or it matches the Host
+    """
+    origin = headers.get("origin")
+    if not origin:
+        return True
+    return urlsplit(origin).netloc == headers.get("host")
+
+
+def authenticate(websocket):
+    """
+    Get the signed-in user of a WebSocket handshake.
+
+    Args:
+        websocket (WebSocket): The connection, before it is accepted
+
+    Returns:
+        str: The user ID, or None if the connection isn't signed in
+    """
+    if not same_origin(websocket.headers):
+        return None
+    verified = verify_token(websocket.cookies.get(AUTH_COOKIE))
+    return verified[0] if verified else None
@@ -0,0 +1,215 @@
+"""
+Connection lifecycle management for client WebSockets.
+
+Each connection runs several tasks (reading from the client, reading from the
+live model, writing to the client). ConnectionLifecycle runs them together and
+tears all of them down as soon as one finishes, fails or the connection goes
+idle. AdmissionController caps the number of concurrent sessions so new
+connections are rejected (or made to wait) before the server runs out of
+memory.
+"""
+
+import asyncio
+import os
+import time
+
+from starlette.websockets import WebSocketDisconnect, WebSocketState
+
+# Maximum number of concurrently connected sessions
+MAX_CONCURRENT_SESSIONS = int(os.environ.get("JARVIS_MAX_CONNECTIONS", "200"))
+
+# Seconds a new connection may wait for a free slot (0 rejects immediately)
+ADMISSION_WAIT = float(os.environ.get("JARVIS_ADMISSION_WAIT", "0"))
+
+# Seconds without traffic in either direction before a connection is closed
+IDLE_TIMEOUT = float(os.environ.get("JARVIS_IDLE_TIMEOUT", "300"))
+
+# WebSocket close codes, so the client can tell why it was closed
+CLOSE_NORMAL = 1000
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_ERROR = 1011
+CLOSE_SERVER_BUSY = 1013
+
+# Application close codes: another connection took the session over (don't
+# reconnect), the live model stream ended (reconnect to start a new one), and
+# the connection went idle (reconnect only when the user comes back)
+CLOSE_SUPERSEDED = 4000
+CLOSE_STREAM_ENDED = 4001
+CLOSE_IDLE = 4002
+
+
+class CloseConnection(Exception):
+    """
+    Raised by a connection task to close the connection with a specific code.
+    """
+
+    def __init__(self, reason, code):
+        super().__init__(reason)
+        self.reason = reason
+        self.code = code
+
+
+class AdmissionController:
+    """
+    Global cap on concurrent sessions.
+    """
+
+    def __init__(self, limit=MAX_CONCURRENT_SESSIONS, wait=ADMISSION_WAIT):
+        """
+        Args:
+            limit (int): Maximum concurrent sessions
+            wait (float): Seconds a connection may queue for a slot
+        """
+        self.limit = limit
+        self.wait = wait
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._slots = asyncio.Semaphore(limit)
+
+    async def acquire(self):
+        """
+        Reserve a session slot, waiting up to `wait` seconds.
+
+        Returns:
+            bool: True if admitted, False if the server is full
+        """
+        if not self._slots.locked():
+            await self._slots.acquire()
+        elif self.wait <= 0:
+            self.rejected += 1
+            return False
+        else:
+            # Queue for a slot until one frees up or the wait runs out
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.wait)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                return False
+            finally:
+                self.waiting -= 1
+
+        self.active += 1
+        return True
+
+    def release(self):
+        """
+        Free a session slot.
+        """
+        self.active -= 1
+        self._slots.release()
+
+    def stats(self):
+        """
+        Report admission counters.
+
+        Returns:
+            dict: Active, waiting and rejected connections and the limit
+        """
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "limit": self.limit,
+        }
+
+
+class ConnectionLifecycle:
+    """
+    Runs a connection's tasks and tears them all down together.
+    """
+
+    def __init__(self, session_id, idle_timeout=IDLE_TIMEOUT):
+        """
+        Args:
+            session_id (str): The client session ID (for logging)
+            idle_timeout (float): Seconds without activity before closing
+        """
+        self.session_id = session_id
+        self.idle_timeout = idle_timeout
+        self.last_activity = time.monotonic()
+        self.close_reason = None
+        self.close_code = None
+        self._ended = asyncio.Event()
+
+    def touch(self):
+        """
+        Record traffic on the connection.
+        """
+        self.last_activity = time.monotonic()
+
+    def end(self, reason, code=CLOSE_SUPERSEDED):
+        """
+        Tear the connection down from outside (e.g. replaced by a reconnect).
+
+        Args:
+            reason (str): Why the connection is closed (for the log and the client)
+            code (int): The WebSocket close code sent to the client
+        """
+        self._set_reason(reason, code)
+        self._ended.set()
+
+    def _set_reason(self, reason, code):
+        # The first reason wins
+        if self.close_reason is None:
+            self.close_reason = reason
+            self.close_code = code
+
+    async def _watch_idle(self):
+        while True:
+            remaining = self.last_activity + self.idle_timeout - time.monotonic()
+            if remaining <= 0:
+                self._set_reason("idle", CLOSE_IDLE)
+                return
+            await asyncio.sleep(remaining)
+
+    async def run(self, *coroutines):
+        """
+        Run the connection's coroutines until the first one finishes or fails,
+        the connection goes idle or end() is called, then cancel and await the
+        rest. Futures shielded with asyncio.shield() survive the teardown.
+        """
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        tasks.append(asyncio.create_task(self._ended.wait()))
+        if self.idle_timeout > 0:
+            tasks.append(asyncio.create_task(self._watch_idle()))
+
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Cancel the survivors (also when this coroutine itself is cancelled)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        for task in done:
+            if task.cancelled():
+                continue
+            error = task.exception()
+            if isinstance(error, CloseConnection):
+                self._set_reason(error.reason, error.code)
+            elif isinstance(error, WebSocketDisconnect):
+                self._set_reason("client disconnected", CLOSE_NORMAL)
+            elif error is not None:
+                self.close_reason = f"error: {error!r}"
+                self.close_code = CLOSE_ERROR
+        self._set_reason("stream ended", CLOSE_STREAM_ENDED)
+
+    async def close_socket(self, websocket):
+        """
+        Close the client's socket with the code matching close_reason.
+        """
+        if (
+            websocket.client_state != WebSocketState.CONNECTED
+            or websocket.application_state != WebSocketState.CONNECTED
+        ):
+            return
+
+        # Error details stay in the server log
+        reason = (
+            "internal error" if self.close_code == CLOSE_ERROR else self.close_reason
+        )
+        await websocket.close(
+            code=self.close_code or CLOSE_NORMAL, reason=(reason or "")[:120]
+        )
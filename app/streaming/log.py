@@ -0,0 +1,151 @@
+"""
+Logging for the streaming server.
+
+Hot-path events (audio frames, text partials) used to be printed one line per
+frame, which costs real CPU at ~125 frames/s per user and blocks the event
+loop whenever stdout is a slow pipe. setup_logging() routes all records
+through a QueueHandler, so the event loop only enqueues them and a background
+QueueListener thread formats and writes them. On top of that:
+
+- Records are emitted through a few loggers (see below) with levels;
+  per-frame audio logging is off unless JARVIS_LOG_AUDIO=1.
+- DEBUG/INFO records are rate limited per category (the logger name, or an
+  explicit `category` field) to JARVIS_LOG_RATE records per second. The
+  number of records dropped is reported on the next record that gets through.
+- Structured fields passed as `extra` (session, direction, bytes, ...) are
+  appended as key=value pairs, or emitted as JSON with JARVIS_LOG_FORMAT=json.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+# Log level for the server loggers
+LOG_LEVEL = os.environ.get("JARVIS_LOG_LEVEL", "INFO").upper()
+
+# Per-frame audio logging (off by default; very verbose)
+LOG_AUDIO = os.environ.get("JARVIS_LOG_AUDIO", "0") == "1"
+
+# DEBUG/INFO records allowed per category per second (0 disables the limit)
+LOG_RATE = float(os.environ.get("JARVIS_LOG_RATE", "20"))
+
+# "text" (key=value fields) or "json" (one object per line)
+LOG_FORMAT = os.environ.get("JARVIS_LOG_FORMAT", "text")
+
+# Connection lifecycle, sessions and control messages
+stream_log = logging.getLogger("jarvis.stream")
+
+# Per-frame audio and text traffic
+audio_log = logging.getLogger("jarvis.audio")
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per category for DEBUG/INFO records.
+
+    Warnings and errors always pass.
+    """
+
+    def __init__(self, rate=LOG_RATE, burst=None):
+        """
+        Args:
+            rate (float): Records per second allowed per category
+            burst (float): Bucket size (defaults to one second worth of records)
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst or max(rate, 1.0)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.rate <= 0 or record.levelno >= logging.WARNING:
+            return True
+
+        category = getattr(record, "category", record.name)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, suppressed = self._buckets.get(
+                category, (self.burst, now, 0)
+            )
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[category] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[category] = (tokens - 1, now, 0)
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats a record with its structured fields, as text or JSON.
+    """
+
+    def __init__(self, json_lines=False):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+        self.json_lines = json_lines
+
+    def format(self, record):
+        fields = {
+            key: value
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRS
+        }
+
+        if self.json_lines:
+            entry = {
+                "time": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+                **fields,
+            }
+            if record.exc_info:
+                entry["exc"] = self.formatException(record.exc_info)
+            return json.dumps(entry, default=str)
+
+        line = super().format(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+def setup_logging(stream=None):
+    """
+    Route the server loggers through a queue to a background writer thread.
+
+    Args:
+        stream: Where to write (defaults to stdout)
+
+    Returns:
+        QueueListener: The running listener (stop it on shutdown)
+    """
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(StructuredFormatter(json_lines=LOG_FORMAT == "json"))
+
+    records = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.addFilter(RateLimitFilter())
+    listener = logging.handlers.QueueListener(
+        records, handler, respect_handler_level=True
+    )
+
+    jarvis = logging.getLogger("jarvis")
+    jarvis.handlers[:] = [queue_handler]
+    jarvis.setLevel(LOG_LEVEL)
+    jarvis.propagate = False
+    audio_log.setLevel(logging.DEBUG if LOG_AUDIO else logging.WARNING)
+
+    listener.start()
+    return listener
@@ -0,0 +1,248 @@
+"""
+Prometheus metrics for the voice assistant server.
+
+A small in-house implementation of counters, gauges and histograms that
+renders the Prometheus text exposition format, so the server doesn't need the
+prometheus_client dependency. Metrics are created once at import time and
+labelled only with values from small fixed sets (direction, frame kind, tool
+name, Calendar API method), never with session IDs, to keep cardinality low.
+
+Hot paths bind their label values once (e.g. `FRAMES.labels("in", "audio")`)
+and then only pay for a lock and an addition per update.
+"""
+
+import bisect
+import threading
+
+# Default latency buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Every metric, in registration order
+REGISTRY = []
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _CounterChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+    def dec(self, amount=1.0):
+        self.inc(-amount)
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class _Metric:
+    """
+    A metric family: one child per combination of label values.
+    """
+
+    kind = None
+    child_class = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _new_child(self):
+        return self.child_class()
+
+    def labels(self, *values):
+        """
+        Get the child for a combination of label values (bind it once on hot paths).
+        """
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield self.name, _format_labels(self.labelnames, values), child.value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for name, labels, value in self._samples():
+            lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count (use rate() for per-second values).
+    """
+
+    kind = "counter"
+    child_class = _CounterChild
+
+    def inc(self, amount=1.0):
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """
+    Value that goes up and down, either set directly or read from a callback
+    when the metrics are scraped.
+    """
+
+    kind = "gauge"
+    child_class = _GaugeChild
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self._callback = callback
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def _samples(self):
+        if self._callback is not None:
+            yield self.name, "", self._callback()
+            return
+        yield from super()._samples()
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in cumulative buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+
+            cumulative = 0
+            bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, values, f'le="{bound}"')
+                yield f"{self.name}_bucket", labels, cumulative
+
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+def render():
+    """
+    Render every registered metric in the Prometheus text format.
+
+    Returns:
+        str: The exposition text
+    """
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+#
+# Server metrics
+#
+
+TURN_LATENCY = Histogram(
+    "jarvis_turn_first_response_seconds",
+    "End of user input (speech or text) to the first model frame sent to the client",
+    ["input"],
+)
+
+INTERRUPT_LATENCY = Histogram(
+    "jarvis_interrupt_to_silence_seconds",
+    "Model interruption to the interrupt frame sent, after which the client stops playback",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+TOOL_DURATION = Histogram(
+    "jarvis_tool_duration_seconds",
+    "Calendar tool call duration, including time waiting for a worker thread",
+    ["tool", "status"],
+)
+
+CALENDAR_RTT = Histogram(
+    "jarvis_calendar_request_seconds",
+    "Google Calendar API request round-trip time",
+    ["method"],
+)
+
+FRAMES = Counter(
+    "jarvis_ws_frames_total",
+    "WebSocket frames exchanged with clients",
+    ["direction", "kind"],
+)
+
+BYTES = Counter(
+    "jarvis_ws_bytes_total",
+    "Payload bytes exchanged with clients",
+    ["direction", "kind"],
+)
+
+CALENDAR_SERVICE_LOOKUPS = Counter(
+    "jarvis_calendar_service_lookups_total",
+    "Calendar service lookups by tool calls, by whether the service was reused or built",
+    ["result"],
+)
+
+CALENDAR_SERVICE_BUILD = Histogram(
+    "jarvis_calendar_service_build_seconds",
+    "Time to build a Calendar service (credentials and discovery document)",
+)
+
+PREFETCH_LOOKUPS = Counter(
+    "jarvis_prefetch_lookups_total",
+    "list_events lookups in the events prefetched when the session connected",
+    ["result"],
+)
@@ -0,0 +1,377 @@
+"""
+Outbound message queue for a client WebSocket.
+
+Messages from the agent are queued per connection and written by a dedicated
+writer task, so a slow client never blocks the live event stream and queued
+model audio can be purged the moment the user barges in instead of playing out
+behind the interruption.
+
+The queue is bounded. Once it holds more than OUTBOUND_HIGH_WATER frames the
+configured slow-client policies apply:
+
+- "drop_audio": drop the oldest queued model audio to make room
+- "coalesce_text": merge consecutive text partials into one frame
+- "disconnect": close the connection if the queue stays above the high-water
+  mark for SLOW_CLIENT_GRACE seconds
+"""
+
+import asyncio
+import collections
+import os
+import time
+
+from .lifecycle import CloseConnection
+from .log import stream_log
+from .metrics import BYTES, FRAMES, INTERRUPT_LATENCY, TURN_LATENCY
+from .protocol import encode_audio, encode_control, encode_text, send_frame
+
+# Message kinds held in the queue
+AUDIO = "audio"
+TEXT = "text"
+CONTROL = "control"
+
+# Queue bounds (frames)
+OUTBOUND_MAX_FRAMES = int(os.environ.get("JARVIS_OUTBOUND_MAX_FRAMES", "500"))
+OUTBOUND_HIGH_WATER = int(os.environ.get("JARVIS_OUTBOUND_HIGH_WATER", "200"))
+
+# Slow-client policies applied above the high-water mark
+OUTBOUND_POLICIES = frozenset(
+    policy.strip()
+    for policy in os.environ.get(
+        "JARVIS_OUTBOUND_POLICY", "drop_audio,coalesce_text"
+    ).split(",")
+    if policy.strip()
+)
+
+# Seconds the queue may stay above the high-water mark before "disconnect" applies
+SLOW_CLIENT_GRACE = float(os.environ.get("JARVIS_SLOW_CLIENT_GRACE", "5"))
+
+# WebSocket close code used for slow clients ("try again later")
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+# Outbound frame and byte counters, bound once per kind
+_FRAMES_OUT = {kind: FRAMES.labels("out", kind) for kind in (AUDIO, TEXT, CONTROL)}
+_BYTES_OUT = {kind: BYTES.labels("out", kind) for kind in (AUDIO, TEXT, CONTROL)}
+
+
+class OutboundQueue:
+    """
+    Per-connection bounded queue of outbound messages, drained by a writer task.
+
+    Messages are stored unencoded as (kind, payload, enqueued_at) so text
+    partials can still be merged; they are encoded for the connection's
+    protocol by the writer.
+    """
+
+    def __init__(
+        self,
+        websocket,
+        binary,
+        max_frames=OUTBOUND_MAX_FRAMES,
+        high_water=OUTBOUND_HIGH_WATER,
+        policies=OUTBOUND_POLICIES,
+        session_id=None,
+    ):
+        """
+        Args:
+            websocket (WebSocket): The client connection
+            binary (bool): Whether the connection uses binary frames
+            max_frames (int): Hard limit on queued frames
+            high_water (int): Depth at which the slow-client policies apply
+            policies (set): Enabled slow-client policies
+            session_id (str): The client session ID (for logging)
+        """
+        self._websocket = websocket
+        self._binary = binary
+        self._max_frames = max_frames
+        self._high_water = high_water
+        self._policies = policies
+        self.session_id = session_id
+
+        self._items = collections.deque()
+        self._ready = asyncio.Event()
+        self._task = None
+        self._over_since = None
+        self.closed = False
+
+        # Interruption bookkeeping (time the interrupt arrived -> frame written)
+        self._interrupt_started = None
+        self.interrupt_latencies = collections.deque(maxlen=100)
+
+        # Time to first response after (re)connecting (first input -> first frame)
+        self._input_started = None
+        self.first_response_latency = None
+
+        # Turn latency (end of user input -> first model frame of the expected kind)
+        self._turn_ended = None
+        self._turn_input = None
+        self._turn_response = None
+        self._responding = False
+
+        # Queue depth and send latency metrics
+        self.max_depth = 0
+        self.sent = 0
+        self.dropped_audio = 0
+        self.coalesced_text = 0
+        self.send_latency_total = 0.0
+        self.send_latency_max = 0.0
+
+    def __len__(self):
+        return len(self._items)
+
+    def attach(self, websocket, binary):
+        """
+        Bind the queue to a new client connection (after a reconnect).
+
+        Audio queued while no client was connected is stale by now and is
+        dropped; text and control messages are still delivered.
+
+        Args:
+            websocket (WebSocket): The new client connection
+            binary (bool): Whether the connection uses binary frames
+        """
+        self._websocket = websocket
+        self._binary = binary
+        self._drop_oldest_audio(len(self._items))
+        self._over_since = None
+        self._interrupt_started = None
+        self._input_started = None
+        self.first_response_latency = None
+        self._turn_ended = None
+        self._responding = False
+        self.closed = False
+        self._ready.set()
+
+    def mark_input(self):
+        """
+        Record the first client message on this connection, to time the first response.
+        """
+        if self._input_started is None and self.first_response_latency is None:
+            self._input_started = time.perf_counter()
+
+    def mark_turn_end(self, input_kind, audio_response, ended_at=None):
+        """
+        Record the end of a user turn, to time the model's first response to it.
+
+        Args:
+            input_kind (str): "voice" or "text" (the metric label)
+            audio_response (bool): Whether to wait for audio rather than text
+            ended_at (float): When the input ended (perf_counter), defaults to now
+        """
+        self._turn_ended = ended_at if ended_at is not None else time.perf_counter()
+        self._turn_input = input_kind
+        self._turn_response = AUDIO if audio_response else TEXT
+
+    def mark_speech(self, audio_response, at):
+        """
+        Record a speech frame from the client; the last one before the model
+        answers is the end of the voice turn.
+
+        Speech while the model is still answering (echo or barge-in before the
+        interrupt) doesn't start a new turn.
+
+        Args:
+            audio_response (bool): Whether to wait for audio rather than text
+            at (float): When the speech frame arrived (perf_counter)
+        """
+        if not self._responding:
+            self.mark_turn_end("voice", audio_response, at)
+
+    def put_audio(self, data):
+        """
+        Queue a chunk of model audio.
+        """
+        self._put(AUDIO, data)
+
+    def put_text(self, text):
+        """
+        Queue a model text partial.
+        """
+        if (
+            "coalesce_text" in self._policies
+            and len(self._items) >= self._high_water
+            and self._items[-1][0] == TEXT
+        ):
+            # Merge into the text partial that is still waiting
+            _, queued, enqueued_at = self._items.pop()
+            self._items.append((TEXT, queued + text, enqueued_at))
+            self.coalesced_text += 1
+            return
+        self._put(TEXT, text)
+
+    def put_control(self, turn_complete, interrupted):
+        """
+        Queue a turn_complete/interrupted control message.
+        """
+        self._put(CONTROL, (turn_complete, interrupted))
+
+    def interrupt(self):
+        """
+        Drop all queued model audio and send the interruption frame next.
+
+        Returns:
+            int: Number of audio frames purged
+        """
+        self._interrupt_started = time.perf_counter()
+
+        kept = [item for item in self._items if item[0] != AUDIO]
+        purged = len(self._items) - len(kept)
+        self._items.clear()
+        self._items.append((CONTROL, (False, True), self._interrupt_started))
+        self._items.extend(kept)
+        self._ready.set()
+        return purged
+
+    def _put(self, kind, payload):
+        if self.closed:
+            return
+
+        if len(self._items) >= self._high_water:
+            self._apply_policies()
+            if self.closed:
+                return
+
+        if len(self._items) >= self._max_frames:
+            if kind == AUDIO:
+                # No room left: the newest audio is dropped rather than blocking
+                self.dropped_audio += 1
+                return
+            self._drop_oldest_audio(len(self._items) - self._max_frames + 1)
+
+        self._items.append((kind, payload, time.perf_counter()))
+        self.max_depth = max(self.max_depth, len(self._items))
+        self._ready.set()
+
+    def _apply_policies(self):
+        now = time.perf_counter()
+        if self._over_since is None:
+            self._over_since = now
+
+        if "drop_audio" in self._policies:
+            self._drop_oldest_audio(len(self._items) - self._high_water + 1)
+
+        if (
+            "disconnect" in self._policies
+            and now - self._over_since > SLOW_CLIENT_GRACE
+        ):
+            self._disconnect()
+
+    def _drop_oldest_audio(self, count):
+        if count <= 0:
+            return
+
+        kept = collections.deque()
+        for item in self._items:
+            if count and item[0] == AUDIO:
+                count -= 1
+                self.dropped_audio += 1
+                continue
+            kept.append(item)
+        self._items = kept
+
+    def _disconnect(self):
+        # Stop the writer; the connection is closed with SLOW_CLIENT_CLOSE_CODE
+        self.closed = True
+        self._items.clear()
+        if self._task:
+            self._task.cancel()
+
+    def _encode(self, kind, payload):
+        if kind == AUDIO:
+            return encode_audio(payload, self._binary)
+        if kind == TEXT:
+            return encode_text(payload, self._binary)
+        return encode_control(payload[0], payload[1], self._binary)
+
+    async def run(self):
+        """
+        Writer loop: send queued frames in order until cancelled or the socket fails.
+        """
+        self._task = asyncio.current_task()
+        websocket = self._websocket
+        try:
+            # Stops once the queue is attached to a newer connection
+            while self._websocket is websocket:
+                if not self._items:
+                    self._over_since = None
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+
+                kind, payload, enqueued_at = self._items.popleft()
+
+                # The client has caught up once the queue drains to half the mark
+                if len(self._items) < self._high_water // 2:
+                    self._over_since = None
+
+                frame = self._encode(kind, payload)
+                await send_frame(websocket, frame)
+                _FRAMES_OUT[kind].inc()
+                _BYTES_OUT[kind].inc(len(frame))
+
+                if kind == self._turn_response and self._turn_ended is not None:
+                    TURN_LATENCY.labels(self._turn_input).observe(
+                        time.perf_counter() - self._turn_ended
+                    )
+                    self._turn_ended = None
+
+                # The model is answering until its turn completes or is interrupted
+                self._responding = kind != CONTROL
+
+                latency = time.perf_counter() - enqueued_at
+                self.sent += 1
+                self.send_latency_total += latency
+                self.send_latency_max = max(self.send_latency_max, latency)
+
+                if self._input_started is not None:
+                    self.first_response_latency = (
+                        time.perf_counter() - self._input_started
+                    )
+                    self._input_started = None
+                    stream_log.info(
+                        "first response",
+                        extra={
+                            "session": self.session_id,
+                            "ms": round(self.first_response_latency * 1000, 2),
+                        },
+                    )
+
+                # The client clears its player as soon as it sees the interrupt
+                if kind == CONTROL and payload[1] and self._interrupt_started:
+                    latency = time.perf_counter() - self._interrupt_started
+                    self._interrupt_started = None
+                    self.interrupt_latencies.append(latency)
+                    INTERRUPT_LATENCY.observe(latency)
+                    stream_log.info(
+                        "interrupt-to-silence",
+                        extra={
+                            "session": self.session_id,
+                            "ms": round(latency * 1000, 2),
+                        },
+                    )
+        except asyncio.CancelledError:
+            if not self.closed:
+                raise
+            stream_log.warning(
+                "client too slow, disconnecting", extra={"session": self.session_id}
+            )
+            raise CloseConnection("client too slow", SLOW_CLIENT_CLOSE_CODE)
+
+    def stats(self):
+        """
+        Report queue depth and send latency metrics for this connection.
+
+        Returns:
+            dict: Current and maximum depth, frame counts and send latency in milliseconds
+        """
+        return {
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped_audio": self.dropped_audio,
+            "coalesced_text": self.coalesced_text,
+            "avg_send_latency_ms": round(
+                self.send_latency_total * 1000 / self.sent if self.sent else 0.0, 3
+            ),
+            "max_send_latency_ms": round(self.send_latency_max * 1000, 3),
+        }
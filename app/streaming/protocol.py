@@ -0,0 +1,157 @@
+"""
+WebSocket frame protocol between the browser client and the server.
+
+Two encodings are supported and negotiated on connect with the WebSocket
+subprotocol header:
+
+- "adk.binary.v1": every message is a binary frame made of a 2-byte header
+  (kind, flags) followed by the payload. Audio payloads are raw 16-bit PCM,
+  text payloads are UTF-8 and control frames carry their state in the flags.
+- "adk.json.v1" (or no subprotocol): the original JSON text messages with
+  Base64-encoded audio, kept as a fallback for older clients.
+"""
+
+import base64
+import json
+
+BINARY_SUBPROTOCOL = "adk.binary.v1"
+JSON_SUBPROTOCOL = "adk.json.v1"
+
+# Frame kinds (first header byte)
+KIND_AUDIO = 0x01
+KIND_TEXT = 0x02
+KIND_CONTROL = 0x03
+
+# Text frame flags (second header byte)
+ROLE_MODEL = 0x00
+ROLE_USER = 0x01
+
+# Control frame flags (second header byte)
+FLAG_TURN_COMPLETE = 0x01
+FLAG_INTERRUPTED = 0x02
+
+_ROLE_FLAGS = {"model": ROLE_MODEL, "user": ROLE_USER}
+_FLAG_ROLES = {ROLE_MODEL: "model", ROLE_USER: "user"}
+
+
+def negotiate_subprotocol(offered):
+    """
+    Pick the subprotocol to accept from the ones offered by the client.
+
+    Args:
+        offered (list): Subprotocols from the client's handshake
+
+    Returns:
+        str: The accepted subprotocol, or None for a client that offered none
+    """
+    if BINARY_SUBPROTOCOL in offered:
+        return BINARY_SUBPROTOCOL
+    if JSON_SUBPROTOCOL in offered:
+        return JSON_SUBPROTOCOL
+    return None
+
+
+def encode_audio(data, binary):
+    """
+    Encode a PCM audio chunk sent by the model.
+
+    Args:
+        data (bytes): Raw 16-bit PCM audio
+        binary (bool): Whether the connection uses binary frames
+
+    Returns:
+        bytes | str: The frame to send
+    """
+    if binary:
+        return bytes((KIND_AUDIO, 0)) + data
+    return json.dumps(
+        {
+            "mime_type": "audio/pcm",
+            "data": base64.b64encode(data).decode("ascii"),
+            "role": "model",
+        }
+    )
+
+
+def encode_text(text, binary, role="model"):
+    """
+    Encode a text message.
+
+    Args:
+        text (str): The text to send
+        binary (bool): Whether the connection uses binary frames
+        role (str): "model" or "user"
+
+    Returns:
+        bytes | str: The frame to send
+    """
+    if binary:
+        return bytes((KIND_TEXT, _ROLE_FLAGS.get(role, ROLE_MODEL))) + text.encode(
+            "utf-8"
+        )
+    return json.dumps({"mime_type": "text/plain", "data": text, "role": role})
+
+
+def encode_control(turn_complete, interrupted, binary):
+    """
+    Encode a turn_complete/interrupted control message.
+
+    Args:
+        turn_complete (bool): Whether the model finished its turn
+        interrupted (bool): Whether the model was interrupted
+        binary (bool): Whether the connection uses binary frames
+
+    Returns:
+        bytes | str: The frame to send
+    """
+    if binary:
+        flags = (FLAG_TURN_COMPLETE if turn_complete else 0) | (
+            FLAG_INTERRUPTED if interrupted else 0
+        )
+        return bytes((KIND_CONTROL, flags))
+    return json.dumps({"turn_complete": turn_complete, "interrupted": interrupted})
+
+
+def decode_message(message):
+    """
+    Decode a message received from the client.
+
+    Binary audio payloads are returned as a memoryview over the received frame,
+    so no copy is made.
+
+    Args:
+        message (dict): An ASGI "websocket.receive" message
+
+    Returns:
+        tuple: (mime_type, data, role) where data is bytes-like for audio and str for text
+    """
+    frame = message.get("bytes")
+    if frame is not None:
+        if len(frame) < 2:
+            raise ValueError("Frame too short")
+
+        kind, flags = frame[0], frame[1]
+        payload = memoryview(frame)[2:]
+        if kind == KIND_AUDIO:
+            return "audio/pcm", payload, "user"
+        if kind == KIND_TEXT:
+            return "text/plain", str(payload, "utf-8"), _FLAG_ROLES.get(flags, "user")
+        raise ValueError(f"Frame kind not supported: {kind}")
+
+    # JSON fallback
+    data = json.loads(message["text"])
+    mime_type = data["mime_type"]
+    role = data.get("role", "user")  # Default to 'user' if role is not provided
+    if mime_type == "audio/pcm":
+        return mime_type, base64.b64decode(data["data"]), role
+    return mime_type, data["data"], role
+
+
+async def send_frame(websocket, frame):
+    """
+    Send an encoded frame over the WebSocket as binary or text.
+    """
+    if isinstance(frame, bytes):
+        await websocket.send_bytes(frame)
+    else:
+        await websocket.send_text(frame)
@@ -0,0 +1,207 @@
+"""
+Live session resumption for reconnecting clients.
+
+The browser reconnects with the same session ID after a dropped connection.
+Instead of starting a new live model stream every time, the stream is parked
+when the socket goes away and reattached if the client comes back within
+RESUME_GRACE seconds. The stream is read by a pump task that outlives the
+socket and writes into the session's OutboundQueue, which is rebound to each
+new connection.
+
+A reconnect in a different modality (text <-> audio) needs a new live stream,
+but it is started on the same ADK session so the conversation history carries
+over.
+
+Live sessions are kept per (user ID, session ID), so a session ID chosen by
+one user never resumes another user's stream.
+"""
+
+import asyncio
+import os
+import time
+
+from .lifecycle import CLOSE_STREAM_ENDED, CLOSE_SUPERSEDED
+from .log import stream_log
+from .outbound import OutboundQueue
+
+# Seconds a disconnected live stream is kept around for the client to come back
+RESUME_GRACE = float(os.environ.get("JARVIS_RESUME_GRACE", "30"))
+
+
+class LiveSession:
+    """
+    A live model stream and the state that survives reconnects.
+    """
+
+    def __init__(self, user_id, session_id, is_audio, live_events, live_request_queue):
+        self.user_id = user_id
+        self.session_id = session_id
+        self.is_audio = is_audio
+        self.live_events = live_events
+        self.live_request_queue = live_request_queue
+        self.outbound = OutboundQueue(None, False, session_id=session_id)
+
+        self.pump_task = None
+        self.connection = None
+        self.expiry = None
+        self.created_at = time.perf_counter()
+        self.first_event_latency = None
+        self.resumes = 0
+
+    @property
+    def ended(self):
+        """
+        Whether the live stream has finished.
+        """
+        return self.pump_task is not None and self.pump_task.done()
+
+    def notify_activity(self):
+        """
+        Forward live stream activity to the attached connection (if any).
+        """
+        if self.first_event_latency is None:
+            # Connection setup cost: stream started -> first live event
+            self.first_event_latency = time.perf_counter() - self.created_at
+            stream_log.info(
+                "first live event",
+                extra={
+                    "session": self.session_id,
+                    "ms": round(self.first_event_latency * 1000, 2),
+                },
+            )
+        if self.connection:
+            self.connection.touch()
+
+
+class LiveSessionRegistry:
+    """
+    Keeps live sessions by session ID so reconnects can reattach to them.
+    """
+
+    def __init__(self, start_stream, pump, on_close=None, grace=RESUME_GRACE):
+        """
+        Args:
+            start_stream (callable): (user_id, session_id, is_audio) ->
+                (live_events, live_request_queue)
+            pump (callable): (outbound, live_events, on_activity, user_id, session_id) ->
+                coroutine that forwards live events to the outbound queue
+            on_close (callable): (user_id, session_id) -> called once a live stream
+                is closed
+            grace (float): Seconds a detached session is kept for resumption
+        """
+        self._start_stream = start_stream
+        self._pump = pump
+        self._on_close = on_close
+        self.grace = grace
+        self._sessions = {}
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def attach(self, user_id, session_id, is_audio, connection, stale=False):
+        """
+        Get the live session for a new connection, resuming a parked one if possible.
+
+        Args:
+            user_id (str): The user the connection acts for
+            session_id (str): The client session ID
+            is_audio (bool): Whether the connection uses audio responses
+            connection (ConnectionLifecycle): The new connection
+            stale (bool): Whether the conversation continued elsewhere (e.g. on
+                another worker) since the stream was parked
+
+        Returns:
+            tuple: (LiveSession, resumed) where resumed is True for a reattached stream
+        """
+        key = (user_id, session_id)
+        live = self._sessions.get(key)
+
+        if live:
+            # A different modality or a conversation that moved on elsewhere
+            # needs a new stream (the ADK session is reused)
+            if live.ended:
+                self.close(live, "stream ended", CLOSE_STREAM_ENDED)
+                live = None
+            elif live.is_audio != is_audio:
+                self.close(live, "modality switch")
+                live = None
+            elif stale:
+                self.close(live, "continued on another worker")
+                live = None
+
+        resumed = live is not None
+        if live:
+            if live.expiry:
+                live.expiry.cancel()
+                live.expiry = None
+
+            # A second connection for the same session replaces the first one
+            if live.connection and live.connection is not connection:
+                live.connection.end("superseded")
+            live.resumes += 1
+        else:
+            live_events, live_request_queue = self._start_stream(
+                user_id, session_id, is_audio
+            )
+            live = LiveSession(
+                user_id, session_id, is_audio, live_events, live_request_queue
+            )
+            live.pump_task = asyncio.create_task(
+                self._pump(
+                    live.outbound,
+                    live_events,
+                    live.notify_activity,
+                    user_id,
+                    session_id,
+                )
+            )
+            self._sessions[key] = live
+
+        live.connection = connection
+        return live, resumed
+
+    def detach(self, live, connection):
+        """
+        Park a live session after its connection ended, closing it after the grace period.
+        """
+        if live.connection is not connection:
+            # Already taken over by a newer connection
+            return
+        live.connection = None
+
+        if live.ended or self.grace <= 0:
+            self.close(live, "stream ended" if live.ended else "disconnected")
+            return
+
+        live.expiry = asyncio.get_running_loop().call_later(
+            self.grace, self.close, live, "resume window expired"
+        )
+
+    def close(self, live, reason, code=CLOSE_SUPERSEDED):
+        """
+        Close a live session's model stream now.
+
+        Args:
+            live (LiveSession): The live session
+            reason (str): Why it is closed
+            code (int): Close code for a connection still attached to it
+        """
+        key = (live.user_id, live.session_id)
+        registered = self._sessions.get(key) is live
+        if registered:
+            del self._sessions[key]
+        if live.expiry:
+            live.expiry.cancel()
+            live.expiry = None
+        if live.connection:
+            live.connection.end(reason, code)
+            live.connection = None
+
+        live.live_request_queue.close()
+        if live.pump_task:
+            live.pump_task.cancel()
+        if registered and self._on_close:
+            self._on_close(live.user_id, live.session_id)
+        stream_log.info(
+            "live stream closed", extra={"session": live.session_id, "reason": reason}
+        )
@@ -0,0 +1,674 @@
+"""
+Bounded, optionally shared session storage for the ADK runner.
+
+InMemorySessionService keeps every session forever, so a long-running server
+grows with every reconnect. BoundedSessionService keeps the hot sessions in
+memory in LRU order and evicts them when they sit idle for too long or when
+the session count or memory cap is exceeded.
+
+With a session store configured, every session is also persisted there and
+loaded back on its next use. The store can be shared by several workers (a
+SQLite file on one host, or Redis across hosts), so a client that reconnects
+to a different worker keeps its conversation. Writes go through a
+write-behind thread, so storing events never blocks the event loop, and
+connecting clients are checked against the store with refresh(), which reads
+it on a worker thread.
+
+Audio in events is only needed while it streams, so stored sessions keep the
+events without their inline audio, and each write serializes only the events
+added since the previous one.
+"""
+
+import asyncio
+import collections
+import copy
+import os
+import sqlite3
+import threading
+import time
+import weakref
+
+from google.adk.sessions import InMemorySessionService, Session
+
+from .log import stream_log
+
+# Maximum number of sessions kept in memory
+MAX_SESSIONS = int(os.environ.get("JARVIS_MAX_SESSIONS", "1000"))
+
+# Approximate memory cap for in-memory sessions (bytes of serialized events)
+MAX_SESSION_BYTES = int(
+    os.environ.get("JARVIS_SESSION_MAX_BYTES", str(256 * 1024 * 1024))
+)
+
+# Seconds without activity after which a session is evicted from memory
+SESSION_IDLE_TTL = float(os.environ.get("JARVIS_SESSION_IDLE_TTL", "3600"))
+
+# Session store shared by workers: "sqlite:///path/to/sessions.db" or
+# "redis://host:6379/0" (JARVIS_SESSION_DB is a shorthand for a SQLite file)
+SESSION_STORE_URL = os.environ.get("JARVIS_SESSION_STORE", "") or (
+    "sqlite:///" + os.environ["JARVIS_SESSION_DB"]
+    if os.environ.get("JARVIS_SESSION_DB")
+    else ""
+)
+
+# Seconds between write-behind flushes of changed sessions to the store
+SESSION_FLUSH_INTERVAL = float(os.environ.get("JARVIS_SESSION_FLUSH_INTERVAL", "0.5"))
+
+# Seconds between recounts of the stored sessions (reported by stats())
+STORE_COUNT_INTERVAL = 10.0
+
+# Key prefix for sessions kept in Redis
+REDIS_KEY_PREFIX = "jarvis:session:"
+
+
+class SqliteSessionStore:
+    """
+    SQLite table holding serialized sessions.
+
+    WAL mode lets several worker processes on one host share the file.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                app_name TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (app_name, user_id, session_id)
+            )
+            """)
+        self._db.commit()
+
+    def save(self, key, data):
+        """
+        Store a serialized session.
+
+        Returns:
+            float: The session's new update time
+        """
+        updated = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?)",
+                (*key, data, updated),
+            )
+            self._db.commit()
+        return updated
+
+    def load(self, key):
+        """
+        Returns:
+            tuple: (data, update time), or None if the session isn't stored
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, updated FROM sessions "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                key,
+            ).fetchone()
+        return row
+
+    def updated(self, key):
+        """
+        Returns:
+            float: The stored session's update time, or None if it isn't stored
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT updated FROM sessions "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                key,
+            ).fetchone()
+        return row[0] if row else None
+
+    def delete(self, key):
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM sessions "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                key,
+            )
+            self._db.commit()
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+class RedisSessionStore:
+    """
+    Serialized sessions in Redis (one hash per session), for workers on several hosts.
+
+    Requires the `redis` package.
+    """
+
+    def __init__(self, url):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+
+    def _key(self, key):
+        return REDIS_KEY_PREFIX + ":".join(key)
+
+    def save(self, key, data):
+        updated = time.time()
+        self._redis.hset(self._key(key), mapping={"data": data, "updated": updated})
+        return updated
+
+    def load(self, key):
+        data, updated = self._redis.hmget(self._key(key), "data", "updated")
+        if data is None:
+            return None
+        return data.decode(), float(updated)
+
+    def updated(self, key):
+        updated = self._redis.hget(self._key(key), "updated")
+        return float(updated) if updated is not None else None
+
+    def delete(self, key):
+        self._redis.delete(self._key(key))
+
+    def count(self):
+        return sum(1 for _ in self._redis.scan_iter(match=REDIS_KEY_PREFIX + "*"))
+
+
+def without_audio(event):
+    """
+    Copy an event without its inline audio parts (the event itself is unchanged).
+
+    Args:
+        event (Event): The event
+
+    Returns:
+        Event: The event, or a copy of it if it carried audio
+    """
+    content = event.content
+    if not content or not content.parts:
+        return event
+
+    parts = [
+        part
+        for part in content.parts
+        if not (
+            part.inline_data and (part.inline_data.mime_type or "").startswith("audio/")
+        )
+    ]
+    if len(parts) == len(content.parts):
+        return event
+    return event.model_copy(
+        update={"content": content.model_copy(update={"parts": parts})}
+    )
+
+
+def open_session_store(url):
+    """
+    Open the session store for a JARVIS_SESSION_STORE URL.
+
+    Args:
+        url (str): "sqlite:///path/to/file.db" or "redis://host:port/db"
+
+    Returns:
+        The session store, or None if the URL is empty
+    """
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        return SqliteSessionStore(url[len("sqlite:///") :])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionStore(url)
+    raise ValueError(f"Unsupported session store: {url}")
+
+
+class SessionWriter:
+    """
+    Write-behind thread that persists changed sessions to the store.
+
+    The event loop only records which sessions changed; serializing and
+    writing them happens on this thread every SESSION_FLUSH_INTERVAL seconds
+    (or right away after flush()). Events don't change once appended, so
+    each session's serialized events are kept and only new events are
+    serialized on the next write. The thread also recounts the stored
+    sessions every STORE_COUNT_INTERVAL seconds, since counting scans the
+    whole store.
+    """
+
+    def __init__(self, store, interval=SESSION_FLUSH_INTERVAL):
+        self._store = store
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._wake = threading.Event()
+        self._stopped = False
+
+        # Update time of the last version written (or loaded) per session
+        self.versions = {}
+        self.writes = 0
+        self.write_seconds = 0.0
+
+        # Serialized events per session: (weak reference to the session, JSON
+        # of its events so far), dropped once the session is gone from memory
+        self._serialized = {}
+
+        # Sessions in the store (all workers), as of the last recount
+        self.stored_count = 0
+        self._counted_at = None
+
+        self._thread = threading.Thread(
+            target=self._run, name="jarvis-session-writer", daemon=True
+        )
+        self._thread.start()
+
+    def mark(self, key, session):
+        """
+        Schedule a session to be written.
+        """
+        with self._lock:
+            self._pending[key] = session
+
+    def pending(self, key):
+        """
+        Get a session that changed but hasn't been written yet.
+        """
+        with self._lock:
+            return self._pending.get(key)
+
+    def discard(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def flush(self):
+        """
+        Write pending sessions now (without waiting for them).
+        """
+        self._wake.set()
+
+    def _serialize(self, key, session):
+        # Start over for a different session object (re-created or reloaded)
+        cached = self._serialized.get(key)
+        if cached is None or cached[0]() is not session:
+            cached = self._serialized[key] = (weakref.ref(session), [])
+        events = cached[1]
+
+        # Only events appended since the last write are serialized
+        for event in session.events[len(events) :]:
+            events.append(event.model_dump_json(exclude_none=True))
+
+        head = session.model_dump_json(exclude={"events"}, exclude_none=True)
+        return head[:-1] + ',"events":[' + ",".join(events) + "]}"
+
+    def _write_pending(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+
+        for key, session in batch.items():
+            started = time.perf_counter()
+            try:
+                data = self._serialize(key, session)
+            except RuntimeError:
+                # Changed while being serialized; try again on the next pass
+                with self._lock:
+                    self._pending.setdefault(key, session)
+                continue
+            self.versions[key] = self._store.save(key, data)
+            self.writes += 1
+            self.write_seconds += time.perf_counter() - started
+
+    def _recount(self):
+        now = time.monotonic()
+        if self._counted_at is None or now - self._counted_at >= STORE_COUNT_INTERVAL:
+            self.stored_count = self._store.count()
+            self._counted_at = now
+
+            # Forget the serialized events of sessions evicted from memory
+            for key, (ref, _) in list(self._serialized.items()):
+                if ref() is None:
+                    del self._serialized[key]
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            try:
+                self._write_pending()
+                self._recount()
+            except Exception as e:
+                stream_log.exception("session writer error: %r", e)
+
+    def close(self):
+        """
+        Write everything still pending and stop the thread.
+        """
+        self._stopped = True
+        self._wake.set()
+        self._thread.join()
+        self._write_pending()
+
+
+class BoundedSessionService(InMemorySessionService):
+    """
+    InMemorySessionService with LRU/idle-TTL eviction, a memory cap and an
+    optional (shared) session store behind it.
+    """
+
+    def __init__(
+        self,
+        max_sessions=MAX_SESSIONS,
+        max_bytes=MAX_SESSION_BYTES,
+        idle_ttl=SESSION_IDLE_TTL,
+        store_url=SESSION_STORE_URL,
+    ):
+        """
+        Args:
+            max_sessions (int): Maximum number of sessions kept in memory
+            max_bytes (int): Approximate memory cap for in-memory sessions
+            idle_ttl (float): Seconds of inactivity before a session is evicted
+            store_url (str): Session store URL ("" keeps sessions in memory only)
+        """
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.store = open_session_store(store_url)
+        self.writer = SessionWriter(self.store) if self.store else None
+
+        # (app_name, user_id, session_id) -> [last_used, approximate bytes],
+        # ordered from least to most recently used
+        self._lru = collections.OrderedDict()
+        self.bytes_held = 0
+        self.evictions = 0
+        self.reloads = 0
+        self.readmissions = 0
+
+        # Sessions a live stream is using (with the number of streams), never evicted
+        self._pinned = collections.Counter()
+
+    def __len__(self):
+        return len(self._lru)
+
+    def _touch(self, key, added_bytes=0):
+        entry = self._lru.get(key)
+        if entry is None:
+            entry = self._lru[key] = [0.0, 0]
+        entry[0] = time.monotonic()
+        entry[1] += added_bytes
+        self.bytes_held += added_bytes
+        self._lru.move_to_end(key)
+
+    def _forget(self, key):
+        entry = self._lru.pop(key, None)
+        if entry:
+            self.bytes_held -= entry[1]
+        app_name, user_id, session_id = key
+        self.sessions.get(app_name, {}).get(user_id, {}).pop(session_id, None)
+
+    def _forget_size(self, key):
+        entry = self._lru.get(key)
+        if entry:
+            self.bytes_held -= entry[1]
+            entry[1] = 0
+
+    def _stored_session(self, key):
+        app_name, user_id, session_id = key
+        return self.sessions[app_name][user_id][session_id]
+
+    def _in_memory(self, key):
+        app_name, user_id, session_id = key
+        return session_id in self.sessions.get(app_name, {}).get(user_id, {})
+
+    def _mark_changed(self, key):
+        if self.writer:
+            self.writer.mark(key, self._stored_session(key))
+
+    def _evict(self):
+        now = time.monotonic()
+        newest = next(reversed(self._lru), None)
+        for key, (last_used, _) in list(self._lru.items()):
+            over_cap = (
+                len(self._lru) > self.max_sessions or self.bytes_held > self.max_bytes
+            )
+            if now - last_used < self.idle_ttl and not over_cap:
+                break
+
+            # Sessions used by a live stream, and the one in use right now, stay
+            if key in self._pinned or key == newest:
+                continue
+
+            # The store already has the session (or the writer still holds it)
+            self._forget(key)
+            self.evictions += 1
+
+    def _put(self, key, session, size):
+        app_name, user_id, session_id = key
+        self._forget(key)
+        self.sessions.setdefault(app_name, {}).setdefault(user_id, {})[
+            session_id
+        ] = session
+        self._touch(key, size)
+        self._evict()
+
+    def _changed_elsewhere(self, key):
+        updated = self.store.updated(key)
+        return updated is not None and updated > self.writer.versions.get(key, 0)
+
+    def _load_stored(self, key):
+        """
+        Bring a session into memory from the store, or refresh a copy that
+        another worker has changed since.
+
+        Returns:
+            bool: True if the session is in memory afterwards
+        """
+        in_memory = self._in_memory(key)
+        if not self.store:
+            return in_memory
+
+        # A change that hasn't been written yet is the newest version
+        pending = self.writer.pending(key)
+        if pending is not None:
+            if not in_memory:
+                self._put(key, pending, len(pending.model_dump_json(exclude_none=True)))
+            return True
+
+        row = self._read_stored(key, in_memory)
+        if row is None:
+            return in_memory
+
+        self._apply_stored(key, row)
+        return True
+
+    def _read_stored(self, key, in_memory):
+        # Store reads only (no changes in memory), so this can run on a worker thread
+        if in_memory and not self._changed_elsewhere(key):
+            return None
+        return self.store.load(key)
+
+    def _apply_stored(self, key, row):
+        data, updated = row
+        self._put(key, Session.model_validate_json(data), len(data))
+        self.writer.versions[key] = updated
+        self.reloads += 1
+
+    async def refresh(self, *, app_name, user_id, session_id):
+        """
+        Bring a session into memory from the store, or refresh a copy that
+        another worker has changed since, reading the store on a worker thread
+        so the event loop isn't blocked.
+
+        Returns:
+            bool: True if the copy in memory (and any live stream using it) was stale
+        """
+        key = (app_name, user_id, session_id)
+        if not self.store or self.writer.pending(key) is not None:
+            return False
+
+        in_memory = self._in_memory(key)
+        row = await asyncio.to_thread(self._read_stored, key, in_memory)
+
+        # A change made here while the store was read is the newest version
+        if row is None or self.writer.pending(key) is not None:
+            return False
+
+        self._apply_stored(key, row)
+        return in_memory
+
+    def create_session(self, *, app_name, user_id, state=None, session_id=None):
+        session = super().create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        key = (app_name, user_id, session.id)
+
+        # Re-creating a session replaces the old one
+        self._forget_size(key)
+        self._touch(key, len(session.model_dump_json(exclude_none=True)))
+        self._mark_changed(key)
+        self._evict()
+        return session
+
+    def get_session(
+        self, *, app_name, user_id, session_id, config=None, from_store=True
+    ):
+        """
+        Get a session, loading it from the store if needed.
+
+        Pass from_store=False right after refresh() to skip the (blocking)
+        store check and only look in memory.
+        """
+        key = (app_name, user_id, session_id)
+        if from_store:
+            if not self._load_stored(key):
+                return None
+        elif not self._in_memory(key):
+            return None
+
+        self._touch(key)
+        return super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+
+    def delete_session(self, *, app_name, user_id, session_id):
+        key = (app_name, user_id, session_id)
+        self._forget(key)
+        if self.store:
+            self.writer.discard(key)
+            self.store.delete(key)
+
+    def append_event(self, session, event):
+        key = (session.app_name, session.user_id, session.id)
+
+        # Partial events are not stored, so they don't count
+        if event.partial:
+            return super().append_event(session=session, event=event)
+
+        if not self._in_memory(key):
+            self._readmit(key, session)
+        super().append_event(session=session, event=event)
+
+        # The stored copy keeps the event without its audio
+        stored = self._stored_session(key)
+        if stored.events and stored.events[-1] is event:
+            event = stored.events[-1] = without_audio(event)
+        self._touch(key, len(event.model_dump_json(exclude_none=True)))
+        self._mark_changed(key)
+        self._evict()
+
+        # Write finished turns right away instead of on the next interval
+        if event.turn_complete:
+            self.flush()
+        return event
+
+    def _readmit(self, key, session):
+        """
+        Bring back a session that was evicted while a caller still holds it.
+
+        The stored copy is used if it has the caller's whole history; otherwise
+        the caller's copy is put back, so no events are lost.
+        """
+        self.readmissions += 1
+        if self._load_stored(key):
+            stored = len(self._stored_session(key).events)
+            if stored >= len(session.events):
+                stream_log.warning(
+                    "evicted session reloaded from the store",
+                    extra={"session": key[2], "events": stored},
+                )
+                return
+            stream_log.warning(
+                "stored session is missing events, keeping the live copy",
+                extra={"session": key[2], "dropped": len(session.events) - stored},
+            )
+        else:
+            stream_log.warning(
+                "evicted session re-admitted from the live copy",
+                extra={"session": key[2], "events": len(session.events)},
+            )
+
+        live_copy = copy.deepcopy(session)
+        live_copy.events = [without_audio(event) for event in live_copy.events]
+        self._put(key, live_copy, len(live_copy.model_dump_json(exclude_none=True)))
+        self._mark_changed(key)
+
+    def pin(self, *, app_name, user_id, session_id):
+        """
+        Keep a session in memory while a live stream uses it.
+        """
+        self._pinned[(app_name, user_id, session_id)] += 1
+
+    def unpin(self, *, app_name, user_id, session_id):
+        """
+        Let a session be evicted again once its live stream has closed.
+        """
+        key = (app_name, user_id, session_id)
+        self._pinned[key] -= 1
+        if self._pinned[key] <= 0:
+            del self._pinned[key]
+        self._evict()
+
+    def flush(self):
+        """
+        Write changed sessions to the store now (e.g. when a client disconnects).
+        """
+        if self.writer:
+            self.writer.flush()
+
+    def close(self):
+        """
+        Write all pending changes and stop the writer thread.
+        """
+        if self.writer:
+            self.writer.close()
+
+    def stats(self):
+        """
+        Report the live session count and approximate memory held.
+
+        Returns:
+            dict: Session counts, bytes held, eviction and store counters
+        """
+        stats = {
+            "live_sessions": len(self._lru),
+            # Counted on the writer thread; counting here would block the event loop
+            "stored_sessions": self.writer.stored_count if self.writer else 0,
+            "approx_bytes": self.bytes_held,
+            "evictions": self.evictions,
+            "pinned_sessions": len(self._pinned),
+            "readmissions": self.readmissions,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+        }
+        if self.writer:
+            stats["store_reloads"] = self.reloads
+            stats["store_writes"] = self.writer.writes
+            stats["avg_store_write_ms"] = round(
+                (
+                    self.writer.write_seconds * 1000 / self.writer.writes
+                    if self.writer.writes
+                    else 0.0
+                ),
+                3,
+            )
+        return stats
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Batch tool benchmark against the local calendar backend.
+
+Creates, reschedules and deletes N events (1 to 100) two ways: N calls of
+create_event / edit_event / delete_event, and one call of create_events /
+edit_events / delete_events, which send batch requests of up to 50 calls.
+Each HTTP request is delayed by a simulated round trip (--rtt-ms), and each
+call inside a batch by a simulated server time (--item-ms), so a batch costs
+one round trip plus its items. Reported per size: HTTP requests and total
+wall time of each way. The model turn saved for every single-event call
+comes on top and is not simulated here.
+
+Usage:
+    python benchmarks/batch_tools.py [--sizes 1,5,10,25,50,100] [--rtt-ms 100] [--item-ms 5]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+os.environ["JARVIS_CALENDAR_BACKEND"] = "memory"
+
+from jarvis.tools.batch_events import (  # noqa: E402
+    create_events,
+    delete_events,
+    edit_events,
+)
+from jarvis.tools.calendar_utils import (  # noqa: E402
+    get_calendar_service,
+    get_calendar_timezone,
+)
+from jarvis.tools.create_event import create_event  # noqa: E402
+from jarvis.tools.delete_event import delete_event  # noqa: E402
+from jarvis.tools.edit_event import edit_event  # noqa: E402
+from jarvis.tools.local_calendar import LocalBatchRequest, LocalRequest  # noqa: E402
+
+
+def add_latency(rtt, item_time):
+    """Delay HTTP requests by a round trip and batched calls by their server time."""
+    request_execute = LocalRequest.execute
+    batch_execute = LocalBatchRequest.execute
+    state = threading.local()
+    counter = {"requests": 0}
+
+    def delayed_request(self, *args, **kwargs):
+        if getattr(state, "in_batch", False):
+            time.sleep(item_time)
+        else:
+            counter["requests"] += 1
+            time.sleep(rtt)
+        return request_execute(self, *args, **kwargs)
+
+    def delayed_batch(self, *args, **kwargs):
+        counter["requests"] += 1
+        time.sleep(rtt)
+        state.in_batch = True
+        try:
+            return batch_execute(self, *args, **kwargs)
+        finally:
+            state.in_batch = False
+
+    LocalRequest.execute = delayed_request
+    LocalBatchRequest.execute = delayed_batch
+    return counter
+
+
+def timed(counter, func):
+    counter["requests"] = 0
+    started = time.perf_counter()
+    results = func()
+    elapsed = time.perf_counter() - started
+    for result in results:
+        if result["status"] != "success" or "failed" in result["message"]:
+            raise RuntimeError(result["message"])
+    return counter["requests"], elapsed
+
+
+def run_size(size, counter, day):
+    summaries = [f"Block {index}" for index in range(size)]
+    starts = [f"{day} {8 + index % 10:02d}:00" for index in range(size)]
+    ends = [f"{day} {8 + index % 10:02d}:30" for index in range(size)]
+    moved_starts = [f"{day} {8 + index % 10:02d}:30" for index in range(size)]
+    moved_ends = [f"{day} {9 + index % 10:02d}:00" for index in range(size)]
+    rows = []
+
+    # One tool call per event
+    created = []
+
+    def create_single():
+        results = [create_event(*args) for args in zip(summaries, starts, ends)]
+        created.extend(result["event_id"] for result in results)
+        return results
+
+    rows.append(("create", "single", *timed(counter, create_single)))
+    rows.append(
+        (
+            "edit",
+            "single",
+            *timed(
+                counter,
+                lambda: [
+                    edit_event(event_id, "", start, end)
+                    for event_id, start, end in zip(created, moved_starts, moved_ends)
+                ],
+            ),
+        )
+    )
+    rows.append(
+        (
+            "delete",
+            "single",
+            *timed(counter, lambda: [delete_event(e, True) for e in created]),
+        )
+    )
+
+    # One batch tool call
+    batch_created = []
+
+    def create_batch():
+        result = create_events(summaries, starts, ends)
+        batch_created.extend(item["event_id"] for item in result["items"])
+        return [result]
+
+    rows.append(("create", "batch", *timed(counter, create_batch)))
+    rows.append(
+        (
+            "edit",
+            "batch",
+            *timed(
+                counter,
+                lambda: [
+                    edit_events(batch_created, [""] * size, moved_starts, moved_ends)
+                ],
+            ),
+        )
+    )
+    rows.append(
+        (
+            "delete",
+            "batch",
+            *timed(counter, lambda: [delete_events(batch_created, True)]),
+        )
+    )
+
+    for operation, way, requests, elapsed in rows:
+        print(
+            f"{size:>6} {operation:<8} {way:<8} {requests:>9} {elapsed * 1000:>10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1,5,10,25,50,100")
+    parser.add_argument("--rtt-ms", type=float, default=100.0)
+    parser.add_argument("--item-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    # The calendar timezone is cached before timing starts
+    get_calendar_timezone(get_calendar_service())
+    counter = add_latency(args.rtt_ms / 1000, args.item_ms / 1000)
+    day = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+    print(f"{'events':>6} {'tool':<8} {'calls':<8} {'requests':>9} {'total ms':>10}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        run_size(size, counter, day)
+
+
+if __name__ == "__main__":
+    main()
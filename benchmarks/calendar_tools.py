@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Calendar tool benchmark against the local calendar backend.
+
+Runs list_events, create_event, edit_event and delete_event against an
+in-memory LocalCalendarService seeded with 10 to 100k events, so tool-layer
+performance can be measured and compared between changes without a Google
+account. The tools are called directly (not through the thread pool).
+Results are reported per tool and calendar size, pytest-benchmark style.
+
+list_events is measured three ways: the first call, which starts the event
+cache's full sync in the background and is answered by the backend; warm
+calls answered from the cache once the sync is done; and calls for a range
+before the cached window, which go to the backend. The time left of the
+full sync after the first call returned is reported as "event cache sync (rest)".
+
+Usage:
+    python benchmarks/calendar_tools.py [--sizes 10,100,1000,10000,100000] [--rounds 50]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+os.environ["JARVIS_CALENDAR_BACKEND"] = "memory"
+
+from jarvis.tools.calendar_utils import (  # noqa: E402
+    get_calendar_service,
+    reset_calendar_service,
+)
+from jarvis.tools.create_event import create_event  # noqa: E402
+from jarvis.tools.delete_event import delete_event  # noqa: E402
+from jarvis.tools.edit_event import edit_event  # noqa: E402
+from jarvis.tools.event_cache import clear_event_caches  # noqa: E402
+from jarvis.tools.event_cache import get_event_cache  # noqa: E402
+from jarvis.tools.list_events import list_events  # noqa: E402
+
+# Seeded events are spread over this many days around today
+DAYS_BEFORE = 60
+DAYS_AFTER = 305
+
+
+def generate_events(count, seed=0):
+    """Events of 15-120 minutes spread over the year around today."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    span = (DAYS_BEFORE + DAYS_AFTER) * 24 * 4
+    for index in range(count):
+        start = now + timedelta(minutes=15 * (rng.randrange(span) - DAYS_BEFORE * 96))
+        end = start + timedelta(minutes=15 * rng.randint(1, 8))
+        yield {
+            "summary": f"Event {index}",
+            "description": "Seeded by the calendar tool benchmark.",
+            "start": {"dateTime": start.isoformat(), "timeZone": "UTC"},
+            "end": {"dateTime": end.isoformat(), "timeZone": "UTC"},
+        }
+
+
+def measure(func, rounds):
+    """Call func() `rounds` times and return per-call durations in seconds."""
+    timings = []
+    for index in range(rounds):
+        started = time.perf_counter()
+        result = func(index)
+        timings.append(time.perf_counter() - started)
+        if result.get("status") != "success":
+            raise RuntimeError(result.get("message"))
+    return timings
+
+
+def report(name, size, timings):
+    ms = [t * 1000 for t in timings]
+    mean = statistics.mean(ms)
+    print(
+        f"{name:<24} {size:>8} {min(ms):>9.3f} {statistics.median(ms):>9.3f} "
+        f"{mean:>9.3f} {max(ms):>9.3f} {1000 / mean:>10.1f} {len(ms):>7}"
+    )
+
+
+def run_size(size, rounds):
+    # Fresh backend and event cache for each calendar size
+    reset_calendar_service()
+    clear_event_caches()
+    service = get_calendar_service()
+
+    started = time.perf_counter()
+    event_ids = service.load_events(generate_events(size))
+    seeded_s = time.perf_counter() - started
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    before_window = (datetime.now() - timedelta(days=DAYS_BEFORE - 1)).strftime(
+        "%Y-%m-%d"
+    )
+
+    report("list_events (cold)", size, measure(lambda i: list_events(today, 7, ""), 1))
+
+    # Wait for the rest of the background sync the cold call started
+    started = time.perf_counter()
+    get_event_cache("primary").sync(service)
+    report("event cache sync (rest)", size, [time.perf_counter() - started])
+    report(
+        "list_events (cached)",
+        size,
+        measure(lambda i: list_events(today, 7, ""), rounds),
+    )
+    report(
+        "list_events (backend)",
+        size,
+        measure(lambda i: list_events(before_window, 7, ""), rounds),
+    )
+
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    report(
+        "create_event",
+        size,
+        measure(
+            lambda i: create_event(
+                f"Created {i}", f"{tomorrow} 09:00", f"{tomorrow} 09:30"
+            ),
+            rounds,
+        ),
+    )
+
+    # Edit and delete distinct seeded events
+    rng = random.Random(1)
+    targets = rng.sample(event_ids, min(2 * rounds, len(event_ids)))
+    edits, deletes = targets[: len(targets) // 2], targets[len(targets) // 2 :]
+    report(
+        "edit_event",
+        size,
+        measure(
+            lambda i: edit_event(edits[i], f"Edited {i}", "", ""),
+            min(rounds, len(edits)),
+        ),
+    )
+    report(
+        "delete_event",
+        size,
+        measure(lambda i: delete_event(deletes[i], True), min(rounds, len(deletes))),
+    )
+    return seeded_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'tool':<24} {'events':>8} {'min ms':>9} {'median':>9} {'mean':>9} "
+        f"{'max':>9} {'ops/s':>10} {'rounds':>7}"
+    )
+    for size in [int(s) for s in args.sizes.split(",")]:
+        seeded_s = run_size(size, args.rounds)
+        print(f"  (seeded {size} events in {seeded_s:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
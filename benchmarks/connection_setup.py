@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Connection setup benchmark for the streaming server.
+
+Starts the server in-process with uvicorn and opens a series of WebSocket
+connections, measuring the time from the handshake to the first live event
+reaching the client. The Gemini model is replaced with a stand-in whose live
+connection answers immediately, so the numbers cover only the server's own
+setup path (session, runner, model client, tool declarations). Each mode runs
+in a fresh interpreter: once with the startup warm-up disabled (every
+connection pays the setup) and once with it enabled.
+
+Usage:
+    python benchmarks/connection_setup.py [--connections 20]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+
+
+def serve_and_measure(connections):
+    """Run the server with a stand-in model and time each connection (child process)."""
+    os.chdir(APP_DIR)
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+    import standin_model
+    import uvicorn
+    import websockets
+
+    standin_model.install(greeting="hi")
+
+    import main
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async def run():
+        config = uvicorn.Config(main.app, port=port, log_level="error")
+        server = uvicorn.Server(config)
+        task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+
+        timings = []
+        for i in range(connections):
+            url = f"ws://127.0.0.1:{port}/ws/bench-{i}?is_audio=false"
+            started = time.perf_counter()
+            async with websockets.connect(url) as ws:
+                await ws.recv()
+                timings.append((time.perf_counter() - started) * 1000)
+
+        server.should_exit = True
+        await task
+        return timings
+
+    for ms in asyncio.run(run()):
+        print(f"{ms:.3f}", file=sys.stderr)
+
+
+def run_mode(warmup, connections):
+    env = dict(os.environ, JARVIS_WARMUP="1" if warmup else "0")
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", "--connections", str(connections)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [float(line) for line in result.stderr.split()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        serve_and_measure(args.connections)
+        return
+
+    print(f"{args.connections} sequential connections, handshake -> first live event")
+    print(f"{'mode':<10} {'first ms':>10} {'median ms':>10} {'p95 ms':>10}")
+    for name, warmup in (("cold", False), ("warmed", True)):
+        timings = run_mode(warmup, args.connections)
+        p95 = sorted(timings)[max(0, int(len(timings) * 0.95) - 1)]
+        print(
+            f"{name:<10} {timings[0]:>10.2f} "
+            f"{statistics.median(timings):>10.2f} {p95:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+edit_event latency benchmark against the local calendar backend.
+
+Each API request is delayed by a simulated round trip (--rtt-ms). Events
+with descriptions and attendees (so full bodies are realistic in size) are
+rescheduled four ways:
+
+- previous: events().get followed by a full events().update, as edit_event
+  did before
+- patch: edit_event with the event in the cache (one patch with If-Match)
+- patch, not cached: edit_event for an event the cache hasn't seen (one
+  patch without If-Match)
+- patch, conflict: the event changed since it was cached, so the patch
+  fails with 412 and is retried after reading the event again
+
+Reported per case: API round trips, request body bytes and wall time.
+
+Usage:
+    python benchmarks/edit_event_patch.py [--rounds 20] [--rtt-ms 100]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+os.environ["JARVIS_CALENDAR_BACKEND"] = "memory"
+
+from jarvis.tools.calendar_utils import (  # noqa: E402
+    get_calendar_service,
+    get_calendar_timezone,
+    parse_datetime,
+)
+from jarvis.tools.edit_event import edit_event  # noqa: E402
+from jarvis.tools.event_cache import get_event_cache  # noqa: E402
+from jarvis.tools.local_calendar import LocalRequest  # noqa: E402
+
+
+def add_latency(rtt):
+    """Delay every local API request by a simulated round trip; count requests and bytes."""
+    execute = LocalRequest.execute
+    counter = {"requests": 0, "bytes": 0}
+
+    def delayed_execute(self, *args, **kwargs):
+        counter["requests"] += 1
+        if "body" in self._params:
+            counter["bytes"] += len(json.dumps(self._params["body"]))
+        time.sleep(rtt)
+        return execute(self, *args, **kwargs)
+
+    LocalRequest.execute = delayed_execute
+    return counter
+
+
+def previous_edit(event_id, start_time, end_time):
+    """edit_event as it was before: a full get, then a full update."""
+    service = get_calendar_service()
+    event = service.events().get(calendarId="primary", eventId=event_id).execute()
+    timezone_id = event["start"].get("timeZone") or get_calendar_timezone(service)
+    event["start"] = {
+        "dateTime": parse_datetime(start_time).isoformat(),
+        "timeZone": timezone_id,
+    }
+    event["end"] = {
+        "dateTime": parse_datetime(end_time).isoformat(),
+        "timeZone": timezone_id,
+    }
+    service.events().update(
+        calendarId="primary", eventId=event_id, body=event
+    ).execute()
+    return {"status": "success"}
+
+
+def edit_event_times(event_id, start_time, end_time):
+    return edit_event(event_id, "", start_time, end_time)
+
+
+def seed(count):
+    """Events with realistic bodies, returned with their IDs."""
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return get_calendar_service().load_events(
+        {
+            "summary": f"Project review {index}",
+            "description": "Agenda: status, risks, next steps. " * 20,
+            "location": "Conference room 4B",
+            "attendees": [{"email": f"person{n}@example.com"} for n in range(12)],
+            "start": {"dateTime": (start + timedelta(days=1)).isoformat()},
+            "end": {"dateTime": (start + timedelta(days=1, hours=1)).isoformat()},
+        }
+        for index in range(count)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--rtt-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    event_ids = seed(4 * args.rounds)
+    service = get_calendar_service()
+    cache = get_event_cache("primary")
+    get_calendar_timezone(service)
+
+    cached = event_ids[: 2 * args.rounds]
+    for event_id in cached:
+        cache.upsert(
+            service.events().get(calendarId="primary", eventId=event_id).execute()
+        )
+    uncached = event_ids[2 * args.rounds : 3 * args.rounds]
+    conflicting = event_ids[3 * args.rounds :]
+    for event_id in conflicting:
+        cache.upsert(
+            service.events().get(calendarId="primary", eventId=event_id).execute()
+        )
+        # Changed elsewhere after the cache saw it
+        service.events().patch(
+            calendarId="primary", eventId=event_id, body={"location": "Room 5"}
+        ).execute()
+
+    counter = add_latency(args.rtt_ms / 1000)
+    day = (datetime.now() + timedelta(days=2)).strftime("%Y-%m-%d")
+    cases = [
+        ("previous (get + update)", previous_edit, cached[: args.rounds]),
+        ("patch", edit_event_times, cached[args.rounds :]),
+        ("patch, not cached", edit_event_times, uncached),
+        ("patch, conflict", edit_event_times, conflicting),
+    ]
+
+    print(
+        f"{'case':<26} {'requests':>9} {'body bytes':>11} {'median ms':>10} "
+        f"{'min ms':>8} {'max ms':>8}"
+    )
+    for name, func, targets in cases:
+        timings = []
+        counter["requests"] = counter["bytes"] = 0
+        for event_id in targets:
+            started = time.perf_counter()
+            result = func(event_id, f"{day} 16:00", f"{day} 17:00")
+            timings.append((time.perf_counter() - started) * 1000)
+            if result["status"] != "success":
+                raise RuntimeError(result["message"])
+        print(
+            f"{name:<26} {counter['requests'] / len(targets):>9.1f} "
+            f"{counter['bytes'] // len(targets):>11} {statistics.median(timings):>10.1f} "
+            f"{min(timings):>8.1f} {max(timings):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Event loop lag benchmark for calendar tool execution.
+
+Measures how late a periodic asyncio timer fires while calendar tool calls are
+in flight, once with the tools called inline on the event loop (how ADK runs a
+synchronous tool) and once dispatched through the tool executor. The tool is a
+stand-in that blocks for the duration of a typical Calendar API round trip.
+
+Usage:
+    python benchmarks/event_loop_lag.py [--calls 20] [--latency 0.15]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from jarvis.tools.executor import run_in_executor  # noqa: E402
+
+# How often the lag probe wakes up (seconds)
+PROBE_INTERVAL = 0.005
+
+
+def blocking_tool(latency: float) -> dict:
+    """Stand-in for a Calendar tool blocked on an HTTP round trip."""
+    time.sleep(latency)
+    return {"status": "success"}
+
+
+async def probe_lag(samples, stop):
+    """Record how late each timer wake-up is compared to the requested interval."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        samples.append(loop.time() - started - PROBE_INTERVAL)
+
+
+async def run_inline(calls, latency):
+    async def call():
+        await asyncio.sleep(0)
+        return blocking_tool(latency)
+
+    await asyncio.gather(*(call() for _ in range(calls)))
+
+
+async def run_dispatched(calls, latency):
+    tool = run_in_executor(blocking_tool, max_concurrency=calls, timeout=60)
+    await asyncio.gather(*(tool(latency) for _ in range(calls)))
+
+
+async def measure(name, runner, calls, latency):
+    samples = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_lag(samples, stop))
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    await runner(calls, latency)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1] if samples else 0.0
+    print(
+        f"{name:<12} calls={calls:<4} wall={elapsed * 1000:8.1f} ms  "
+        f"lag p50={statistics.median(samples) * 1000:7.2f} ms  "
+        f"p99={p99 * 1000:7.2f} ms  max={samples[-1] * 1000:7.2f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.15)
+    args = parser.parse_args()
+
+    await measure("inline", run_inline, args.calls, args.latency)
+    await measure("executor", run_dispatched, args.calls, args.latency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
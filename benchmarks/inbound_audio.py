@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Inbound audio benchmark for microphone frame handling.
+
+Feeds simulated microphone frames (one 128-sample render quantum per frame,
+~125 frames/s) through the server's inbound path into a LiveRequestQueue and
+compares forwarding every frame with coalescing frames into chunks.
+
+Usage:
+    python benchmarks/inbound_audio.py [--seconds 60] [--chunk-ms 50]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from google.adk.agents import LiveRequestQueue  # noqa: E402
+from google.genai import types  # noqa: E402
+from streaming.audio import SAMPLE_RATE, AudioCoalescer  # noqa: E402
+from streaming.protocol import decode_message  # noqa: E402
+
+# One render quantum of 16-bit PCM, wrapped in a binary audio frame
+FRAME_SAMPLES = 128
+FRAME = {"bytes": bytes((0x01, 0)) + bytes(FRAME_SAMPLES * 2)}
+
+
+def drain(queue):
+    count = 0
+    while not queue._queue.empty():
+        queue._queue.get_nowait()
+        count += 1
+    return count
+
+
+async def run_direct(frames, chunk_ms):
+    queue = LiveRequestQueue()
+    for _ in range(frames):
+        _, data, _ = decode_message(FRAME)
+        queue.send_realtime(types.Blob(data=bytes(data), mime_type="audio/pcm"))
+    return drain(queue)
+
+
+async def run_coalesced(frames, chunk_ms):
+    queue = LiveRequestQueue()
+    coalescer = AudioCoalescer(
+        lambda chunk: queue.send_realtime(
+            types.Blob(data=chunk, mime_type="audio/pcm")
+        ),
+        chunk_ms=chunk_ms,
+    )
+    for _ in range(frames):
+        _, data, _ = decode_message(FRAME)
+        coalescer.push(data)
+    coalescer.close()
+    return drain(queue)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--chunk-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    frames = args.seconds * SAMPLE_RATE // FRAME_SAMPLES
+    for name, runner in (("direct", run_direct), ("coalesced", run_coalesced)):
+        started = time.process_time()
+        messages = await runner(frames, args.chunk_ms)
+        cpu = time.process_time() - started
+        print(
+            f"{name:<10} frames={frames:<7} messages/s={messages / args.seconds:7.1f}  "
+            f"cpu per audio second={cpu / args.seconds * 1e6:8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+list_events result size benchmark against the local calendar backend.
+
+Seeds an in-memory LocalCalendarService with a week of meetings at several
+densities (events per day), each with a long description, attendees and a
+location, then lists the week at both detail levels with and without the
+token budget, next to the result format list_events used before (every
+field, full descriptions). Reported per density and mode: events returned
+in full, events only counted per day, the tool result in bytes and
+estimated tokens (what the model reads on every turn), and the bytes of the
+matching events().list response with and without the fields selector.
+
+Usage:
+    python benchmarks/list_events_budget.py [--densities 1,5,10,25,50] [--days 7]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+os.environ["JARVIS_CALENDAR_BACKEND"] = "memory"
+
+from jarvis.tools.calendar_utils import (  # noqa: E402
+    format_event_time,
+    get_calendar_service,
+    reset_calendar_service,
+)
+from jarvis.tools.event_cache import clear_event_caches  # noqa: E402
+
+# The package exports the wrapped tool under the module's name
+list_events_module = sys.modules["jarvis.tools.list_events"]
+
+WORDS = (
+    "agenda review roadmap budget launch follow-up notes customer design "
+    "planning metrics hiring sync retro demo escalation proposal"
+).split()
+
+
+def generate_events(days, per_day, seed=0):
+    """Working-hours meetings with descriptions, attendees and locations."""
+    rng = random.Random(seed)
+    today = datetime.now(timezone.utc).replace(
+        hour=13, minute=0, second=0, microsecond=0
+    )
+    for day in range(days):
+        for index in range(per_day):
+            start = today + timedelta(days=day, minutes=15 * rng.randrange(32))
+            yield {
+                "summary": f"{rng.choice(WORDS).title()} {rng.choice(WORDS)}",
+                "description": " ".join(rng.choice(WORDS) for _ in range(90)),
+                "location": f"Room {rng.randint(100, 999)}",
+                "attendees": [
+                    {"email": f"person{rng.randint(1, 500)}@example.com"}
+                    for _ in range(rng.randint(2, 15))
+                ],
+                "start": {"dateTime": start.isoformat(), "timeZone": "UTC"},
+                "end": {
+                    "dateTime": (start + timedelta(minutes=30)).isoformat(),
+                    "timeZone": "UTC",
+                },
+            }
+
+
+def list_request(service, days, fields, max_results):
+    now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0)
+    params = dict(
+        calendarId="primary",
+        timeMin=now.isoformat(),
+        timeMax=(now + timedelta(days=days)).isoformat(),
+        maxResults=max_results,
+        singleEvents=True,
+        orderBy="startTime",
+    )
+    if fields:
+        params["fields"] = f"items({fields})"
+    return service.events().list(**params).execute()
+
+
+def previous_result(events):
+    """The result list_events returned before the detail levels and budget."""
+    return {
+        "status": "success",
+        "message": f"Found {len(events)} event(s).",
+        "events": [
+            {
+                "id": event.get("id"),
+                "summary": event.get("summary", "Untitled Event"),
+                "start": format_event_time(event.get("start", {})),
+                "end": format_event_time(event.get("end", {})),
+                "location": event.get("location", ""),
+                "description": event.get("description", ""),
+                "attendees": [a["email"] for a in event.get("attendees", [])],
+                "link": event.get("htmlLink", ""),
+            }
+            for event in events
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--densities", default="1,5,10,25,50")
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    budget = list_events_module.TOKEN_BUDGET
+    modes = [
+        ("previous format", None, 0, None),
+        ("full, no budget", "full", 0, None),
+        ("full", "full", budget, list_events_module.FULL_FIELDS),
+        ("compact, no budget", "", 0, None),
+        ("compact", "", budget, list_events_module.COMPACT_FIELDS),
+    ]
+
+    print(
+        f"{'events/day':>10} {'mode':<20} {'listed':>7} {'summarized':>10} "
+        f"{'bytes':>8} {'tokens':>7} {'api bytes':>10}"
+    )
+    for density in [int(d) for d in args.densities.split(",")]:
+        reset_calendar_service()
+        clear_event_caches()
+        service = get_calendar_service()
+        service.load_events(generate_events(args.days, density))
+
+        for name, detail, mode_budget, fields in modes:
+            # The previous format read one page of up to 100 events
+            max_results = 100 if detail is None else 2500
+            response = list_request(service, args.days, fields, max_results)
+            if detail is None:
+                result = previous_result(response["items"])
+            else:
+                list_events_module.TOKEN_BUDGET = mode_budget
+                result = list_events_module.list_events(today, args.days, detail)
+            if result["status"] != "success":
+                raise RuntimeError(result["message"])
+            size = len(json.dumps(result, separators=(",", ":")))
+            print(
+                f"{density:>10} {name:<20} {len(result['events']):>7} "
+                f"{sum(result.get('more_events', {}).values()):>10} {size:>8} "
+                f"{list_events_module.estimate_tokens(result):>7} "
+                f"{len(json.dumps(response)):>10}"
+            )
+        list_events_module.TOKEN_BUDGET = budget
+
+
+if __name__ == "__main__":
+    main()
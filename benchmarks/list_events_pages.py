@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Paginated list_events benchmark against the local calendar backend.
+
+Seeds an in-memory LocalCalendarService with a busy shared calendar (10 to
+200 events per day over the last 120 days) and lists a month that lies
+before the event cache's window, so every call pages through events().list.
+Each API request is delayed by a simulated round trip (--rtt-ms) to stand in
+for the network. Reported with page prefetch off and on: API pages fetched,
+events read, median wall time, peak memory allocated during the call (tracemalloc)
+of list_events and the result's estimated tokens. The cold event cache
+sync, which pages through the whole calendar, is timed the same way.
+
+Usage:
+    python benchmarks/list_events_pages.py [--densities 10,50,200] [--days 30] [--rtt-ms 100] [--rounds 5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+os.environ["JARVIS_CALENDAR_BACKEND"] = "memory"
+
+from jarvis.tools import calendar_utils  # noqa: E402
+from jarvis.tools.event_cache import clear_event_caches  # noqa: E402
+from jarvis.tools.event_cache import get_event_cache  # noqa: E402
+from jarvis.tools.local_calendar import LocalRequest  # noqa: E402
+
+# The package exports the wrapped tool under the module's name
+list_events_module = sys.modules["jarvis.tools.list_events"]
+
+# Seeded events cover this many days up to today
+SEEDED_DAYS = 120
+
+
+def generate_events(per_day, seed=0):
+    """Meetings spread over the SEEDED_DAYS before today."""
+    rng = random.Random(seed)
+    first_day = datetime.now(timezone.utc).replace(
+        hour=12, minute=0, second=0, microsecond=0
+    ) - timedelta(days=SEEDED_DAYS)
+    for day in range(SEEDED_DAYS):
+        for index in range(per_day):
+            start = first_day + timedelta(days=day, minutes=5 * rng.randrange(120))
+            yield {
+                "summary": f"Meeting {day}-{index}",
+                "location": f"Room {rng.randint(100, 999)}",
+                "start": {"dateTime": start.isoformat(), "timeZone": "UTC"},
+                "end": {
+                    "dateTime": (start + timedelta(minutes=30)).isoformat(),
+                    "timeZone": "UTC",
+                },
+            }
+
+
+def add_latency(rtt):
+    """Delay every local API request by a simulated round trip; count the requests."""
+    execute = LocalRequest.execute
+    counter = {"requests": 0}
+
+    def delayed_execute(self, *args, **kwargs):
+        counter["requests"] += 1
+        time.sleep(rtt)
+        return execute(self, *args, **kwargs)
+
+    LocalRequest.execute = delayed_execute
+    return counter
+
+
+def measure(func, counter, rounds, setup=None):
+    """Median wall time of func() over rounds, with the requests of one call."""
+    timings = []
+    for _ in range(rounds):
+        if setup is not None:
+            setup()
+        counter["requests"] = 0
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return result, statistics.median(timings), counter["requests"]
+
+
+def peak_memory(func):
+    # Traced separately, as tracing slows the call down
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--densities", default="10,50,200")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--rtt-ms", type=float, default=100.0)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    counter = add_latency(args.rtt_ms / 1000)
+    start_date = (
+        datetime.now(timezone.utc) - timedelta(days=SEEDED_DAYS - 1)
+    ).strftime("%Y-%m-%d")
+
+    print(
+        f"{'events/day':>10} {'call':<12} {'prefetch':>8} {'pages':>6} "
+        f"{'events':>7} {'ms':>9} {'peak KB':>9} {'tokens':>7}"
+    )
+    for density in [int(d) for d in args.densities.split(",")]:
+        calendar_utils.reset_calendar_service()
+        calendar_utils.get_calendar_service().load_events(generate_events(density))
+
+        for prefetch in (False, True):
+            calendar_utils.PREFETCH_PAGES = prefetch
+
+            # Cold sync of the event cache (pages of up to 2500 events)
+            _, elapsed, pages = measure(
+                lambda: get_event_cache("primary").sync(
+                    calendar_utils.get_calendar_service()
+                ),
+                counter,
+                args.rounds,
+                setup=clear_event_caches,
+            )
+            synced = len(get_event_cache("primary")._events)
+            print(
+                f"{density:>10} {'cache sync':<12} {str(prefetch):>8} {pages:>6} "
+                f"{synced:>7} {elapsed * 1000:>9.1f} {'':>9} {'':>7}"
+            )
+
+            # A month before the cached window (pages of PAGE_SIZE events)
+            call = lambda: list_events_module.list_events(  # noqa: E731
+                start_date, args.days, ""
+            )
+            result, elapsed, pages = measure(call, counter, args.rounds)
+            peak = peak_memory(call)
+            if result["status"] != "success":
+                raise RuntimeError(result["message"])
+            read = len(result["events"]) + sum(result.get("more_events", {}).values())
+            print(
+                f"{density:>10} {'list_events':<12} {str(prefetch):>8} {pages:>6} "
+                f"{read:>7} {elapsed * 1000:>9.1f} {peak / 1024:>9.0f} "
+                f"{list_events_module.estimate_tokens(result):>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
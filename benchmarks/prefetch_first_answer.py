@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-answer benchmark for the prefetch on connect, against the local calendar backend.
+
+Simulates a session that connects, lets the user speak for a while (--think-ms,
+the time until the model's first list_events call) and then asks "what do I
+have today?". Each API request is delayed by a simulated round trip (--rtt-ms).
+Every run starts cold: no cached timezone, event cache or prefetched events.
+Reported per calendar size and think time, with prefetch off and on: API
+requests made after the question and the median time from the question to
+list_events' answer.
+
+Usage:
+    python benchmarks/prefetch_first_answer.py [--sizes 20,200,2000] [--think-ms 0,500,1500] [--rtt-ms 100] [--rounds 5]
+"""
+
+import argparse
+import contextvars
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+os.environ["JARVIS_CALENDAR_BACKEND"] = "memory"
+
+from jarvis.tools import calendar_utils, session_events  # noqa: E402
+from jarvis.tools.credentials import set_current_user  # noqa: E402
+from jarvis.tools.event_cache import clear_event_caches  # noqa: E402
+from jarvis.tools.local_calendar import LocalRequest  # noqa: E402
+
+# The package exports the wrapped tool under the module's name
+list_events_module = sys.modules["jarvis.tools.list_events"]
+
+
+def add_latency(rtt):
+    """Delay every local API request by a simulated round trip; count the requests."""
+    execute = LocalRequest.execute
+    counter = {"requests": 0}
+
+    def delayed_execute(self, *args, **kwargs):
+        counter["requests"] += 1
+        time.sleep(rtt)
+        return execute(self, *args, **kwargs)
+
+    LocalRequest.execute = delayed_execute
+    return counter
+
+
+def generate_events(count):
+    """Meetings spread from 30 days ago to 30 days ahead, a few of them today."""
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    for index in range(count):
+        start = now + timedelta(hours=(index * 1440 // count) - 720)
+        yield {
+            "summary": f"Meeting {index}",
+            "location": "Room 4B",
+            "start": {"dateTime": start.isoformat()},
+            "end": {"dateTime": (start + timedelta(minutes=30)).isoformat()},
+        }
+
+
+def reset():
+    # Every session starts as cold as a fresh process
+    session_events.clear_session_events()
+    clear_event_caches()
+    calendar_utils.invalidate_calendar_settings()
+
+
+def first_answer(session_id, think, counter):
+    """Connect, think, ask; return (requests after the question, seconds to answer)."""
+    session_events.prefetch_session_events(session_id)
+    time.sleep(think)
+
+    counter["requests"] = 0
+    started = time.perf_counter()
+    context = contextvars.copy_context()
+    result = context.run(
+        lambda: (
+            set_current_user(session_id),
+            list_events_module.list_events("", 1, ""),
+        )[1]
+    )
+    elapsed = time.perf_counter() - started
+    if result["status"] != "success":
+        raise RuntimeError(result["message"])
+    return counter["requests"], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="20,200,2000")
+    parser.add_argument("--think-ms", default="0,500,1500")
+    parser.add_argument("--rtt-ms", type=float, default=100.0)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    counter = add_latency(args.rtt_ms / 1000)
+
+    print(
+        f"{'events':>7} {'think ms':>9} {'prefetch':>8} {'requests':>9} "
+        f"{'median ms':>10} {'min ms':>8} {'max ms':>8}"
+    )
+    for size in [int(s) for s in args.sizes.split(",")]:
+        calendar_utils.reset_calendar_service()
+        calendar_utils.get_calendar_service().load_events(generate_events(size))
+
+        for think_ms in [float(t) for t in args.think_ms.split(",")]:
+            for prefetch in (False, True):
+                session_events.PREFETCH_ENABLED = prefetch
+                timings = []
+                for round_index in range(args.rounds):
+                    reset()
+                    requests, elapsed = first_answer(
+                        f"session-{size}-{think_ms}-{prefetch}-{round_index}",
+                        think_ms / 1000,
+                        counter,
+                    )
+                    timings.append(elapsed * 1000)
+                print(
+                    f"{size:>7} {think_ms:>9.0f} {str(prefetch):>8} {requests:>9} "
+                    f"{statistics.median(timings):>10.1f} {min(timings):>8.1f} "
+                    f"{max(timings):>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Stand-in Gemini model for the server benchmarks.
+
+install() registers a Gemini subclass whose live connection never touches the
+network: it pays the same client setup as the real model and answers each
+message immediately with a text reply (partial, final, turn complete). The
+reply reports how many earlier messages the model knows about (history sent
+at connect plus messages since), so benchmarks can check that a reconnect
+kept the conversation.
+
+When the session asks for audio responses, the connection behaves like a voice
+model instead: it listens to the realtime audio until it has heard
+UTTERANCE_SECONDS of it, then answers with an output transcription and
+REPLY_SECONDS of 24 kHz PCM paced in REPLY_CHUNK_MS chunks, like the live API
+streams it. Every chunk starts with a timestamp (see read_stamp()), so clients
+can measure how long each frame took to get through the server.
+
+Import this module before app/main.py.
+"""
+
+import asyncio
+import contextlib
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from google.adk.models import Gemini, LLMRegistry, LlmResponse  # noqa: E402
+from google.adk.models.base_llm_connection import BaseLlmConnection  # noqa: E402
+from google.genai import types  # noqa: E402
+
+# Microphone audio the model waits for before answering (16 kHz, 16-bit mono)
+UTTERANCE_SECONDS = 1.5
+UTTERANCE_BYTES = int(16000 * 2 * UTTERANCE_SECONDS)
+
+# Spoken reply: 24 kHz, 16-bit mono PCM sent in fixed-size chunks
+REPLY_SECONDS = 2.0
+REPLY_CHUNK_MS = 40
+REPLY_CHUNK_BYTES = 24000 * 2 * REPLY_CHUNK_MS // 1000
+
+# Timestamp at the start of each reply chunk (time.monotonic(), shared by processes)
+_STAMP = struct.Struct("<d")
+
+
+def stamp_audio(size):
+    """
+    Build a PCM chunk that starts with the current time.
+    """
+    return _STAMP.pack(time.monotonic()) + bytes(size - _STAMP.size)
+
+
+def read_stamp(data):
+    """
+    Read the time a reply chunk was produced by the stand-in model.
+
+    Args:
+        data (bytes): The PCM payload, as received by the client
+
+    Returns:
+        float: time.monotonic() when the chunk was produced
+    """
+    return _STAMP.unpack_from(data)[0]
+
+
+def text_response(text, partial):
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        partial=partial,
+    )
+
+
+class EchoConnection(BaseLlmConnection):
+    """
+    Live connection that echoes every message it is sent.
+    """
+
+    def __init__(self, greeting, audio=False):
+        self._greeting = greeting
+        self._audio = audio
+        self._history = 0
+        self._inbox = asyncio.Queue()
+        self._heard = 0
+        self._replying = False
+
+    async def send_history(self, history):
+        self._history = len(history)
+
+    async def send_content(self, content):
+        if content.parts and content.parts[0].text:
+            self._inbox.put_nowait(content.parts[0].text)
+
+    async def send_realtime(self, blob):
+        # Only listen between replies; the user is quiet while the model talks
+        if not self._audio or self._replying:
+            return
+        self._heard += len(blob.data)
+        if self._heard >= UTTERANCE_BYTES:
+            self._heard = 0
+            self._replying = True
+            self._inbox.put_nowait("(speech)")
+
+    async def receive(self):
+        if self._greeting:
+            yield text_response(self._greeting, partial=True)
+
+        while True:
+            text = await self._inbox.get()
+            self._replying = True
+            reply = f"{text} (history={self._history})"
+            self._history += 1
+
+            if self._audio:
+                async for response in self._speak(reply):
+                    yield response
+            else:
+                yield text_response(reply, partial=True)
+                yield text_response(reply, partial=False)
+            yield LlmResponse(turn_complete=True)
+            self._replying = False
+
+    async def _speak(self, reply):
+        # Output transcription first, then the audio in real time
+        yield text_response(reply, partial=True)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        chunks = int(REPLY_SECONDS * 1000 / REPLY_CHUNK_MS)
+        for index in range(chunks):
+            yield LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[
+                        types.Part(
+                            inline_data=types.Blob(
+                                mime_type="audio/pcm;rate=24000",
+                                data=stamp_audio(REPLY_CHUNK_BYTES),
+                            )
+                        )
+                    ],
+                )
+            )
+            delay = started + (index + 1) * REPLY_CHUNK_MS / 1000 - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        yield text_response(reply, partial=False)
+
+    async def close(self):
+        pass
+
+
+def install(greeting=None):
+    """
+    Replace the Gemini model with the stand-in.
+
+    Args:
+        greeting (str): Text sent as soon as a live connection opens (None for no greeting)
+    """
+
+    class StandInGemini(Gemini):
+        @contextlib.asynccontextmanager
+        async def connect(self, llm_request):
+            # Pay the same client setup as the real model, skip the network
+            self._live_api_client
+            modalities = llm_request.live_connect_config.response_modalities or []
+            yield EchoConnection(greeting, audio="AUDIO" in modalities)
+
+    LLMRegistry.register(StandInGemini)
@@ -0,0 +1,68 @@
+"""
+ASGI entry point serving app/main.py with the stand-in model.
+
+Used by the benchmarks that run real uvicorn workers, e.g.:
+    uvicorn standin_server:app --app-dir benchmarks --workers 2
+(run from the app/ directory so the static files are found).
+
+Also adds GET /bench/stats, which reports the worker's event loop lag (from a
+probe started on the first call), CPU time and resident memory. Pass
+?reset=1 to start a new measurement window.
+"""
+
+import asyncio
+import resource
+import time
+
+import standin_model
+
+standin_model.install()
+
+from main import app  # noqa: E402
+
+# How often the lag probe wakes up (seconds)
+PROBE_INTERVAL = 0.005
+
+_lag_samples = []
+_probe_task = None
+
+
+async def probe_lag():
+    """Record how late each timer wake-up is compared to the requested interval."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        _lag_samples.append(loop.time() - started - PROBE_INTERVAL)
+
+
+def rss_bytes():
+    """Current resident set size (peak RSS where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@app.get("/bench/stats")
+async def bench_stats(reset: bool = False):
+    """Reports event loop lag, CPU time and RSS for this worker"""
+    global _probe_task
+    if _probe_task is None:
+        _probe_task = asyncio.create_task(probe_lag())
+
+    samples = sorted(_lag_samples)
+    if reset:
+        _lag_samples.clear()
+
+    def percentile(q):
+        return samples[min(int(len(samples) * q), len(samples) - 1)] if samples else 0.0
+
+    return {
+        "lag_p50_ms": percentile(0.5) * 1000,
+        "lag_p99_ms": percentile(0.99) * 1000,
+        "lag_max_ms": samples[-1] * 1000 if samples else 0.0,
+        "cpu_seconds": time.process_time(),
+        "rss_bytes": rss_bytes(),
+    }
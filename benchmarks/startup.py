@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the streaming server.
+
+Imports app/main.py in a fresh interpreter with `-X importtime` and reports
+the slowest top-level imports and which heavy dependencies are loaded at
+startup, then starts a fresh uvicorn worker and measures the time until it
+answers its first HTTP request (time-to-ready). Exits with status 1 if
+time-to-ready is above the target.
+
+Usage:
+    python benchmarks/startup.py [--top 10] [--target 5.0]
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+
+# Time-to-ready target for a fresh worker (seconds), see README
+READY_TARGET = 5.0
+
+# Dependencies that should only be loaded on first use
+LAZY_MODULES = [
+    "googleapiclient",
+    "google_auth_oauthlib",
+    "google_auth_httplib2",
+    "httplib2",
+    "numpy",
+]
+
+
+def import_report():
+    """
+    Import main with -X importtime.
+
+    Returns:
+        list: (module name, cumulative microseconds, nesting depth) in report order
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(cumulative), depth))
+    return modules
+
+
+def time_to_ready(timeout=60.0):
+    """
+    Start a uvicorn worker and time how long it takes to serve `GET /`.
+
+    Returns:
+        float: Seconds from process start to the first successful response
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        cwd=APP_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=dict(os.environ, PYTHONUNBUFFERED="1"),
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1):
+                    return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.02)
+        raise TimeoutError(f"server not ready after {timeout:g} seconds")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--target", type=float, default=READY_TARGET)
+    args = parser.parse_args()
+
+    modules = import_report()
+    imported = {name for name, _, _ in modules}
+    total_us = next(us for name, us, depth in modules if depth == 0 and name == "main")
+
+    print(f"import main: {total_us / 1000:.1f} ms")
+    print("\nSlowest imports below main (cumulative):")
+    children = [(us, name) for name, us, depth in modules if depth == 1]
+    for us, name in sorted(children, reverse=True)[: args.top]:
+        print(f"  {name:<40} {us / 1000:>9.1f} ms {us * 100 / total_us:>5.1f}%")
+
+    print("\nLazily loaded dependencies:")
+    for name in LAZY_MODULES:
+        state = "imported at startup" if name in imported else "deferred"
+        print(f"  {name:<40} {state}")
+
+    ready = time_to_ready()
+    print(f"\ntime-to-ready: {ready:.2f} s (target {args.target:g} s)")
+    if ready > args.target:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Multi-worker load test for the streaming server.
+
+Runs `uvicorn --workers N` for each worker count with a shared SQLite session
+store and the stand-in model, then drives it with concurrent text clients.
+Each client holds a short conversation, disconnects and reconnects with the
+same session ID. The reconnect usually lands on another worker. Reports
+throughput (turns/s) and turn latency per worker count, plus the share of
+reconnects that found their conversation history.
+
+Usage:
+    python benchmarks/worker_scaling.py [--workers 1,2,4] [--clients 32] [--duration 10]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCH_DIR.parent / "app"
+
+# Turns per connection before the client reconnects
+TURNS_PER_CONNECTION = 5
+
+
+def start_server(workers, store_path):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    env = dict(
+        os.environ,
+        JARVIS_SESSION_STORE=f"sqlite:///{store_path}",
+        JARVIS_MAX_CONNECTIONS="10000",
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "standin_server:app",
+            "--app-dir",
+            str(BENCH_DIR),
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "error",
+        ],
+        cwd=APP_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+    # Wait until every worker could be serving
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1):
+                break
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.05)
+    time.sleep(1.0 * workers)
+    return server, port
+
+
+async def run_client(port, client_id, deadline, results):
+    import websockets
+
+    session_id = f"scale-{os.getpid()}-{client_id}"
+    url = f"ws://127.0.0.1:{port}/ws/{session_id}?is_audio=false"
+    first_connection = True
+
+    while time.monotonic() < deadline:
+        async with websockets.connect(url) as ws:
+            for turn in range(TURNS_PER_CONNECTION):
+                started = time.perf_counter()
+                await ws.send(json.dumps({"mime_type": "text/plain", "data": "ping"}))
+                reply = None
+                while True:
+                    message = json.loads(await ws.recv())
+                    if message.get("turn_complete"):
+                        break
+                    reply = message.get("data", "")
+                results["latencies"].append(time.perf_counter() - started)
+
+                # The first reply after a reconnect shows whether history was kept
+                if turn == 0 and not first_connection:
+                    results["reconnects"] += 1
+                    if reply and "(history=0)" not in reply:
+                        results["resumed"] += 1
+        first_connection = False
+
+
+def client_process(port, clients, duration, queue):
+    results = {"latencies": [], "reconnects": 0, "resumed": 0}
+    deadline = time.monotonic() + duration
+
+    async def run():
+        await asyncio.gather(
+            *(run_client(port, i, deadline, results) for i in range(clients))
+        )
+
+    asyncio.run(run())
+    queue.put(results)
+
+
+def measure(workers, clients, duration, client_procs):
+    with tempfile.TemporaryDirectory() as tmp:
+        server, port = start_server(workers, Path(tmp) / "sessions.db")
+        try:
+            queue = multiprocessing.Queue()
+            procs = [
+                multiprocessing.Process(
+                    target=client_process,
+                    args=(port, clients // client_procs, duration, queue),
+                )
+                for _ in range(client_procs)
+            ]
+            for proc in procs:
+                proc.start()
+            results = [queue.get() for _ in procs]
+            for proc in procs:
+                proc.join()
+        finally:
+            server.terminate()
+            server.wait()
+
+    latencies = sorted(ms for r in results for ms in r["latencies"])
+    reconnects = sum(r["reconnects"] for r in results)
+    resumed = sum(r["resumed"] for r in results)
+    return {
+        "turns_per_s": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+        "resumed_pct": resumed * 100 / reconnects if reconnects else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--client-procs", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} clients, {args.duration:g} s per run, "
+        f"{os.cpu_count()} CPUs, reconnect every {TURNS_PER_CONNECTION} turns"
+    )
+    print(
+        f"{'workers':>8} {'turns/s':>10} {'p50 ms':>10} {'p99 ms':>10} "
+        f"{'history kept':>13}"
+    )
+    for workers in [int(w) for w in args.workers.split(",")]:
+        result = measure(workers, args.clients, args.duration, args.client_procs)
+        print(
+            f"{workers:>8} {result['turns_per_s']:>10.1f} {result['p50_ms']:>10.2f} "
+            f"{result['p99_ms']:>10.2f} {result['resumed_pct']:>12.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+End-to-end WebSocket load test with simulated voice users.
+
+Runs one uvicorn worker with the stand-in model (see standin_model.py) and
+drives it with simulated clients that speak the real /ws/{session_id}
+protocol: binary frames, 50 ms microphone frames streamed in real time, and
+spoken replies of 24 kHz PCM streamed back in 40 ms chunks. Each user talks
+for 1.5 s, listens to a 2 s reply, and repeats.
+
+For each number of concurrent sessions it reports:
+
+- out frames/s: model audio frames delivered to all clients
+- frame p50/p99: time from the stand-in model producing an audio chunk to the
+  client receiving it (stand-in -> ADK -> outbound queue -> WebSocket)
+- turn p50: end of the user's utterance to the first reply audio frame
+- lag p50/p99: event loop lag in the server, sampled every 5 ms
+- CPU: server CPU time as a share of one core
+- RSS: server resident memory at the end of the run
+
+The clients run in separate processes. On a machine with few cores they
+compete with the server for CPU, so treat the highest session counts as a
+lower bound.
+
+Usage:
+    python benchmarks/ws_load.py [--sessions 1,10,25,50,100] [--duration 15]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCH_DIR.parent / "app"
+
+# Microphone frames sent by the browser (50 ms of 16 kHz, 16-bit mono PCM)
+MIC_FRAME_MS = 50
+MIC_FRAME_BYTES = 16000 * 2 * MIC_FRAME_MS // 1000
+
+# Binary protocol frame kinds and flags (see app/streaming/protocol.py)
+BINARY_SUBPROTOCOL = "adk.binary.v1"
+KIND_AUDIO = 0x01
+KIND_CONTROL = 0x03
+FLAG_TURN_COMPLETE = 0x01
+
+
+def start_server():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    env = dict(
+        os.environ,
+        JARVIS_MAX_CONNECTIONS="10000",
+        JARVIS_LOG_LEVEL="WARNING",
+        JARVIS_RESUME_GRACE="0",
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "standin_server:app",
+            "--app-dir",
+            str(BENCH_DIR),
+            "--port",
+            str(port),
+            "--log-level",
+            "error",
+        ],
+        cwd=APP_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            server_stats(port)
+            return server, port
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def server_stats(port, reset=False):
+    url = f"http://127.0.0.1:{port}/bench/stats" + ("?reset=1" if reset else "")
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.load(response)
+
+
+async def run_client(port, session_id, deadline, results):
+    import websockets
+    from standin_model import UTTERANCE_BYTES, read_stamp
+
+    url = f"ws://127.0.0.1:{port}/ws/{session_id}?is_audio=true"
+    mic_frame = bytes((KIND_AUDIO, 0)) + bytes(MIC_FRAME_BYTES)
+    utterance_frames = -(-UTTERANCE_BYTES // MIC_FRAME_BYTES)
+
+    async with websockets.connect(url, subprotocols=[BINARY_SUBPROTOCOL]) as ws:
+        while time.monotonic() < deadline:
+            # Speak: stream microphone frames in real time
+            started = time.monotonic()
+            for index in range(utterance_frames):
+                if index:
+                    delay = started + index * MIC_FRAME_MS / 1000 - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await ws.send(mic_frame)
+            spoke_at = time.monotonic()
+
+            # Listen: time every audio frame until the turn is complete
+            first_audio = True
+            while True:
+                frame = await ws.recv()
+                received_at = time.monotonic()
+                kind = frame[0]
+                if kind == KIND_AUDIO:
+                    results["frames"].append(received_at - read_stamp(frame[2:]))
+                    if first_audio:
+                        results["turns"].append(received_at - spoke_at)
+                        first_audio = False
+                elif kind == KIND_CONTROL and frame[1] & FLAG_TURN_COMPLETE:
+                    break
+
+
+def client_process(port, first_id, clients, duration, queue):
+    sys.path.insert(0, str(BENCH_DIR))
+    results = {"frames": [], "turns": [], "errors": 0}
+    deadline = time.monotonic() + duration
+
+    async def run():
+        outcomes = await asyncio.gather(
+            *(
+                run_client(port, f"load-{first_id + i}", deadline, results)
+                for i in range(clients)
+            ),
+            return_exceptions=True,
+        )
+        results["errors"] = sum(isinstance(o, Exception) for o in outcomes)
+
+    asyncio.run(run())
+    queue.put(results)
+
+
+def percentile(samples, q):
+    return samples[min(int(len(samples) * q), len(samples) - 1)] if samples else 0.0
+
+
+def measure(port, sessions, duration, client_procs, first_id):
+    client_procs = max(1, min(client_procs, sessions))
+    before = server_stats(port, reset=True)
+    started = time.monotonic()
+
+    queue = multiprocessing.Queue()
+    procs = []
+    for index in range(client_procs):
+        clients = sessions // client_procs + (index < sessions % client_procs)
+        procs.append(
+            multiprocessing.Process(
+                target=client_process,
+                args=(port, first_id, clients, duration, queue),
+            )
+        )
+        first_id += clients
+    for proc in procs:
+        proc.start()
+    results = [queue.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    elapsed = time.monotonic() - started
+    after = server_stats(port, reset=True)
+
+    frames = sorted(latency for r in results for latency in r["frames"])
+    turns = sorted(latency for r in results for latency in r["turns"])
+    return {
+        "frames_per_s": len(frames) / elapsed,
+        "frame_p50_ms": percentile(frames, 0.5) * 1000,
+        "frame_p99_ms": percentile(frames, 0.99) * 1000,
+        "turn_p50_ms": statistics.median(turns) * 1000 if turns else 0.0,
+        "lag_p50_ms": after["lag_p50_ms"],
+        "lag_p99_ms": after["lag_p99_ms"],
+        "cpu_pct": (after["cpu_seconds"] - before["cpu_seconds"]) * 100 / elapsed,
+        "rss_mb": after["rss_bytes"] / 2**20,
+        "errors": sum(r["errors"] for r in results),
+    }, first_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", default="1,10,25,50,100")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--client-procs", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    print(
+        f"{args.duration:g} s per step, {os.cpu_count()} CPUs, "
+        f"{args.client_procs} client processes"
+    )
+    print(
+        f"{'sessions':>8} {'out frames/s':>13} {'frame p50':>10} {'frame p99':>10} "
+        f"{'turn p50':>9} {'lag p50':>8} {'lag p99':>8} {'CPU':>6} {'RSS MB':>7}"
+    )
+
+    server, port = start_server()
+    try:
+        # Start the lag probe before the first step
+        server_stats(port, reset=True)
+        first_id = 0
+        for sessions in [int(s) for s in args.sessions.split(",")]:
+            result, first_id = measure(
+                port, sessions, args.duration, args.client_procs, first_id
+            )
+            print(
+                f"{sessions:>8} {result['frames_per_s']:>13.1f} "
+                f"{result['frame_p50_ms']:>8.2f}ms {result['frame_p99_ms']:>8.2f}ms "
+                f"{result['turn_p50_ms']:>7.0f}ms {result['lag_p50_ms']:>6.2f}ms "
+                f"{result['lag_p99_ms']:>6.2f}ms {result['cpu_pct']:>5.0f}% "
+                f"{result['rss_mb']:>7.1f}"
+                + (f"  ({result['errors']} clients failed)" if result["errors"] else "")
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
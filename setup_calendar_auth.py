@@ -4,9 +4,16 @@ Google Calendar Authentication Setup Script
 
 This script helps you set up OAuth 2.0 credentials for Google Calendar integration.
 Follow the instructions in the console.
+
+For a multi-tenant server (JARVIS_CREDENTIALS_DIR set), pass --user USER_ID to
+store the token encrypted for that user instead. The script then prints the
+sign-in link the user opens once in their browser (needs JARVIS_AUTH_SECRET);
+--link-only prints a new link without running the OAuth flow again.
 """
 
+import argparse
 import os
+import sys
 from pathlib import Path
 
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -20,7 +27,29 @@ TOKEN_PATH = Path(os.path.expanduser("~/.credentials/calendar_token.json"))
 CREDENTIALS_PATH = Path("credentials.json")
 
 
-def setup_oauth():
+def save_user_token(user_id, creds):
+    """Store a user's token in the server's encrypted credential store"""
+    sys.path.insert(0, str(Path(__file__).resolve().parent / "app"))
+    from jarvis.tools.credentials import get_credential_store
+
+    store = get_credential_store()
+    if store is None:
+        raise RuntimeError("Set JARVIS_CREDENTIALS_DIR to use --user")
+    store.put(user_id, creds)
+    return store.directory
+
+
+def print_login_link(user_id, server_url):
+    """Print the link that signs a user's browser in to a multi-tenant server"""
+    sys.path.insert(0, str(Path(__file__).resolve().parent / "app"))
+    from streaming.auth import AUTH_TOKEN_DAYS, issue_token
+
+    token = issue_token(user_id)
+    print(f"\nSign-in link for {user_id} (valid for {AUTH_TOKEN_DAYS:g} days):")
+    print(f"{server_url.rstrip('/')}/login?token={token}")
+
+
+def setup_oauth(user_id=None, server_url="http://localhost:8000"):
     """Set up OAuth 2.0 for Google Calendar"""
     print("\n=== Google Calendar OAuth Setup ===\n")
 
@@ -45,10 +74,14 @@ def setup_oauth():
         creds = flow.run_local_server(port=0)
 
         # Save the credentials for the next run
-        TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
-        TOKEN_PATH.write_text(creds.to_json())
-
-        print(f"\nSuccessfully saved credentials to {TOKEN_PATH}")
+        if user_id:
+            directory = save_user_token(user_id, creds)
+            print(f"\nSuccessfully saved credentials for {user_id} to {directory}")
+            print_login_link(user_id, server_url)
+        else:
+            TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
+            TOKEN_PATH.write_text(creds.to_json())
+            print(f"\nSuccessfully saved credentials to {TOKEN_PATH}")
 
         # Test the API connection
         print("\nTesting connection to Google Calendar API...")
@@ -76,4 +109,24 @@ def setup_oauth():
 
 
 if __name__ == "__main__":
-    setup_oauth()
+    parser = argparse.ArgumentParser(description="Google Calendar OAuth setup")
+    parser.add_argument(
+        "--user", help="Store the token for this user ID (multi-tenant servers)"
+    )
+    parser.add_argument(
+        "--server-url",
+        default="http://localhost:8000",
+        help="Base URL of the server, for the sign-in link",
+    )
+    parser.add_argument(
+        "--link-only",
+        action="store_true",
+        help="Only print a new sign-in link for --user",
+    )
+    args = parser.parse_args()
+    if args.link_only:
+        if not args.user:
+            parser.error("--link-only needs --user")
+        print_login_link(args.user, args.server_url)
+    else:
+        setup_oauth(args.user, args.server_url)